@@ -5,7 +5,18 @@
 /// @dev Transient Labs fork of OpenZeppelin Contracts (last updated v4.7.0) (token/ERC721/ERC721.sol)
 ///     for use in Shatter contracts. Changes are as follows to achieve an efficient batch mint while keeping transfer fees low:
 ///         1. `_owners` and `_balances` variable scope are `internal`
-///         2. all calls to `ERC721.ownerOf` are replaced with just `ownerOf`
+///         2. `ownerOf` and every internal ownership check go through `_requireOwned`, which resolves the owner with `_ownershipOf`
+///         3. the EIP-2309 `ConsecutiveTransfer` event is declared so Shatter contracts can announce batch mints and burns in one log
+///         4. `_owners` and `_tokenApprovals` entries are packed with the epoch they were written in, so child contracts can
+///            invalidate every entry at once by moving to a new epoch (see `_currentEpoch`)
+///         5. ownership is resolved once per operation through `_ownershipOf`, which child contracts override instead of `ownerOf`
+///         6. `_owners` entries carry a flag marking that the token has an approval, so transfers and burns only clear
+///            `_tokenApprovals` when there is something to clear
+///         7. `batchTransferFrom` and `safeBatchTransferFrom` move many tokens between two parties in one call
+///         8. `totalSupply`, `ownersOfRange` and `tokensOfOwner` give indexers bulk views over the token id range reported by `_tokenIdRange`
+///         9. the EIP-4906 `MetadataUpdate` and `BatchMetadataUpdate` events are declared so Shatter contracts can tell indexers
+///            when metadata changes, and `_emitBatchMetadataUpdate` announces a change to every token in `_tokenIdRange`
+///         10. `_initializeERC721S` sets the name and symbol outside of the constructor, so Shatter contracts can be deployed as minimal clones
 /// @dev we decided not to write our own base ERC721 contract as OpenZeppelin's implementation is the standard in the space
 
 pragma solidity ^0.8.0;
@@ -33,18 +44,41 @@ contract ERC721S is Context, ERC165, IERC721, IERC721Metadata {
     // Token symbol
     string private _symbol;
 
-    // Mapping from token ID to owner address
-    mapping(uint256 => address) internal _owners;
+    // Mapping from token ID to packed owner address, see {_packAddress}. Bit 224 is set if the token has an approval
+    mapping(uint256 => uint256) internal _owners;
 
     // Mapping owner address to token count
     mapping(address => uint256) internal _balances;
 
-    // Mapping from token ID to approved address
-    mapping(uint256 => address) private _tokenApprovals;
+    // Mapping from token ID to packed approved address, see {_packAddress}
+    mapping(uint256 => uint256) private _tokenApprovals;
 
     // Mapping from owner to operator approvals
     mapping(address => mapping(address => bool)) private _operatorApprovals;
 
+    // Flag in an `_owners` entry marking that `_tokenApprovals` holds an approval for the token
+    uint256 private constant _APPROVAL_FLAG = 1 << 224;
+
+    // EIP-4906 interface id, child contracts that emit the metadata events report it in supportsInterface
+    bytes4 internal constant _INTERFACE_ID_ERC4906 = 0x49064906;
+
+    /**
+     * @dev Emitted when tokens in the range `fromTokenId` to `toTokenId` (inclusive) are transferred
+     * from `fromAddress` to `toAddress`, as defined in https://eips.ethereum.org/EIPS/eip-2309[EIP-2309].
+     */
+    event ConsecutiveTransfer(uint256 indexed fromTokenId, uint256 toTokenId, address indexed fromAddress, address indexed toAddress);
+
+    /**
+     * @dev Emitted when the metadata of `_tokenId` changes, as defined in https://eips.ethereum.org/EIPS/eip-4906[EIP-4906].
+     */
+    event MetadataUpdate(uint256 _tokenId);
+
+    /**
+     * @dev Emitted when the metadata of the tokens in the range `_fromTokenId` to `_toTokenId` (inclusive) changes,
+     * as defined in https://eips.ethereum.org/EIPS/eip-4906[EIP-4906].
+     */
+    event BatchMetadataUpdate(uint256 _fromTokenId, uint256 _toTokenId);
+
     /**
      * @dev Initializes the contract by setting a `name` and a `symbol` to the token collection.
      */
@@ -53,6 +87,14 @@ contract ERC721S is Context, ERC165, IERC721, IERC721Metadata {
         _symbol = symbol_;
     }
 
+    /**
+     * @dev Sets the `name` and `symbol` of a contract that didn't run the constructor, such as a minimal clone.
+     */
+    function _initializeERC721S(string memory name_, string memory symbol_) internal {
+        _name = name_;
+        _symbol = symbol_;
+    }
+
     /**
      * @dev See {IERC165-supportsInterface}.
      */
@@ -75,9 +117,70 @@ contract ERC721S is Context, ERC165, IERC721, IERC721Metadata {
      * @dev See {IERC721-ownerOf}.
      */
     function ownerOf(uint256 tokenId) public view virtual override returns (address) {
-        address owner = _owners[tokenId];
-        require(owner != address(0), "ERC721: invalid token ID");
-        return owner;
+        return _requireOwned(tokenId);
+    }
+
+    /**
+     * @dev Returns the number of tokens in existence.
+     */
+    function totalSupply() public view virtual returns (uint256) {
+        (uint256 startTokenId, uint256 endTokenId) = _tokenIdRange();
+        return endTokenId - startTokenId;
+    }
+
+    /**
+     * @dev Returns the owners of `count` consecutive tokens starting at `startTokenId`.
+     * Tokens that don't exist are reported as owned by the zero address.
+     */
+    function ownersOfRange(uint256 startTokenId, uint256 count) public view virtual returns (address[] memory owners) {
+        (uint256 first, uint256 end) = _tokenIdRange();
+        owners = new address[](count);
+        for (uint256 i = 0; i < count; i++) {
+            uint256 tokenId = startTokenId + i;
+            if (tokenId >= first && tokenId < end) {
+                (owners[i], ) = _ownershipOf(tokenId);
+            }
+        }
+    }
+
+    /**
+     * @dev Returns the tokens owned by `owner` among the `limit` token ids starting at `cursor`, and the cursor to continue from.
+     * `limit` bounds the number of token ids scanned rather than the number returned, so every call has a predictable cost.
+     * A cursor of 0 starts from the first token, and the returned cursor is 0 once every token has been scanned.
+     *
+     * Requirements:
+     *
+     * - `limit` must be greater than 0, otherwise a first call could not be told apart from a finished scan.
+     */
+    function tokensOfOwner(
+        address owner,
+        uint256 cursor,
+        uint256 limit
+    ) public view virtual returns (uint256[] memory tokenIds, uint256 nextCursor) {
+        require(limit > 0, "Limit must be greater than 0");
+        (uint256 first, uint256 end) = _tokenIdRange();
+        if (cursor < first) {
+            cursor = first;
+        }
+        uint256 stop = end;
+        if (cursor < end && end - cursor > limit) {
+            stop = cursor + limit;
+            nextCursor = stop;
+        }
+
+        uint256[] memory found = new uint256[](stop > cursor ? stop - cursor : 0);
+        uint256 numFound;
+        for (uint256 tokenId = cursor; tokenId < stop; tokenId++) {
+            (address tokenOwner, ) = _ownershipOf(tokenId);
+            if (tokenOwner == owner) {
+                found[numFound] = tokenId;
+                numFound++;
+            }
+        }
+        tokenIds = new uint256[](numFound);
+        for (uint256 i = 0; i < numFound; i++) {
+            tokenIds[i] = found[i];
+        }
     }
 
     /**
@@ -117,7 +220,7 @@ contract ERC721S is Context, ERC165, IERC721, IERC721Metadata {
      * @dev See {IERC721-approve}.
      */
     function approve(address to, uint256 tokenId) public virtual override {
-        address owner = ownerOf(tokenId);
+        address owner = _requireOwned(tokenId);
         require(to != owner, "ERC721: approval to current owner");
 
         require(
@@ -125,7 +228,7 @@ contract ERC721S is Context, ERC165, IERC721, IERC721Metadata {
             "ERC721: approve caller is not token owner or approved for all"
         );
 
-        _approve(to, tokenId);
+        _approve(to, tokenId, owner);
     }
 
     /**
@@ -134,7 +237,7 @@ contract ERC721S is Context, ERC165, IERC721, IERC721Metadata {
     function getApproved(uint256 tokenId) public view virtual override returns (address) {
         _requireMinted(tokenId);
 
-        return _tokenApprovals[tokenId];
+        return _approvedAt(tokenId);
     }
 
     /**
@@ -159,10 +262,11 @@ contract ERC721S is Context, ERC165, IERC721, IERC721Metadata {
         address to,
         uint256 tokenId
     ) public virtual override {
+        address owner = _requireOwned(tokenId);
         //solhint-disable-next-line max-line-length
-        require(_isApprovedOrOwner(_msgSender(), tokenId), "ERC721: caller is not token owner or approved");
+        require(_isApprovedOrOwner(_msgSender(), tokenId, owner), "ERC721: caller is not token owner or approved");
 
-        _transfer(from, to, tokenId);
+        _transfer(from, to, tokenId, owner);
     }
 
     /**
@@ -185,8 +289,46 @@ contract ERC721S is Context, ERC165, IERC721, IERC721Metadata {
         uint256 tokenId,
         bytes memory data
     ) public virtual override {
-        require(_isApprovedOrOwner(_msgSender(), tokenId), "ERC721: caller is not token owner or approved");
-        _safeTransfer(from, to, tokenId, data);
+        address owner = _requireOwned(tokenId);
+        require(_isApprovedOrOwner(_msgSender(), tokenId, owner), "ERC721: caller is not token owner or approved");
+        _transfer(from, to, tokenId, owner);
+        require(_checkOnERC721Received(from, to, tokenId, data), "ERC721: transfer to non ERC721Receiver implementer");
+    }
+
+    /**
+     * @dev Transfers `tokenIds` from `from` to `to`, writing `_balances` once for each party instead of once per token.
+     *
+     * Requirements:
+     *
+     * - `to` cannot be the zero address.
+     * - every token in `tokenIds` must be owned by `from`.
+     * - the caller must be `from`, an operator of `from`, or approved for every token in `tokenIds`.
+     *
+     * Emits a {Transfer} event for each token.
+     */
+    function batchTransferFrom(
+        address from,
+        address to,
+        uint256[] calldata tokenIds
+    ) public virtual {
+        _batchTransfer(from, to, tokenIds);
+    }
+
+    /**
+     * @dev Same as {batchTransferFrom}, and if `to` is a contract, calls {IERC721Receiver-onERC721Received} for each token.
+     */
+    function safeBatchTransferFrom(
+        address from,
+        address to,
+        uint256[] calldata tokenIds,
+        bytes memory data
+    ) public virtual {
+        _batchTransfer(from, to, tokenIds);
+        if (to.isContract()) {
+            for (uint256 i = 0; i < tokenIds.length; i++) {
+                require(_checkOnERC721Received(from, to, tokenIds[i], data), "ERC721: transfer to non ERC721Receiver implementer");
+            }
+        }
     }
 
     /**
@@ -226,7 +368,7 @@ contract ERC721S is Context, ERC165, IERC721, IERC721Metadata {
      * and stop existing when they are burned (`_burn`).
      */
     function _exists(uint256 tokenId) internal view virtual returns (bool) {
-        return _owners[tokenId] != address(0);
+        return _ownerAt(tokenId) != address(0);
     }
 
     /**
@@ -237,8 +379,19 @@ contract ERC721S is Context, ERC165, IERC721, IERC721Metadata {
      * - `tokenId` must exist.
      */
     function _isApprovedOrOwner(address spender, uint256 tokenId) internal view virtual returns (bool) {
-        address owner = ownerOf(tokenId);
-        return (spender == owner || isApprovedForAll(owner, spender) || getApproved(tokenId) == spender);
+        return _isApprovedOrOwner(spender, tokenId, _requireOwned(tokenId));
+    }
+
+    /**
+     * @dev Same as {xref-ERC721S-_isApprovedOrOwner-address-uint256-}[`_isApprovedOrOwner`], with the `owner` already
+     * resolved by the caller, so the token is known to exist and the approval is read without checking existence again.
+     */
+    function _isApprovedOrOwner(
+        address spender,
+        uint256 tokenId,
+        address owner
+    ) internal view virtual returns (bool) {
+        return (spender == owner || isApprovedForAll(owner, spender) || _approvedAt(tokenId) == spender);
     }
 
     /**
@@ -290,7 +443,7 @@ contract ERC721S is Context, ERC165, IERC721, IERC721Metadata {
         _beforeTokenTransfer(address(0), to, tokenId);
 
         _balances[to] += 1;
-        _owners[tokenId] = to;
+        _owners[tokenId] = _packAddress(to);
 
         emit Transfer(address(0), to, tokenId);
 
@@ -309,12 +462,14 @@ contract ERC721S is Context, ERC165, IERC721, IERC721Metadata {
      * Emits a {Transfer} event.
      */
     function _burn(uint256 tokenId) internal virtual {
-        address owner = ownerOf(tokenId);
+        address owner = _requireOwned(tokenId);
 
         _beforeTokenTransfer(owner, address(0), tokenId);
 
         // Clear approvals
-        delete _tokenApprovals[tokenId];
+        if (_owners[tokenId] & _APPROVAL_FLAG != 0) {
+            delete _tokenApprovals[tokenId];
+        }
 
         _balances[owner] -= 1;
         delete _owners[tokenId];
@@ -340,31 +495,101 @@ contract ERC721S is Context, ERC165, IERC721, IERC721Metadata {
         address to,
         uint256 tokenId
     ) internal virtual {
-        require(ownerOf(tokenId) == from, "ERC721: transfer from incorrect owner");
+        _transfer(from, to, tokenId, _requireOwned(tokenId));
+    }
+
+    /**
+     * @dev Same as {xref-ERC721S-_transfer-address-address-uint256-}[`_transfer`], with the current `owner` of `tokenId`
+     * already resolved by the caller.
+     */
+    function _transfer(
+        address from,
+        address to,
+        uint256 tokenId,
+        address owner
+    ) internal virtual {
+        require(owner == from, "ERC721: transfer from incorrect owner");
         require(to != address(0), "ERC721: transfer to the zero address");
 
         _beforeTokenTransfer(from, to, tokenId);
 
         // Clear approvals from the previous owner
-        delete _tokenApprovals[tokenId];
+        if (_owners[tokenId] & _APPROVAL_FLAG != 0) {
+            delete _tokenApprovals[tokenId];
+        }
 
         _balances[from] -= 1;
         _balances[to] += 1;
-        _owners[tokenId] = to;
+        _owners[tokenId] = _packAddress(to);
 
         emit Transfer(from, to, tokenId);
 
         _afterTokenTransfer(from, to, tokenId);
     }
 
+    /**
+     * @dev Transfers `tokenIds` from `from` to `to`, checking that the caller may move each of them.
+     * Ownership of each token is resolved through {_ownershipOf}, and `_balances` is written once per party.
+     *
+     * Emits a {Transfer} event for each token.
+     */
+    function _batchTransfer(
+        address from,
+        address to,
+        uint256[] calldata tokenIds
+    ) internal virtual {
+        require(to != address(0), "ERC721: transfer to the zero address");
+        address spender = _msgSender();
+        bool isApprovedForFrom = spender == from || isApprovedForAll(from, spender);
+        uint256 packedTo = _packAddress(to);
+
+        for (uint256 i = 0; i < tokenIds.length; i++) {
+            uint256 tokenId = tokenIds[i];
+            require(_requireOwned(tokenId) == from, "ERC721: transfer from incorrect owner");
+            require(isApprovedForFrom || _approvedAt(tokenId) == spender, "ERC721: caller is not token owner or approved");
+
+            _beforeTokenTransfer(from, to, tokenId);
+
+            // Clear approvals from the previous owner
+            if (_owners[tokenId] & _APPROVAL_FLAG != 0) {
+                delete _tokenApprovals[tokenId];
+            }
+            _owners[tokenId] = packedTo;
+
+            emit Transfer(from, to, tokenId);
+
+            _afterTokenTransfer(from, to, tokenId);
+        }
+
+        _balances[from] -= tokenIds.length;
+        _balances[to] += tokenIds.length;
+    }
+
     /**
      * @dev Approve `to` to operate on `tokenId`
      *
      * Emits an {Approval} event.
      */
     function _approve(address to, uint256 tokenId) internal virtual {
-        _tokenApprovals[tokenId] = to;
-        emit Approval(ownerOf(tokenId), to, tokenId);
+        _approve(to, tokenId, _requireOwned(tokenId));
+    }
+
+    /**
+     * @dev Same as {xref-ERC721S-_approve-address-uint256-}[`_approve`], with the `owner` of `tokenId` already resolved by the caller.
+     * The owner is written back to `_owners` with the approval flag set, or cleared if `to` is the zero address.
+     */
+    function _approve(
+        address to,
+        uint256 tokenId,
+        address owner
+    ) internal virtual {
+        _tokenApprovals[tokenId] = _packAddress(to);
+        if (to == address(0)) {
+            _owners[tokenId] = _packAddress(owner);
+        } else {
+            _owners[tokenId] = _packAddress(owner) | _APPROVAL_FLAG;
+        }
+        emit Approval(owner, to, tokenId);
     }
 
     /**
@@ -382,6 +607,86 @@ contract ERC721S is Context, ERC165, IERC721, IERC721Metadata {
         emit ApprovalForAll(owner, operator, approved);
     }
 
+    /**
+     * @dev Returns the current epoch. Entries in `_owners` and `_tokenApprovals` written in an earlier epoch
+     * are treated as empty. Zero by default, can be overridden in child contracts.
+     */
+    function _currentEpoch() internal view virtual returns (uint64) {
+        return 0;
+    }
+
+    /**
+     * @dev Packs `account` with the current epoch: bits [0..159] hold the address and bits [160..223] the epoch.
+     */
+    function _packAddress(address account) internal view returns (uint256) {
+        return uint256(uint160(account)) | (uint256(_currentEpoch()) << 160);
+    }
+
+    /**
+     * @dev Unpacks an entry written by {_packAddress}. Returns the zero address if the entry is from an earlier epoch.
+     */
+    function _unpackAddress(uint256 packed) internal view returns (address) {
+        if (uint64(packed >> 160) != _currentEpoch()) {
+            return address(0);
+        }
+        return address(uint160(packed));
+    }
+
+    /**
+     * @dev Returns the owner recorded in `_owners` for `tokenId` in the current epoch, or the zero address.
+     */
+    function _ownerAt(uint256 tokenId) internal view returns (address) {
+        return _unpackAddress(_owners[tokenId]);
+    }
+
+    /**
+     * @dev Returns the approved address for `tokenId` in the current epoch, or the zero address.
+     * Only reads `_tokenApprovals` if the approval flag is set in `_owners`.
+     */
+    function _approvedAt(uint256 tokenId) internal view returns (address) {
+        if (_owners[tokenId] & _APPROVAL_FLAG == 0) {
+            return address(0);
+        }
+        return _unpackAddress(_tokenApprovals[tokenId]);
+    }
+
+    /**
+     * @dev Returns the owner of `tokenId` and whether it exists in a single lookup. `owner` is the zero address if the token
+     * doesn't exist. Child contracts that implement implicit ownership override this rather than {ownerOf}, and may revert
+     * for token ids that can never exist.
+     */
+    function _ownershipOf(uint256 tokenId) internal view virtual returns (address owner, bool exists) {
+        owner = _ownerAt(tokenId);
+        exists = owner != address(0);
+    }
+
+    /**
+     * @dev Returns the range of token ids that currently exist, from `startTokenId` inclusive to `endTokenId` exclusive.
+     * Used by {totalSupply}, {ownersOfRange} and {tokensOfOwner}. Empty by default, child contracts override this.
+     */
+    function _tokenIdRange() internal view virtual returns (uint256 startTokenId, uint256 endTokenId) {
+        return (0, 0);
+    }
+
+    /**
+     * @dev Emits {BatchMetadataUpdate} for every token in {_tokenIdRange}, if there are any.
+     */
+    function _emitBatchMetadataUpdate() internal {
+        (uint256 startTokenId, uint256 endTokenId) = _tokenIdRange();
+        if (endTokenId > startTokenId) {
+            emit BatchMetadataUpdate(startTokenId, endTokenId - 1);
+        }
+    }
+
+    /**
+     * @dev Returns the owner of `tokenId`, reverting if it doesn't exist.
+     */
+    function _requireOwned(uint256 tokenId) internal view returns (address) {
+        (address owner, bool exists) = _ownershipOf(tokenId);
+        require(exists, "ERC721: invalid token ID");
+        return owner;
+    }
+
     /**
      * @dev Reverts if the `tokenId` has not been minted yet.
      */
@@ -0,0 +1,103 @@
+// SPDX-License-Identifier: Apache-2.0
+
+/// @title MetadataRenderer - linear time rendering of on-chain token metadata
+/// @author transientlabs.xyz
+/// @dev building JSON with `abi.encodePacked` in a loop copies the whole buffer on every iteration, and Base64 encoding
+///     then copying behind the `data:` prefix adds two more buffers. The functions here take the pieces of the output
+///     as a list, size the result up front, and write it in a single pass into one allocation.
+
+pragma solidity ^0.8.9;
+
+library MetadataRenderer {
+    bytes internal constant _TABLE = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/";
+    bytes internal constant _JSON_PREFIX = "data:application/json;base64,";
+
+    /// @notice function to concatenate byte strings into one allocation
+    /// @param parts are the byte strings to join, in order
+    /// @return result is the concatenation of every part
+    function concat(bytes[] memory parts) internal pure returns (bytes memory result) {
+        result = new bytes(_totalLength(parts));
+        assembly {
+            let out := add(result, 32)
+            let partsPtr := add(parts, 32)
+            let partsEnd := add(partsPtr, mul(mload(parts), 32))
+            for {} lt(partsPtr, partsEnd) { partsPtr := add(partsPtr, 32) } {
+                let part := mload(partsPtr)
+                let src := add(part, 32)
+                let len := mload(part)
+                // copy in words, the overrun past the part is overwritten by the next one or lies past the result
+                for { let i := 0 } lt(i, len) { i := add(i, 32) } {
+                    mstore(add(out, i), mload(add(src, i)))
+                }
+                out := add(out, len)
+            }
+            // clear the overrun so memory after the result is left as it was allocated
+            mstore(out, 0)
+        }
+    }
+
+    /// @notice function to render a `data:application/json;base64,` URI from the pieces of a JSON document
+    /// @dev the JSON is never materialized, each part is Base64 encoded straight into the result
+    /// @param parts are the pieces of the JSON document, in order
+    /// @return result is the data URI
+    function jsonDataURI(bytes[] memory parts) internal pure returns (string memory result) {
+        bytes memory prefix = _JSON_PREFIX;
+        bytes memory table = _TABLE;
+        uint256 encodedLength = 4 * ((_totalLength(parts) + 2) / 3);
+        result = new string(prefix.length + encodedLength);
+        assembly {
+            let tablePtr := add(table, 1)
+            let out := add(result, 32)
+            // the prefix is shorter than a word and the bytes written past it are overwritten by the encoding
+            mstore(out, mload(add(prefix, 32)))
+            out := add(out, mload(prefix))
+
+            let acc := 0
+            let n := 0
+            let partsPtr := add(parts, 32)
+            let partsEnd := add(partsPtr, mul(mload(parts), 32))
+            for {} lt(partsPtr, partsEnd) { partsPtr := add(partsPtr, 32) } {
+                let part := mload(partsPtr)
+                let src := add(part, 32)
+                let srcEnd := add(src, mload(part))
+                for {} lt(src, srcEnd) { src := add(src, 1) } {
+                    acc := or(shl(8, acc), byte(0, mload(src)))
+                    n := add(n, 1)
+                    if eq(n, 3) {
+                        mstore8(out, mload(add(tablePtr, and(shr(18, acc), 0x3F))))
+                        mstore8(add(out, 1), mload(add(tablePtr, and(shr(12, acc), 0x3F))))
+                        mstore8(add(out, 2), mload(add(tablePtr, and(shr(6, acc), 0x3F))))
+                        mstore8(add(out, 3), mload(add(tablePtr, and(acc, 0x3F))))
+                        out := add(out, 4)
+                        acc := 0
+                        n := 0
+                    }
+                }
+            }
+
+            // pad the last group
+            switch n
+            case 1 {
+                acc := shl(16, acc)
+                mstore8(out, mload(add(tablePtr, and(shr(18, acc), 0x3F))))
+                mstore8(add(out, 1), mload(add(tablePtr, and(shr(12, acc), 0x3F))))
+                mstore8(add(out, 2), 0x3d)
+                mstore8(add(out, 3), 0x3d)
+            }
+            case 2 {
+                acc := shl(8, acc)
+                mstore8(out, mload(add(tablePtr, and(shr(18, acc), 0x3F))))
+                mstore8(add(out, 1), mload(add(tablePtr, and(shr(12, acc), 0x3F))))
+                mstore8(add(out, 2), mload(add(tablePtr, and(shr(6, acc), 0x3F))))
+                mstore8(add(out, 3), 0x3d)
+            }
+        }
+    }
+
+    /// @notice function to sum the lengths of the parts
+    function _totalLength(bytes[] memory parts) private pure returns (uint256 length) {
+        for (uint256 i; i < parts.length; i++) {
+            length += parts[i].length;
+        }
+    }
+}
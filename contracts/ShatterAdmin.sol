@@ -0,0 +1,50 @@
+// SPDX-License-Identifier: Apache-2.0
+
+/// @title Shatter Admin
+/// @notice Admin and royalty logic shared by every shatter contract, whatever token standard it is built on
+/// @dev inherited by ShatterERC721 for the ERC721S shatter contracts, and by ShatterEditionsV1
+/// @author transientlabs.xyz
+
+pragma solidity 0.8.14;
+
+import "Transient-Labs/tl-contract-kit@6.1.0/contracts/royalty/EIP2981AllToken.sol";
+import "OpenZeppelin/openzeppelin-contracts@4.7.0/contracts/access/Ownable.sol";
+
+abstract contract ShatterAdmin is EIP2981AllToken, Ownable {
+
+    address public adminAddress;
+
+    modifier adminOrOwner {
+        address sender = _msgSender();
+        require(sender == adminAddress || sender == owner(), "Address not admin or owner");
+        _;
+    }
+
+    modifier onlyAdmin {
+        require(_msgSender() == adminAddress, "Address not admin");
+        _;
+    }
+
+    /// @notice function to change the royalty info
+    /// @dev requires owner
+    /// @dev this is useful if the amount was set improperly at contract creation.
+    /// @param newAddr is the new royalty payout addresss
+    /// @param newPerc is the new royalty percentage, in basis points (out of 10,000)
+    function setRoyaltyInfo(address newAddr, uint256 newPerc) external onlyOwner {
+        _setRoyaltyInfo(newAddr, newPerc);
+    }
+
+    /// @notice function to renounce admin rights
+    /// @dev requires only admin
+    function renounceAdmin() external onlyAdmin {
+        adminAddress = address(0);
+    }
+
+    /// @notice function to set the admin address on the contract
+    /// @dev requires owner
+    /// @param newAdmin is the new admin address
+    function setAdminAddress(address newAdmin) external onlyOwner {
+        require(newAdmin != address(0), "New admin cannot be the zero address");
+        adminAddress = newAdmin;
+    }
+}
@@ -0,0 +1,203 @@
+// SPDX-License-Identifier: Apache-2.0
+
+/// @title Shatter Base
+/// @notice Logic shared by ShatterV1, ShatterV2 and ShatterV3
+/// @dev every version can be deployed through its constructor, or as a minimal clone of a deployed version that is set up
+///     through `initialize` instead
+/// @author transientlabs.xyz
+
+pragma solidity 0.8.14;
+
+import "./ShatterERC721.sol";
+
+abstract contract ShatterBase is ShatterERC721 {
+
+    // state read by every ownerOf, transfer and approval, packed so that it costs a single SLOAD
+    struct ShatterState {
+        address shatterAddress;
+        uint64 shatters;
+        uint24 epoch;
+        uint8 flags;
+    }
+
+    ShatterState internal _state;
+    bool private _initialized;
+    uint256 public shatterTime;
+    uint256 public batchSize;
+    uint256 public pendingShatters;
+    // ranges set by `shatterTo`: bits [0..159] hold the recipient and bits [160..255] the last tokenId of the range
+    uint256[] private _ranges;
+
+    event Shattered(address indexed user, uint256 indexed numShatters, uint256 indexed shatteredTime);
+
+    /// @notice modifier for the constructor and `initialize` function of each version, so a contract is only set up once
+    /// @dev a contract deployed through its constructor is marked as initialized, which also protects the implementation behind clones
+    modifier initializer {
+        require(!_initialized, "Already initialized");
+        _initialized = true;
+        _;
+    }
+
+    /// @notice function to process shatter and fuse in batches
+    /// @dev requires owner
+    /// @dev can't be changed while a shatter or fuse is in progress
+    /// @param newBatchSize is the maximum number of editions minted or burned per transaction. 0 processes everything at once
+    function setBatchSize(uint256 newBatchSize) external onlyOwner {
+        require(pendingShatters == 0, "Shatter or fuse in progress");
+        batchSize = newBatchSize;
+    }
+
+    /// @notice function to mint the next batch of a shatter in progress
+    /// @dev anyone can push a shatter forward as the remaining editions always go to the shatter executor
+    function continueShatter() external {
+        require(pendingShatters > 0 && _state.flags & _FUSING == 0, "No shatter in progress");
+        _shatterBatch();
+    }
+
+    /// @notice function to get if the piece has been shattered
+    function isShattered() public view returns (bool) {
+        return _state.flags & _SHATTERED != 0;
+    }
+
+    /// @notice function to get the highest minted tokenId
+    function shatters() public view returns (uint256) {
+        return _state.shatters;
+    }
+
+    /// @notice function to set up what the constructors of ERC721S, EIP2981AllToken and Ownable set for a contract deployed directly
+    /// @dev only for `initialize`, as clones don't run constructors
+    function _initializeClone(
+        address newOwner,
+        string memory name,
+        string memory symbol,
+        address royaltyRecipient,
+        uint256 royaltyPercentage
+    )
+        internal
+    {
+        _initializeERC721S(name, symbol);
+        _setRoyaltyInfo(royaltyRecipient, royaltyPercentage);
+        _transferOwnership(newOwner);
+    }
+
+    /// @notice function to set up the state shared by every version
+    /// @dev `maxShatters` is bounded below the largest uint64 so the highest tokenId also fits in `ShatterState.shatters`
+    ///     when the 1/1 is kept through shatter, as in ShatterV3
+    function _initializeShatter(address admin, uint256 time, uint256 maxShatters) internal {
+        require(maxShatters < type(uint64).max, "Max shatters must fit in 64 bits");
+        adminAddress = admin;
+        shatterTime = time;
+    }
+
+    /// @notice function to override _ownershipOf in ERC721S, which backs ownerOf, approve, transfers and burns
+    /// @dev if is shattered and not fused, checks to see if that token has been transferred or if it belongs to the shatter address,
+    ///     or to the recipient of its range if shattered through `shatterTo`. Otherwise, returns result from ERC721S.
+    function _ownershipOf(uint256 tokenId) internal view virtual override(ERC721S) returns (address, bool) {
+        ShatterState memory state = _state;
+        if (state.flags & (_SHATTERED | _FUSED) == _SHATTERED) {
+            if (tokenId > 0 && tokenId <= state.shatters) {
+                address owner = _ownerAt(tokenId);
+                if (owner != address(0)) {
+                    return (owner, true);
+                } else if (state.flags & _RANGES != 0) {
+                    return (_rangeOwnerOf(tokenId), true);
+                } else {
+                    return (state.shatterAddress, true);
+                }
+            } else {
+                revert("Invalid token id");
+            }
+        } else {
+            return ERC721S._ownershipOf(tokenId);
+        }
+    }
+
+    /// @notice function to override the _exists function in ERC721S
+    /// @dev if is shattered and not fused, checks to see if tokenId is in the range of shatters
+    ///     otherwise, returns result from ERC721S
+    function _exists(uint256 tokenId) internal view virtual override(ERC721S) returns (bool) {
+        ShatterState memory state = _state;
+        if (state.flags & (_SHATTERED | _FUSED) == _SHATTERED) {
+            return tokenId > 0 && tokenId <= state.shatters;
+        } else {
+            return ERC721S._exists(tokenId);
+        }
+    }
+
+    /// @notice override _tokenIdRange() function from ERC721S
+    /// @dev tokenIds 1 -> shatters while shattered and not fused, otherwise token 0 once minted
+    function _tokenIdRange() internal view virtual override returns (uint256, uint256) {
+        ShatterState memory state = _state;
+        if (state.flags & (_SHATTERED | _FUSED) == _SHATTERED) {
+            return (1, uint256(state.shatters) + 1);
+        } else {
+            return (0, state.shatters);
+        }
+    }
+
+    /// @notice function to mint the next batch of editions during shatter
+    /// @dev editions are minted in increasing order, so tokenIds 1 -> shatters are always the finalized ones
+    function _shatterBatch() internal {
+        ShatterState memory state = _state;
+        uint256 quantity = _nextBatch();
+        _batchMint(state.shatterAddress, uint256(state.shatters) + 1, quantity);
+        state.shatters += uint64(quantity);
+        _state = state;
+        pendingShatters -= quantity;
+        if (pendingShatters == 0) {
+            emit Shattered(state.shatterAddress, _shatterCount(), block.timestamp);
+        }
+    }
+
+    /// @notice function to get the number of editions to process in the current transaction
+    function _nextBatch() internal view returns (uint256) {
+        if (batchSize != 0 && pendingShatters > batchSize) {
+            return batchSize;
+        }
+        return pendingShatters;
+    }
+
+    /// @notice function to get the number of editions reported by `Shattered` once a shatter completes
+    function _shatterCount() internal view virtual returns (uint256) {
+        return _state.shatters;
+    }
+
+    /// @notice function to check the recipients and counts passed to `shatterTo`
+    /// @return numShatters is the total number of editions
+    function _sumCounts(address[] calldata recipients, uint256[] calldata counts) internal pure returns (uint256 numShatters) {
+        require(recipients.length == counts.length, "Array lengths must be equal");
+        for (uint256 i = 0; i < counts.length; i++) {
+            require(counts[i] > 0, "Cannot shatter 0 editions to a recipient");
+            numShatters += counts[i];
+        }
+    }
+
+    /// @notice function to mint contiguous ranges of editions starting at tokenId 1, and record them in the range table
+    /// @dev replaces the ranges of any earlier shatter
+    /// @return lastTokenId is the last tokenId minted
+    function _mintRanges(address[] calldata recipients, uint256[] calldata counts) internal returns (uint256 lastTokenId) {
+        delete _ranges;
+        for (uint256 i = 0; i < recipients.length; i++) {
+            require(recipients[i] != address(0), "ERC721: mint to the zero address");
+            _batchMint(recipients[i], lastTokenId + 1, counts[i]);
+            lastTokenId += counts[i];
+            _ranges.push(uint256(uint160(recipients[i])) | (lastTokenId << 160));
+        }
+    }
+
+    /// @notice function to find the recipient of the `shatterTo` range containing tokenId
+    /// @dev binary search over the ranges, which are sorted by their last tokenId
+    function _rangeOwnerOf(uint256 tokenId) internal view returns (address) {
+        uint256 low = 0;
+        uint256 high = _ranges.length - 1;
+        while (low < high) {
+            uint256 mid = (low + high) / 2;
+            if (_ranges[mid] >> 160 < tokenId) {
+                low = mid + 1;
+            } else {
+                high = mid;
+            }
+        }
+        return address(uint160(_ranges[low]));
+    }
+}
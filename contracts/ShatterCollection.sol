@@ -0,0 +1,307 @@
+// SPDX-License-Identifier: Apache-2.0
+
+/// @title Shatter Collection
+/// @notice Hosts many independent Shatter pieces under one contract. Each piece is a 1/1 that turns into carbon-copy editions upon shatter,
+///     and can be fused back into a 1/1, like ShatterV1.
+/// @dev token ids are namespaced by piece: bits [128..255] hold the piece id and bits [0..127] the edition, where edition 0 is the 1/1
+/// @dev pieces can't be reshattered, so editions left in `_owners` after a fuse are never read again and no epoch is needed
+/// @author transientlabs.xyz
+
+pragma solidity 0.8.14;
+
+import "./ShatterERC721.sol";
+
+contract ShatterCollection is ShatterERC721 {
+    using Strings for uint256;
+
+    // state read by every ownerOf, transfer and approval of a piece, packed so that it costs a single SLOAD
+    struct PieceState {
+        address shatterAddress;
+        uint64 shatters;
+        uint8 flags;
+    }
+
+    // settings only read on shatter, kept out of the hot slot
+    struct PieceConfig {
+        uint64 minShatters;
+        uint64 maxShatters;
+        uint64 shatterTime;
+    }
+
+    uint256 private constant _PIECE_SHIFT = 128;
+
+    uint256 public numPieces;
+    uint256 private _supply;
+    mapping(uint256 => PieceState) private _pieceStates;
+    mapping(uint256 => PieceConfig) private _pieceConfigs;
+    // number of editions of a piece held by an address, kept apart from `balanceOf` so fuse doesn't have to walk every edition
+    mapping(uint256 => mapping(address => uint256)) private _pieceBalances;
+
+    event PieceAdded(uint256 indexed pieceId, uint256 minShatters, uint256 maxShatters, uint256 shatterTime);
+    event Shattered(uint256 indexed pieceId, address indexed user, uint256 indexed numShatters, uint256 shatteredTime);
+    event Fused(uint256 indexed pieceId, address indexed user, uint256 fuseTime);
+
+    /// @param name is the name of the collection
+    /// @param symbol is the symbol
+    /// @param royaltyRecipient is the royalty recipient
+    /// @param royaltyPercentage is the royalty percentage to set
+    /// @param admin is the admin address
+    constructor (
+        string memory name,
+        string memory symbol,
+        address royaltyRecipient,
+        uint256 royaltyPercentage,
+        address admin
+    )
+        ERC721S(name, symbol)
+        EIP2981AllToken(royaltyRecipient, royaltyPercentage)
+        Ownable()
+    {
+        adminAddress = admin;
+    }
+
+    /// @notice function to add a piece to the collection and mint its 1/1 to the owner's address
+    /// @dev requires contract owner or admin
+    /// @dev only writes the piece settings and mints the 1/1, the shatter state of a new piece is all zeros
+    /// @dev using _mint function as owner() should always be an EOA or trusted entity that can receive ERC721 tokens
+    /// @param min is the minimum number of editions
+    /// @param max is the maximum number of editions
+    /// @param time is time after which replication can occur
+    /// @return pieceId is the id of the new piece
+    function addPiece(uint256 min, uint256 max, uint256 time) external adminOrOwner returns (uint256 pieceId) {
+        require(max <= type(uint64).max, "Max shatters must fit in 64 bits");
+        require(time <= type(uint64).max, "Shatter time must fit in 64 bits");
+        if (min < 1) {
+            min = 1;
+        }
+        require(min <= max, "Min shatters cannot be greater than max shatters");
+        pieceId = numPieces;
+        numPieces = pieceId + 1;
+        _pieceConfigs[pieceId] = PieceConfig(uint64(min), uint64(max), uint64(time));
+        _supply += 1;
+        _mint(owner(), pieceId << _PIECE_SHIFT);
+
+        emit PieceAdded(pieceId, min, max, time);
+    }
+
+    /// @notice function to get the token id of an edition of a piece
+    /// @param pieceId is the piece id
+    /// @param edition is the edition, 0 for the 1/1
+    function tokenIdOf(uint256 pieceId, uint256 edition) public pure returns (uint256) {
+        require(pieceId <= type(uint128).max && edition <= type(uint128).max, "Piece id and edition must fit in 128 bits");
+        return (pieceId << _PIECE_SHIFT) | edition;
+    }
+
+    /// @notice function to split a token id into its piece id and edition
+    /// @param tokenId is the token id
+    function pieceOf(uint256 tokenId) public pure returns (uint256 pieceId, uint256 edition) {
+        return (tokenId >> _PIECE_SHIFT, uint128(tokenId));
+    }
+
+    /// @notice function to get the settings of a piece
+    /// @param pieceId is the piece id
+    function pieceConfig(uint256 pieceId) external view returns (uint256 minShatters, uint256 maxShatters, uint256 shatterTime) {
+        PieceConfig memory config = _pieceConfigs[pieceId];
+        return (config.minShatters, config.maxShatters, config.shatterTime);
+    }
+
+    /// @notice function to get if a piece has been shattered
+    /// @param pieceId is the piece id
+    function isShattered(uint256 pieceId) public view returns (bool) {
+        return _pieceStates[pieceId].flags & _SHATTERED != 0;
+    }
+
+    /// @notice function to get if a piece has been fused
+    /// @param pieceId is the piece id
+    function isFused(uint256 pieceId) public view returns (bool) {
+        return _pieceStates[pieceId].flags & _FUSED != 0;
+    }
+
+    /// @notice function to get the number of editions of a piece
+    /// @param pieceId is the piece id
+    function shatters(uint256 pieceId) public view returns (uint256) {
+        return _pieceStates[pieceId].shatters;
+    }
+
+    /// @notice function for owner of the 1/1 of a piece to unlock it and turn it into editions
+    /// @dev requires msg.sender to be the owner of the 1/1
+    /// @dev requires a number of editions less than or equal to maxShatters or greater than or equal to minShatters
+    /// @dev requires the piece to not be shattered yet
+    /// @dev requires block timestamp to be greater than or equal to the shatter time of the piece
+    /// @dev purposefully not letting approved addresses shatter as we want owner to be the only one to shatter the token
+    /// @dev if number of editions == 1, fuse occurs at the same time
+    /// @param pieceId is the piece to shatter
+    /// @param numShatters is the total number of editions to make
+    function shatter(uint256 pieceId, uint256 numShatters) external {
+        address sender = _msgSender();
+        uint256 firstTokenId = pieceId << _PIECE_SHIFT;
+        PieceConfig memory config = _pieceConfigs[pieceId];
+        require(!isShattered(pieceId), "Already is shattered");
+        require(sender == ownerOf(firstTokenId), "Caller is not owner of the piece");
+        require(numShatters >= config.minShatters && numShatters <= config.maxShatters, "Cannot set number of editions above max or below the min");
+        require(block.timestamp >= config.shatterTime, "Cannot shatter prior to shatterTime");
+
+        if (numShatters > 1) {
+            _burn(firstTokenId);
+            _pieceStates[pieceId] = PieceState(sender, uint64(numShatters), _SHATTERED);
+            _supply += numShatters - 1;
+            _pieceBalances[pieceId][sender] = numShatters;
+            _batchMint(sender, firstTokenId + 1, numShatters);
+            emit Shattered(pieceId, sender, numShatters, block.timestamp);
+        } else {
+            _pieceStates[pieceId] = PieceState(address(0), 1, _SHATTERED | _FUSED);
+            emit Shattered(pieceId, sender, numShatters, block.timestamp);
+            emit Fused(pieceId, sender, block.timestamp);
+            emit MetadataUpdate(firstTokenId);
+        }
+    }
+
+    /// @notice function to fuse the editions of a piece back into a 1/1
+    /// @dev requires msg.sender to own all of the editions of the piece
+    /// @dev can't have already fused
+    /// @dev must be shattered
+    /// @dev purposefully not letting approved addresses fuse as we want the owner to have only control over fusing
+    /// @dev ownership of the editions is checked against the per-piece balance of msg.sender, so fuse costs the same for any number of editions
+    /// @param pieceId is the piece to fuse
+    function fuse(uint256 pieceId) external {
+        PieceState memory state = _pieceStates[pieceId];
+        require(state.flags & _FUSED == 0, "Already is fused");
+        require(state.flags & _SHATTERED != 0, "Can't fuse if not already shattered");
+        address sender = _msgSender();
+        require(_pieceBalances[pieceId][sender] == state.shatters, "Msg sender must own all editions");
+        uint256 firstTokenId = pieceId << _PIECE_SHIFT;
+
+        _pieceBalances[pieceId][sender] = 0;
+        _batchBurn(sender, firstTokenId + 1, state.shatters);
+        _pieceStates[pieceId] = PieceState(state.shatterAddress, 1, _SHATTERED | _FUSED);
+        _supply = _supply + 1 - state.shatters;
+        _mint(sender, firstTokenId);
+
+        emit Fused(pieceId, sender, block.timestamp);
+    }
+
+    /// @notice function to get the number of tokens in existence across every piece
+    function totalSupply() public view override returns (uint256) {
+        return _supply;
+    }
+
+    /// @notice function to get the owners of `count` consecutive tokens starting at `startTokenId`
+    /// @dev tokens that don't exist are reported as owned by the zero address
+    /// @dev the range must stay within one piece, as the ids between the editions of two pieces never exist
+    function ownersOfRange(uint256 startTokenId, uint256 count) public view override returns (address[] memory owners) {
+        require(uint256(uint128(startTokenId)) + count <= 1 << _PIECE_SHIFT, "Range must stay within one piece");
+        owners = new address[](count);
+        for (uint256 i = 0; i < count; i++) {
+            (owners[i], ) = _ownershipOf(startTokenId + i);
+        }
+    }
+
+    /// @notice function to get the tokens owned by `owner` among the `limit` token ids starting at `cursor`, and the cursor to continue from
+    /// @dev only the ids that can exist are scanned and counted against `limit`: editions 1 -> shatters of a shattered piece,
+    ///     otherwise the 1/1. The scan moves on to the next piece after the last of them
+    /// @dev a cursor of 0 starts from the first token, and the returned cursor is 0 once every piece has been scanned
+    function tokensOfOwner(
+        address owner,
+        uint256 cursor,
+        uint256 limit
+    ) public view override returns (uint256[] memory tokenIds, uint256 nextCursor) {
+        require(limit > 0, "Limit must be greater than 0");
+        uint256[] memory found = new uint256[](limit < _supply ? limit : _supply);
+        uint256 numFound;
+        uint256 scanned;
+        uint256 pieceId = cursor >> _PIECE_SHIFT;
+        uint256 edition = uint128(cursor);
+        uint256 pieces = numPieces;
+        while (pieceId < pieces) {
+            (uint256 first, uint256 last) = _editionRange(pieceId);
+            if (edition < first) {
+                edition = first;
+            }
+            for (; edition <= last && scanned < limit; edition++) {
+                uint256 tokenId = (pieceId << _PIECE_SHIFT) | edition;
+                (address tokenOwner, ) = _ownershipOf(tokenId);
+                if (tokenOwner == owner) {
+                    found[numFound] = tokenId;
+                    numFound++;
+                }
+                scanned++;
+            }
+            if (edition <= last) {
+                nextCursor = (pieceId << _PIECE_SHIFT) | edition;
+                break;
+            }
+            pieceId++;
+            edition = 0;
+        }
+        tokenIds = new uint256[](numFound);
+        for (uint256 i = 0; i < numFound; i++) {
+            tokenIds[i] = found[i];
+        }
+    }
+
+    /// @notice function to get the token uri
+    /// @dev `<base uri><piece id>/<edition>`, so metadata can be laid out per piece
+    function tokenURI(uint256 tokenId) public view override returns (string memory) {
+        _requireMinted(tokenId);
+        (uint256 pieceId, uint256 edition) = pieceOf(tokenId);
+        string memory baseUri = _baseURI();
+        return bytes(baseUri).length > 0 ? string(abi.encodePacked(baseUri, pieceId.toString(), "/", edition.toString())) : "";
+    }
+
+    /// @notice function to override _ownershipOf in ERC721S, which backs ownerOf, approve, transfers and burns
+    /// @dev if the piece is shattered and not fused, checks to see if that edition has been transferred or if it belongs to the shatter address.
+    ///     Otherwise, only the 1/1 can exist and the result comes from ERC721S.
+    /// @dev reports missing tokens instead of reverting, so the bulk views in ERC721S can scan across pieces
+    function _ownershipOf(uint256 tokenId) internal view virtual override(ERC721S) returns (address, bool) {
+        (uint256 pieceId, uint256 edition) = pieceOf(tokenId);
+        PieceState memory state = _pieceStates[pieceId];
+        if (state.flags & (_SHATTERED | _FUSED) == _SHATTERED) {
+            if (edition > 0 && edition <= state.shatters) {
+                address owner = _ownerAt(tokenId);
+                if (owner == address(0)) {
+                    return (state.shatterAddress, true);
+                } else {
+                    return (owner, true);
+                }
+            }
+            return (address(0), false);
+        } else if (edition == 0) {
+            return ERC721S._ownershipOf(tokenId);
+        } else {
+            return (address(0), false);
+        }
+    }
+
+    /// @notice override _afterTokenTransfer() function from ERC721S
+    /// @dev moves the edition between the per-piece balances. Only the 1/1 is ever minted or burned one token at a time
+    function _afterTokenTransfer(address from, address to, uint256 tokenId) internal override {
+        (uint256 pieceId, uint256 edition) = pieceOf(tokenId);
+        if (edition > 0) {
+            _pieceBalances[pieceId][from] -= 1;
+            _pieceBalances[pieceId][to] += 1;
+        }
+    }
+
+    /// @notice function to override the _exists function in ERC721S
+    function _exists(uint256 tokenId) internal view virtual override(ERC721S) returns (bool) {
+        (, bool exists) = _ownershipOf(tokenId);
+        return exists;
+    }
+
+    /// @notice override _tokenIdRange() function from ERC721S
+    /// @dev covers every token id of every piece. Most ids in the range don't exist, so `totalSupply` is tracked separately
+    ///     and `ownersOfRange` and `tokensOfOwner` are overridden to not walk the range one id at a time
+    function _tokenIdRange() internal view override returns (uint256, uint256) {
+        return (0, numPieces << _PIECE_SHIFT);
+    }
+
+    /// @notice function to get the first and last edition of a piece that can exist
+    /// @dev editions 1 -> shatters while shattered and not fused, otherwise only the 1/1
+    function _editionRange(uint256 pieceId) internal view returns (uint256 first, uint256 last) {
+        PieceState memory state = _pieceStates[pieceId];
+        if (state.flags & (_SHATTERED | _FUSED) == _SHATTERED) {
+            return (1, state.shatters);
+        }
+        return (0, 0);
+    }
+}
@@ -29,8 +29,8 @@ _____/\\\\\\\\\\\____/\\\_______________________________________________________
 import "chiru-labs/ERC721A-Upgradeable@4.1.0/contracts/ERC721AUpgradeable.sol";
 import "Transient-Labs/tl-contract-kit@3.0.0/contracts/royalty/EIP2981AllToken.sol";
 import "OpenZeppelin/openzeppelin-contracts-upgradeable@4.7.0/contracts/access/OwnableUpgradeable.sol";
-import "OpenZeppelin/openzeppelin-contracts-upgradeable@4.7.0/contracts/utils/Base64Upgradeable.sol";
 import "OpenZeppelin/openzeppelin-contracts-upgradeable@4.7.0/contracts/utils/StringsUpgradeable.sol";
+import "../MetadataRenderer.sol";
 
 contract ShatterCoreV1 is ERC721AUpgradeable, EIP2981AllToken, OwnableUpgradeable {
     using StringsUpgradeable for uint256;
@@ -48,10 +48,29 @@ contract ShatterCoreV1 is ERC721AUpgradeable, EIP2981AllToken, OwnableUpgradeabl
     string private description;
     string[] private traitNames;
     string[] private traitValues;
+    uint256 private burnedEndIndex;
+    uint256 public batchSize;
+    uint256 public pendingShatters;
+    bool public isFusing;
+    address private shatterAddress;
+    uint256 public checkpointInterval;
+    address private metadataTemplate;
+    uint48 private templateNameEnd;
+    uint48 private templateBodyEnd;
+    address[] private traitTemplates;
 
     event Shattered(address indexed _user, uint256 indexed _numShatters, uint256 indexed _shatterTime);
     event Fused(address indexed _user, uint256 indexed _fuseTime);
 
+    /// @dev EIP-4906 metadata update events
+    event MetadataUpdate(uint256 _tokenId);
+    event BatchMetadataUpdate(uint256 _fromTokenId, uint256 _toTokenId);
+
+    bytes4 private constant _INTERFACE_ID_ERC4906 = 0x49064906;
+
+    // EIP-170 limit on the code size of a contract, which caps the size of a template behind its STOP prefix
+    uint256 private constant _MAX_CODE_SIZE = 24576;
+
     modifier adminOrOwner {
         require(msg.sender == admin || msg.sender == owner(), "Address not admin or owner");
         _;
@@ -71,6 +90,26 @@ contract ShatterCoreV1 is ERC721AUpgradeable, EIP2981AllToken, OwnableUpgradeabl
         uint256 _minShatters, uint256 _maxShatters, uint256 _shatterTime)
         public initializerERC721A initializer
     {   
+        _initialize(_name, _symbol, _royaltyRecipient, _royaltyPercentage, _admin, _minShatters, _maxShatters, _shatterTime, 0);
+    }
+
+    /// @notice function to initialize the contract with ownership checkpoints
+    /// @dev same as the other initialize function, which is kept for creators deployed against it
+    /// @param _checkpointInterval is the number of editions between packed ownership checkpoints written on shatter. 0 writes a single one
+    function initialize(string memory _name, string memory _symbol,
+        address _royaltyRecipient, uint256 _royaltyPercentage, address _admin,
+        uint256 _minShatters, uint256 _maxShatters, uint256 _shatterTime, uint256 _checkpointInterval)
+        public initializerERC721A initializer
+    {
+        _initialize(_name, _symbol, _royaltyRecipient, _royaltyPercentage, _admin, _minShatters, _maxShatters, _shatterTime, _checkpointInterval);
+    }
+
+    /// @notice function to set up the contract state from either initialize function
+    function _initialize(string memory _name, string memory _symbol,
+        address _royaltyRecipient, uint256 _royaltyPercentage, address _admin,
+        uint256 _minShatters, uint256 _maxShatters, uint256 _shatterTime, uint256 _checkpointInterval)
+        internal
+    {
         __ERC721A_init(_name, _symbol);
         __Ownable_init();
         royaltyAddr = _royaltyRecipient;
@@ -83,6 +122,7 @@ contract ShatterCoreV1 is ERC721AUpgradeable, EIP2981AllToken, OwnableUpgradeabl
         }
         maxShatters = _maxShatters;
         shatterTime = _shatterTime;
+        checkpointInterval = _checkpointInterval;
     }
 
     /// @notice function to change the royalty info
@@ -102,11 +142,22 @@ contract ShatterCoreV1 is ERC721AUpgradeable, EIP2981AllToken, OwnableUpgradeabl
         admin = _admin;
     }
 
+    /// @notice function to process shatter and fuse in batches
+    /// @dev requires owner or admin
+    /// @dev can't be changed while a shatter or fuse is in progress
+    /// @param _batchSize is the maximum number of editions minted or burned per transaction. 0 processes everything at once
+    function setBatchSize(uint256 _batchSize) external adminOrOwner {
+        require(pendingShatters == 0, "Shatter or fuse in progress");
+        batchSize = _batchSize;
+    }
+
     /// @notice function to set the piece description
     /// @dev requires owner or admin
     /// @param _description is the new description
     function setDescription(string calldata _description) external adminOrOwner {
         description = _description;
+        _writeMetadataTemplate();
+        _emitMetadataUpdate();
     }
 
     /// @notice function to set the piece image
@@ -114,6 +165,8 @@ contract ShatterCoreV1 is ERC721AUpgradeable, EIP2981AllToken, OwnableUpgradeabl
     /// @param _image is the new image
     function setImage(string calldata _image) external onlyOwner {
         image = _image;
+        _writeMetadataTemplate();
+        _emitMetadataUpdate();
     }
 
     /// @notice function to set the piece aniumation url
@@ -121,6 +174,8 @@ contract ShatterCoreV1 is ERC721AUpgradeable, EIP2981AllToken, OwnableUpgradeabl
     /// @param _animation is the new image
     function setAnimation(string calldata _animation) external onlyOwner {
         animationUrl = _animation;
+        _writeMetadataTemplate();
+        _emitMetadataUpdate();
     }
 
     /// @notice function to set the traits
@@ -131,6 +186,55 @@ contract ShatterCoreV1 is ERC721AUpgradeable, EIP2981AllToken, OwnableUpgradeabl
         require(_traitNames.length == _traitValues.length, "Array lengths must be equal");
         traitNames = _traitNames;
         traitValues = _traitValues;
+        _writeTraitTemplates();
+        _emitMetadataUpdate();
+    }
+
+    /// @notice function to change a single trait
+    /// @dev requires owner or admin
+    /// @dev only the storage and template of the trait at `index` are rewritten
+    /// @param index is the index of the trait to change
+    /// @param _traitName is the new name of the trait
+    /// @param _traitValue is the new value of the trait
+    function setTrait(uint256 index, string calldata _traitName, string calldata _traitValue) external adminOrOwner {
+        require(index < traitNames.length, "Trait index out of bounds");
+        traitNames[index] = _traitName;
+        traitValues[index] = _traitValue;
+        traitTemplates[index] = _writeTraitTemplate(index);
+        _emitMetadataUpdate();
+    }
+
+    /// @notice function to add traits after the existing ones
+    /// @dev requires owner or admin
+    /// @param _traitNames are the names of the traits to add
+    /// @param _traitValues are the values of each trait to add, index paired
+    function appendTraits(string[] calldata _traitNames, string[] calldata _traitValues) external adminOrOwner {
+        require(_traitNames.length == _traitValues.length, "Array lengths must be equal");
+        for (uint256 i; i < _traitNames.length; i++) {
+            traitNames.push(_traitNames[i]);
+            traitValues.push(_traitValues[i]);
+            traitTemplates.push(_writeTraitTemplate(traitNames.length - 1));
+        }
+        _emitMetadataUpdate();
+    }
+
+    /// @notice function to remove a trait
+    /// @dev requires owner or admin
+    /// @dev the last trait is moved into the removed trait's place, so trait order is not preserved but the cost doesn't
+    ///     depend on the number of traits. Its template is moved rather than rewritten, as a template doesn't depend on the index of its trait
+    /// @param index is the index of the trait to remove
+    function removeTrait(uint256 index) external adminOrOwner {
+        require(index < traitNames.length, "Trait index out of bounds");
+        uint256 last = traitNames.length - 1;
+        if (index != last) {
+            traitNames[index] = traitNames[last];
+            traitValues[index] = traitValues[last];
+            traitTemplates[index] = traitTemplates[last];
+        }
+        traitNames.pop();
+        traitValues.pop();
+        traitTemplates.pop();
+        _emitMetadataUpdate();
     }
 
     /// @notice function for minting the 1/1 to the owner's address
@@ -148,6 +252,8 @@ contract ShatterCoreV1 is ERC721AUpgradeable, EIP2981AllToken, OwnableUpgradeabl
         animationUrl = _animationUrl;
         traitNames = _traitNames;
         traitValues = _traitValues;
+        _writeMetadataTemplate();
+        _writeTraitTemplates();
         shatters = 1;
         _mint(owner(), 1);
     }
@@ -159,6 +265,8 @@ contract ShatterCoreV1 is ERC721AUpgradeable, EIP2981AllToken, OwnableUpgradeabl
     /// @dev requires block timestamp to be greater than or equal to shatterTime
     /// @dev purposefully not letting approved addresses shatter as we want owner to be the only one to shatter the token
     /// @dev if number of editions == 1, fuse occurs at the same time
+    /// @dev if batchSize is set, only the first batch is minted and the rest is minted through `continueShatter`.
+    ///     Editions already minted can be transferred while the shatter is in progress.
     /// @param _shatters is the total number of editions to make. Can be set between minShatters and maxShatters. This number is the total number of editions that will live on this contract
     function shatter(uint256 _shatters) external {
         require(!isShattered, "Already is shattered");
@@ -167,94 +275,317 @@ contract ShatterCoreV1 is ERC721AUpgradeable, EIP2981AllToken, OwnableUpgradeabl
         require(block.timestamp >= shatterTime, "Cannot shatter prior to shatterTime");
 
         isShattered = true;
-        shatters = _shatters;
         if (_shatters > 1) {
             shatterStartIndex = 1;
             _burn(0);
-            _mint(msg.sender, _shatters);
-            emit Shattered(msg.sender, _shatters, block.timestamp);
+            shatters = 0;
+            pendingShatters = _shatters;
+            shatterAddress = msg.sender;
+            _shatterBatch();
         } else {
+            shatters = _shatters;
             isFused = true;
             emit Shattered(msg.sender, _shatters, block.timestamp);
             emit Fused(msg.sender, block.timestamp);
+            emit MetadataUpdate(0);
         }
     }
 
+    /// @notice function to mint the next batch of a shatter in progress
+    /// @dev anyone can push a shatter forward as the remaining editions always go to the shatter executor
+    function continueShatter() external {
+        require(pendingShatters > 0 && !isFusing, "No shatter in progress");
+        _shatterBatch();
+    }
+
     /// @notice function to fuse editions back into a 1/1
     /// @dev requires msg.sender to own all of the editions
     /// @dev can't have already fused
     /// @dev must be shattered
     /// @dev purposefully not letting approved addresses fuse as we want the owner to have only control over fusing
+    /// @dev the supply while shattered is exactly `shatters`, so a balance equal to `shatters` proves ownership of every edition
+    ///     without walking the packed ownerships for each one
+    /// @dev if batchSize is set, only the first batch is burned and the rest is burned through `continueFuse`.
+    ///     Editions are locked until the fuse completes.
     function fuse() external {
         require(!isFused, "Already is fused");
         require(isShattered, "Can't fuse if not already shattered");
-        for (uint256 i = shatterStartIndex; i < shatterStartIndex + shatters; i++) {
-            require(msg.sender == ownerOf(i), "Msg sender must own all editions");
-            _burn(i);
-        }
-        isFused = true;
-        shatters = 1;
-        _mint(msg.sender, 1);
+        require(pendingShatters == 0, "Shatter or fuse in progress");
+        require(balanceOf(msg.sender) == shatters, "Msg sender must own all editions");
+        shatterAddress = msg.sender;
+        isFusing = true;
+        pendingShatters = shatters;
+        burnedEndIndex = shatterStartIndex;
+        _fuseBatch();
+    }
 
-        emit Fused(msg.sender, block.timestamp);
+    /// @notice function to burn the next batch of a fuse in progress
+    /// @dev anyone can push a fuse forward as the fuser already proved ownership of every edition
+    function continueFuse() external {
+        require(isFusing, "No fuse in progress");
+        _fuseBatch();
     }
 
     /// @notice function to override tokenURI
+    /// @dev the JSON that is the same for every token is read from the metadata template, only the name suffix and the
+    ///     edition and shatter/fuse attributes are rendered per call
+    /// @dev templates that were too large to be stored as code are rendered from storage instead
     function tokenURI(uint256 tokenId) override public view returns(string memory) {
         require(_exists(tokenId), "URI query for nonexistent token");
-        string memory name = name();
-        string memory attr = "[";
-        string memory shatterStr = "No";
-        string memory fuseStr = "No";
-        for (uint256 i; i < traitNames.length; i++) {
-            attr = string(abi.encodePacked(attr, '{"trait_type": "', traitNames[i], '", "value": "', traitValues[i], '"},'));
-        }
+        string memory nameSuffix;
+        string memory attr;
         if (shatters > 1) {
-            shatterStr = "Yes";
-            name = string(abi.encodePacked(name, ' #', tokenId.toString(), '/', shatters.toString()));
-            attr = string(abi.encodePacked(attr, '{"trait_type": "Edition", "value": "', tokenId.toString(), '"},{"trait_type": "Shattered", "value": "', shatterStr, '"},{"trait_type": "Fused", "value": "', fuseStr, '"}'));
+            nameSuffix = string(abi.encodePacked(' #', tokenId.toString(), '/', shatters.toString()));
+            attr = string(abi.encodePacked('{"trait_type": "Edition", "value": "', tokenId.toString(), '"},{"trait_type": "Shattered", "value": "Yes"},{"trait_type": "Fused", "value": "No"}'));
         } else {
+            string memory shatterStr = "No";
+            string memory fuseStr = "No";
             if (isShattered) {
                 shatterStr = "Yes";
             }
             if (isFused) {
                 fuseStr = "Yes";
             }
-            attr = string(abi.encodePacked(attr, '{"trait_type": "Shattered", "value": "', shatterStr, '"},{"trait_type": "Fused", "value": "', fuseStr, '"}'));
+            attr = string(abi.encodePacked('{"trait_type": "Shattered", "value": "', shatterStr, '"},{"trait_type": "Fused", "value": "', fuseStr, '"}'));
         }
-        attr = string(abi.encodePacked(attr, "]"));
+        address template = metadataTemplate;
+        uint256 nameEnd = templateNameEnd;
+        uint256 bodyEnd = templateBodyEnd;
+        uint256 numTraits = traitTemplates.length;
+        bytes[] memory parts = new bytes[](5 + numTraits);
+        if (template == address(0)) {
+            bytes[] memory templateParts = _metadataTemplateParts();
+            parts[0] = abi.encodePacked(templateParts[0], templateParts[1]);
+            parts[2] = templateParts[2];
+            parts[4 + numTraits] = templateParts[3];
+        } else {
+            parts[0] = _readMetadataTemplate(template, 0, nameEnd);
+            parts[2] = _readMetadataTemplate(template, nameEnd, bodyEnd);
+            parts[4 + numTraits] = _readMetadataTemplate(template, bodyEnd, template.code.length - 1);
+        }
+        parts[1] = bytes(nameSuffix);
+        for (uint256 i; i < numTraits; i++) {
+            address traitTemplate = traitTemplates[i];
+            if (traitTemplate == address(0)) {
+                parts[3 + i] = MetadataRenderer.concat(_traitTemplateParts(i));
+            } else {
+                parts[3 + i] = _readMetadataTemplate(traitTemplate, 0, traitTemplate.code.length - 1);
+            }
+        }
+        parts[3 + numTraits] = bytes(attr);
+        return MetadataRenderer.jsonDataURI(parts);
+    }
+
+    /// @notice function to override ownerOf in ERC721AUpgradeable
+    /// @dev editions burned by fuse still have packed ownerships, so they are filtered out here
+    function ownerOf(uint256 tokenId) public view virtual override returns (address) {
+        if (_isLazilyBurned(tokenId)) revert OwnerQueryForNonexistentToken();
+        return ERC721AUpgradeable.ownerOf(tokenId);
+    }
+
+    /// @notice function to override _exists in ERC721AUpgradeable
+    function _exists(uint256 tokenId) internal view virtual override returns (bool) {
+        return !_isLazilyBurned(tokenId) && ERC721AUpgradeable._exists(tokenId);
+    }
+
+    /// @notice function to override _beforeTokenTransfers in ERC721AUpgradeable
+    /// @dev blocks transfers of editions burned by fuse, as ERC721A reads the stale packed ownership directly
+    /// @dev editions are locked while a fuse is in progress
+    function _beforeTokenTransfers(address from, address to, uint256 startTokenId, uint256 quantity) internal virtual override {
+        require(!isFusing, "Fuse in progress");
+        if (from != address(0) && _isLazilyBurned(startTokenId)) revert OwnerQueryForNonexistentToken();
+        ERC721AUpgradeable._beforeTokenTransfers(from, to, startTokenId, quantity);
+    }
+
+    /// @notice function to mint the next batch of editions during shatter
+    /// @dev each batch is a separate ERC721A mint, the token ids stay contiguous as nothing else mints in between
+    /// @dev editions from earlier batches show the number of editions in their name, so their metadata changes with every batch
+    function _shatterBatch() internal {
+        uint256 quantity = _nextBatch();
+        _mintWithCheckpoints(shatterAddress, quantity);
+        if (shatters > 0) {
+            emit BatchMetadataUpdate(shatterStartIndex, shatterStartIndex + shatters - 1);
+        }
+        shatters += quantity;
+        pendingShatters -= quantity;
+        if (pendingShatters == 0) {
+            emit Shattered(shatterAddress, shatters, block.timestamp);
+        }
+    }
+
+    /// @notice function to burn the next batch of editions during fuse
+    /// @dev editions are burned in increasing order from shatterStartIndex
+    function _fuseBatch() internal {
+        uint256 quantity = _nextBatch();
+        _burnRange(shatterAddress, burnedEndIndex, quantity);
+        pendingShatters -= quantity;
+        if (pendingShatters == 0) {
+            isFusing = false;
+            isFused = true;
+            shatters = 1;
+            _mint(shatterAddress, 1);
+
+            emit Fused(shatterAddress, block.timestamp);
+        }
+    }
+
+    /// @notice function to mint editions in chunks that end on multiples of checkpointInterval
+    /// @dev each ERC721A mint writes a packed ownership for its first token, so the first transfer of any edition
+    ///     walks back at most checkpointInterval - 1 uninitialized slots
+    function _mintWithCheckpoints(address to, uint256 quantity) internal {
+        uint256 interval = checkpointInterval;
+        if (interval == 0) {
+            _mint(to, quantity);
+            return;
+        }
+        while (quantity > 0) {
+            uint256 chunk = interval - (_nextTokenId() - shatterStartIndex) % interval;
+            if (chunk > quantity) {
+                chunk = quantity;
+            }
+            _mint(to, chunk);
+            quantity -= chunk;
+        }
+    }
+
+    /// @notice function to get the number of editions to process in the current transaction
+    function _nextBatch() internal view returns (uint256) {
+        if (batchSize != 0 && pendingShatters > batchSize) {
+            return batchSize;
+        }
+        return pendingShatters;
+    }
+
+    /// @notice function to burn a contiguous range of editions in a single pass
+    /// @dev the caller must have proven ownership of the whole range, which `fuse` does with the balance check
+    /// @dev ranges must be burned in order, starting at `shatterStartIndex` and ending at or before the last edition
+    /// @dev the packed ownerships are never read or written. Only the owner's address data and the burn counter are updated
+    ///     and the range is marked burned by `burnedEndIndex`, so the cost per edition is the Transfer event alone
+    function _burnRange(address from, uint256 startTokenId, uint256 quantity) internal {
+        require(startTokenId == burnedEndIndex, "Burn range must continue the previous range");
+        uint256 endTokenId = startTokenId + quantity;
+        require(endTokenId <= shatterStartIndex + shatters, "Burn range exceeds editions");
+        ERC721AStorage.Layout storage layout = ERC721AStorage.layout();
+        // balance lives in bits [0..63] and number burned in bits [128..191] of the packed address data
+        layout._packedAddressData[from] += (quantity << 128) - quantity;
+        layout._burnCounter += quantity;
+        burnedEndIndex = endTokenId;
+        for (uint256 i = startTokenId; i < endTokenId; i++) {
+            emit Transfer(from, address(0), i);
+        }
+    }
+
+    /// @notice function to render the JSON shared by every token and store it as contract code
+    /// @dev called whenever the name, description, image, or animation url change.
+    ///     The template is split in three around the per-token name suffix and the traits and per-token attributes,
+    ///     with the split points kept in storage
+    function _writeMetadataTemplate() internal {
+        bytes[] memory parts = _metadataTemplateParts();
+        metadataTemplate = _deployTemplate(parts);
+        templateNameEnd = uint48(parts[0].length + parts[1].length);
+        templateBodyEnd = uint48(parts[0].length + parts[1].length + parts[2].length);
+    }
+
+    /// @notice function to render the pieces of the JSON shared by every token from storage
+    function _metadataTemplateParts() internal view returns (bytes[] memory parts) {
+        parts = new bytes[](4);
+        parts[0] = unicode'{"name": "';
+        parts[1] = bytes(name());
+        parts[2] = abi.encodePacked(unicode'",', unicode'"description": "', description, '",', unicode'"attributes": ', "[");
         if (bytes(animationUrl).length == 0) {
-            return string(
-                abi.encodePacked(
-                    "data:application/json;base64,",
-                    Base64Upgradeable.encode(bytes(abi.encodePacked(
-                        unicode'{"name": "', name, '",',
-                        unicode'"description": "', description, '",',
-                        unicode'"attributes": ', attr, ',',
-                        '"image": "', image, '"}'
-                    )))
-                )
-            );
+            parts[3] = abi.encodePacked("],", '"image": "', image, '"}');
+        } else {
+            parts[3] = abi.encodePacked("],", '"image": "', image, '",', '"animation_url": "', animationUrl, '"}');
+        }
+    }
+
+    /// @notice function to render every trait into its own template
+    /// @dev each trait has a template so a single trait can be changed without rewriting the others
+    function _writeTraitTemplates() internal {
+        uint256 numTraits = traitNames.length;
+        while (traitTemplates.length > numTraits) {
+            traitTemplates.pop();
+        }
+        for (uint256 i; i < numTraits; i++) {
+            if (i < traitTemplates.length) {
+                traitTemplates[i] = _writeTraitTemplate(i);
+            } else {
+                traitTemplates.push(_writeTraitTemplate(i));
+            }
+        }
+    }
+
+    /// @notice function to render the trait at `index` and store it as contract code
+    /// @return the address of the trait template
+    function _writeTraitTemplate(uint256 index) internal returns (address) {
+        return _deployTemplate(_traitTemplateParts(index));
+    }
+
+    /// @notice function to render the pieces of the trait at `index` from storage
+    function _traitTemplateParts(uint256 index) internal view returns (bytes[] memory parts) {
+        parts = new bytes[](5);
+        parts[0] = '{"trait_type": "';
+        parts[1] = bytes(traitNames[index]);
+        parts[2] = '", "value": "';
+        parts[3] = bytes(traitValues[index]);
+        parts[4] = '"},';
+    }
+
+    /// @notice function to store the concatenated parts as the code of a new contract
+    /// @dev the code is prefixed with a STOP opcode so the template can never be called
+    /// @dev returns the zero address without deploying anything if the code would be over the EIP-170 limit,
+    ///     e.g. for an image or animation stored as a data URI. `tokenURI` then renders the template from storage
+    function _deployTemplate(bytes[] memory parts) internal returns (address template) {
+        bytes[] memory code = new bytes[](parts.length + 1);
+        // init code copies everything after its own 11 bytes into memory and returns it as the runtime code
+        code[0] = hex"600B5981380380925939F300";
+        uint256 codeSize = 1;
+        for (uint256 i; i < parts.length; i++) {
+            code[i + 1] = parts[i];
+            codeSize += parts[i].length;
+        }
+        if (codeSize > _MAX_CODE_SIZE) {
+            return address(0);
+        }
+        bytes memory creationCode = MetadataRenderer.concat(code);
+        assembly {
+            template := create(0, add(creationCode, 32), mload(creationCode))
+        }
+        require(template != address(0), "Metadata template deployment failed");
+    }
+
+    /// @notice function to read the bytes [start, end) of the metadata template
+    function _readMetadataTemplate(address template, uint256 start, uint256 end) internal view returns (bytes memory data) {
+        uint256 size = end - start;
+        data = new bytes(size);
+        assembly {
+            extcodecopy(template, add(data, 32), add(start, 1), size)
+        }
+    }
+
+    /// @notice function to tell indexers that the metadata of every existing token changed
+    /// @dev emits nothing before the piece is minted
+    function _emitMetadataUpdate() internal {
+        uint256 nextTokenId = _nextTokenId();
+        if (nextTokenId == _startTokenId()) {
+            return;
+        }
+        if (isShattered && !isFused) {
+            emit BatchMetadataUpdate(shatterStartIndex, shatterStartIndex + shatters - 1);
         } else {
-            return string(
-                abi.encodePacked(
-                    "data:application/json;base64,",
-                    Base64Upgradeable.encode(bytes(abi.encodePacked(
-                        unicode'{"name": "', name, '",',
-                        unicode'"description": "', description, '",',
-                        unicode'"attributes": ', attr, ',',
-                        '"image": "', image, '",',
-                        '"animation_url": "', animationUrl, '"}'
-                    )))
-                )
-            );
+            emit MetadataUpdate(nextTokenId - 1);
         }
     }
 
+    /// @notice function to check if a token was burned by fuse
+    function _isLazilyBurned(uint256 tokenId) internal view returns (bool) {
+        return tokenId >= shatterStartIndex && tokenId < burnedEndIndex;
+    }
+
     /// @notice overrides supportsInterface function
     /// @param interfaceId is supplied from anyone/contract calling this function, as defined in ERC 165
     /// @return boolean saying if this contract supports the interface or not
     function supportsInterface(bytes4 interfaceId) public view override(ERC721AUpgradeable, EIP2981AllToken) returns (bool) {
-        return ERC721AUpgradeable.supportsInterface(interfaceId) || EIP2981AllToken.supportsInterface(interfaceId);
+        return interfaceId == _INTERFACE_ID_ERC4906 || ERC721AUpgradeable.supportsInterface(interfaceId) || EIP2981AllToken.supportsInterface(interfaceId);
     }
 }
\ No newline at end of file
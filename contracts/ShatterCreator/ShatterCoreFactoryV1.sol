@@ -0,0 +1,70 @@
+// SPDX-License-Identifier: Apache-2.0
+
+/// @title Shatter Core Factory V1
+/// @notice Deploys ShatterCoreV1 pieces as EIP-1167 minimal clones at deterministic addresses
+/// @author transientlabs.xyz
+
+pragma solidity ^0.8.9;
+
+import "OpenZeppelin/openzeppelin-contracts@4.7.0/contracts/proxy/Clones.sol";
+import "../ShatterCore/ShatterCoreV1.sol";
+
+interface ShatterFactoryRegistry {
+    function registerFromFactory(address _deployer, address _contract, uint256 _version) external;
+}
+
+contract ShatterCoreFactoryV1 {
+
+    uint256 public constant VERSION = 1;
+    address public immutable implementation;
+    address public immutable registry;
+
+    event ShatterCreated(address indexed _deployer, address indexed _contract, bytes32 indexed _salt);
+
+    /// @param _implementation is the ShatterCoreV1 implementation to clone
+    /// @param _registry is the Shatter registry that trusts this factory
+    constructor(address _implementation, address _registry) {
+        implementation = _implementation;
+        registry = _registry;
+    }
+
+    /// @notice function to deploy, initialize, and register a new piece
+    /// @dev the clone address depends on msg.sender and `_salt`, so nobody else can take a predicted address
+    /// @dev ownership is handed to msg.sender once the clone is initialized
+    /// @param _salt is chosen by the deployer to pick the clone address
+    /// @param _name is the name of the contract and piece
+    /// @param _symbol is the symbol
+    /// @param _royaltyRecipient is the royalty recipient
+    /// @param _royaltyPercentage is the royalty percentage to set
+    /// @param _admin is the admin address
+    /// @param _minShatters is the minimum number of editions
+    /// @param _maxShatters is the maximum number of editions
+    /// @param _shatterTime is time after which replication can occur
+    /// @param _checkpointInterval is the number of editions between packed ownership checkpoints written on shatter
+    /// @return clone is the address of the new piece
+    function createShatter(bytes32 _salt, string calldata _name, string calldata _symbol,
+        address _royaltyRecipient, uint256 _royaltyPercentage, address _admin,
+        uint256 _minShatters, uint256 _maxShatters, uint256 _shatterTime, uint256 _checkpointInterval)
+        external returns (address clone)
+    {
+        clone = Clones.cloneDeterministic(implementation, _deployerSalt(msg.sender, _salt));
+        ShatterCoreV1 piece = ShatterCoreV1(clone);
+        piece.initialize(_name, _symbol, _royaltyRecipient, _royaltyPercentage, _admin, _minShatters, _maxShatters, _shatterTime, _checkpointInterval);
+        piece.transferOwnership(msg.sender);
+        ShatterFactoryRegistry(registry).registerFromFactory(msg.sender, clone, VERSION);
+
+        emit ShatterCreated(msg.sender, clone, _salt);
+    }
+
+    /// @notice function to get the address a piece will be deployed to
+    /// @param _deployer is the address that will call `createShatter`
+    /// @param _salt is the salt that will be passed to `createShatter`
+    function predictShatterAddress(address _deployer, bytes32 _salt) external view returns (address) {
+        return Clones.predictDeterministicAddress(implementation, _deployerSalt(_deployer, _salt));
+    }
+
+    /// @notice function to bind a salt to its deployer
+    function _deployerSalt(address _deployer, bytes32 _salt) internal pure returns (bytes32) {
+        return keccak256(abi.encodePacked(_deployer, _salt));
+    }
+}
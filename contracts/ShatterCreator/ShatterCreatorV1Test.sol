@@ -18,12 +18,13 @@ contract ShatterCreatorV1Test is ERC1967Proxy {
     /// @param _minShatters is the minimum number of editions
     /// @param _maxShatters is the maximum number of editions
     /// @param _shatterTime is time after which replication can occur
+    /// @param _checkpointInterval is the number of editions between ownership checkpoints written on shatter
     constructor(address _impAddr, string memory _name, string memory _symbol,
         address _royaltyRecipient, uint256 _royaltyPercentage, address _admin,
-        uint256 _minShatters, uint256 _maxShatters, uint256 _shatterTime)
+        uint256 _minShatters, uint256 _maxShatters, uint256 _shatterTime, uint256 _checkpointInterval)
         ERC1967Proxy(_impAddr, abi.encodeWithSignature(
-            "initialize(string,string,address,uint256,address,uint256,uint256,uint256)",
-            _name, _symbol, _royaltyRecipient, _royaltyPercentage, _admin,  _minShatters, _maxShatters, _shatterTime))
+            "initialize(string,string,address,uint256,address,uint256,uint256,uint256,uint256)",
+            _name, _symbol, _royaltyRecipient, _royaltyPercentage, _admin,  _minShatters, _maxShatters, _shatterTime, _checkpointInterval))
         {
         }
 }
\ No newline at end of file
@@ -0,0 +1,108 @@
+// SPDX-License-Identifier: Apache-2.0
+
+/// @title Shatter Factory V1
+/// @notice Deploys ShatterV1, ShatterV2 and ShatterV3 pieces as EIP-1167 minimal clones at deterministic addresses
+/// @author transientlabs.xyz
+
+pragma solidity 0.8.14;
+
+import "OpenZeppelin/openzeppelin-contracts@4.7.0/contracts/proxy/Clones.sol";
+import "../ShatterV1.sol";
+import "../ShatterV2.sol";
+import "../ShatterV3.sol";
+
+contract ShatterFactoryV1 {
+
+    address public immutable shatterV1;
+    address public immutable shatterV2;
+    address public immutable shatterV3;
+
+    event ShatterCreated(address indexed _deployer, address indexed _contract, bytes32 indexed _salt);
+
+    /// @param _shatterV1 is the ShatterV1 implementation to clone
+    /// @param _shatterV2 is the ShatterV2 implementation to clone
+    /// @param _shatterV3 is the ShatterV3 implementation to clone
+    constructor(address _shatterV1, address _shatterV2, address _shatterV3) {
+        shatterV1 = _shatterV1;
+        shatterV2 = _shatterV2;
+        shatterV3 = _shatterV3;
+    }
+
+    /// @notice function to deploy and initialize a new ShatterV1 piece owned by msg.sender
+    /// @dev the clone address depends on msg.sender and `_salt`, so nobody else can take a predicted address
+    /// @param _salt is chosen by the deployer to pick the clone address
+    /// @param _name is the name of the contract and piece
+    /// @param _symbol is the symbol
+    /// @param _royaltyRecipient is the royalty recipient
+    /// @param _royaltyPercentage is the royalty percentage to set
+    /// @param _admin is the admin address
+    /// @param _min is the minimum number of editions
+    /// @param _max is the maximum number of editions
+    /// @param _time is time after which replication can occur
+    /// @return clone is the address of the new piece
+    function createShatterV1(bytes32 _salt, string memory _name, string memory _symbol,
+        address _royaltyRecipient, uint256 _royaltyPercentage, address _admin,
+        uint256 _min, uint256 _max, uint256 _time)
+        external returns (address clone)
+    {
+        clone = Clones.cloneDeterministic(shatterV1, _deployerSalt(msg.sender, _salt));
+        ShatterV1(clone).initialize(msg.sender, _name, _symbol, _royaltyRecipient, _royaltyPercentage, _admin, _min, _max, _time);
+
+        emit ShatterCreated(msg.sender, clone, _salt);
+    }
+
+    /// @notice function to deploy and initialize a new ShatterV2 piece owned by msg.sender
+    /// @dev the clone address depends on msg.sender and `_salt`, so nobody else can take a predicted address
+    /// @param _salt is chosen by the deployer to pick the clone address
+    /// @param _name is the name of the contract
+    /// @param _symbol is the contract symbol
+    /// @param _royaltyRecipient is the royalty recipient
+    /// @param _royaltyPercentage is the royalty percentage to set
+    /// @param _admin is the admin address
+    /// @param _num is the number of shatters that will happen
+    /// @param _time is time after which shatter can occur
+    /// @return clone is the address of the new piece
+    function createShatterV2(bytes32 _salt, string memory _name, string memory _symbol,
+        address _royaltyRecipient, uint256 _royaltyPercentage, address _admin, uint256 _num, uint256 _time)
+        external returns (address clone)
+    {
+        clone = Clones.cloneDeterministic(shatterV2, _deployerSalt(msg.sender, _salt));
+        ShatterV2(clone).initialize(msg.sender, _name, _symbol, _royaltyRecipient, _royaltyPercentage, _admin, _num, _time);
+
+        emit ShatterCreated(msg.sender, clone, _salt);
+    }
+
+    /// @notice function to deploy and initialize a new ShatterV3 piece owned by msg.sender
+    /// @dev the clone address depends on msg.sender and `_salt`, so nobody else can take a predicted address
+    /// @param _salt is chosen by the deployer to pick the clone address
+    /// @param _name is the name of the contract
+    /// @param _symbol is the contract symbol
+    /// @param _royaltyRecipient is the royalty recipient
+    /// @param _royaltyPercentage is the royalty percentage to set
+    /// @param _admin is the admin address
+    /// @param _num is the number of shatters that will happen
+    /// @param _time is time after which shatter can occur
+    /// @return clone is the address of the new piece
+    function createShatterV3(bytes32 _salt, string memory _name, string memory _symbol,
+        address _royaltyRecipient, uint256 _royaltyPercentage, address _admin, uint256 _num, uint256 _time)
+        external returns (address clone)
+    {
+        clone = Clones.cloneDeterministic(shatterV3, _deployerSalt(msg.sender, _salt));
+        ShatterV3(clone).initialize(msg.sender, _name, _symbol, _royaltyRecipient, _royaltyPercentage, _admin, _num, _time);
+
+        emit ShatterCreated(msg.sender, clone, _salt);
+    }
+
+    /// @notice function to get the address a piece will be deployed to
+    /// @param _implementation is the implementation that will be cloned, one of `shatterV1`, `shatterV2` or `shatterV3`
+    /// @param _deployer is the address that will call the create function
+    /// @param _salt is the salt that will be passed to the create function
+    function predictShatterAddress(address _implementation, address _deployer, bytes32 _salt) external view returns (address) {
+        return Clones.predictDeterministicAddress(_implementation, _deployerSalt(_deployer, _salt));
+    }
+
+    /// @notice function to bind a salt to its deployer
+    function _deployerSalt(address _deployer, bytes32 _salt) internal pure returns (bytes32) {
+        return keccak256(abi.encodePacked(_deployer, _salt));
+    }
+}
@@ -0,0 +1,84 @@
+// SPDX-License-Identifier: Apache-2.0
+
+/// @title Shatter ERC721
+/// @notice Base uri and batch mint logic shared by every ERC721S shatter contract, on top of the admin and royalty logic in ShatterAdmin
+/// @dev inherited by ShatterBase for ShatterV1, ShatterV2 and ShatterV3, and by ShatterCollection
+/// @author transientlabs.xyz
+
+pragma solidity 0.8.14;
+
+import "./ERC721S.sol";
+import "./ShatterAdmin.sol";
+
+abstract contract ShatterERC721 is ERC721S, ShatterAdmin {
+
+    // flags in the packed shatter state of a piece
+    uint8 internal constant _SHATTERED = 1;
+    uint8 internal constant _FUSED = 1 << 1;
+    uint8 internal constant _FUSING = 1 << 2;
+    uint8 internal constant _RANGES = 1 << 3;
+
+    bool public useConsecutiveTransfer;
+    string private _baseUri;
+
+    /// @notice function to opt in or out of EIP-2309 batch events
+    /// @dev requires owner
+    /// @dev when enabled, shatter and fuse emit a single `ConsecutiveTransfer` for the minted or burned range instead of one `Transfer` per token
+    /// @param enabled is a boolean indicating if `ConsecutiveTransfer` should be used
+    function setConsecutiveTransfer(bool enabled) external onlyOwner {
+        useConsecutiveTransfer = enabled;
+    }
+
+    /// @notice function to set base uri
+    /// @dev requires owner
+    /// @dev emits an EIP-4906 `BatchMetadataUpdate` for every existing token
+    /// @param newUri is the new base uri
+    function setBaseURI(string memory newUri) public onlyOwner {
+        _setBaseUri(newUri);
+        _emitBatchMetadataUpdate();
+    }
+
+    /// @notice overrides supportsInterface function
+    /// @param interfaceId is supplied from anyone/contract calling this function, as defined in ERC 165
+    /// @return boolean saying if this contract supports the interface or not
+    function supportsInterface(bytes4 interfaceId) public view override(ERC721S, EIP2981AllToken) returns (bool) {
+        return interfaceId == _INTERFACE_ID_ERC4906 || ERC721S.supportsInterface(interfaceId) || EIP2981AllToken.supportsInterface(interfaceId);
+    }
+
+    /// @notice function to batch mint upon shatter
+    /// @dev mints tokenIds startId -> startId + quantity - 1 to shatterExecutor
+    function _batchMint(address shatterExecutor, uint256 startId, uint256 quantity) internal {
+        _balances[shatterExecutor] += quantity;
+        if (useConsecutiveTransfer) {
+            emit ConsecutiveTransfer(startId, startId + quantity - 1, address(0), shatterExecutor);
+        } else {
+            for (uint256 id = startId; id < startId + quantity; id++) {
+                emit Transfer(address(0), shatterExecutor, id);
+            }
+        }
+    }
+
+    /// @notice function to batch burn upon fuse
+    /// @dev burns tokenIds startId -> startId + quantity - 1 from fuser
+    /// @dev `_owners` and approvals are not cleared, the child contract makes the burned tokens unreachable through `_ownershipOf`
+    function _batchBurn(address fuser, uint256 startId, uint256 quantity) internal {
+        _balances[fuser] -= quantity;
+        if (useConsecutiveTransfer) {
+            emit ConsecutiveTransfer(startId, startId + quantity - 1, fuser, address(0));
+        } else {
+            for (uint256 id = startId; id < startId + quantity; id++) {
+                emit Transfer(fuser, address(0), id);
+            }
+        }
+    }
+
+    /// @notice function to set base uri internally
+    function _setBaseUri(string memory newUri) internal {
+        _baseUri = newUri;
+    }
+
+    /// @notice override _baseURI() function from ERC721S
+    function _baseURI() internal view override returns (string memory) {
+        return _baseUri;
+    }
+}
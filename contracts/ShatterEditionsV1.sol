@@ -0,0 +1,165 @@
+// SPDX-License-Identifier: Apache-2.0
+
+/// @title ShatterEditionsV1
+/// @notice Shatter implementation on ERC-1155. The 1/1 turns into a balance of fungible editions of a single token id upon Shatter.
+/// @dev the 1/1 is token id 0 and the editions are token id 1. Editions only differ by their edition number, so holding them as a balance
+///     makes shatter, transfer and fuse cost the same whatever the number of editions.
+/// @author transientlabs.xyz
+
+pragma solidity 0.8.14;
+
+import "OpenZeppelin/openzeppelin-contracts@4.7.0/contracts/token/ERC1155/ERC1155.sol";
+import "OpenZeppelin/openzeppelin-contracts@4.7.0/contracts/utils/Strings.sol";
+import "./ShatterAdmin.sol";
+
+contract ShatterEditionsV1 is ERC1155, ShatterAdmin {
+    using Strings for uint256;
+
+    uint256 public constant ORIGINAL_ID = 0;
+    uint256 public constant EDITION_ID = 1;
+
+    string public name;
+    string public symbol;
+    bool public isMinted;
+    bool public isShattered;
+    bool public isFused;
+    uint256 public shatters;
+    uint256 public minShatters;
+    uint256 public maxShatters;
+    uint256 public shatterTime;
+    string private _baseUri;
+
+    event Shattered(address indexed user, uint256 indexed numShatters, uint256 indexed shatteredTime);
+    event Fused(address indexed user, uint256 indexed fuseTime);
+
+    /// @param name_ is the name of the contract and piece
+    /// @param symbol_ is the symbol
+    /// @param royaltyRecipient is the royalty recipient
+    /// @param royaltyPercentage is the royalty percentage to set
+    /// @param admin is the admin address
+    /// @param min is the minimum number of editions
+    /// @param max is the maximum number of editions
+    /// @param time is time after which replication can occur
+    constructor (
+        string memory name_,
+        string memory symbol_,
+        address royaltyRecipient,
+        uint256 royaltyPercentage,
+        address admin,
+        uint256 min,
+        uint256 max,
+        uint256 time
+    )
+        ERC1155("")
+        EIP2981AllToken(royaltyRecipient, royaltyPercentage)
+        Ownable()
+    {
+        name = name_;
+        symbol = symbol_;
+        adminAddress = admin;
+        if (min < 1) {
+            minShatters = 1;
+        } else {
+            minShatters = min;
+        }
+        maxShatters = max;
+        shatterTime = time;
+    }
+
+    /// @notice function to set base uri
+    /// @dev requires owner
+    /// @dev emits the ERC-1155 `URI` event for both token ids
+    /// @param newUri is the new base uri
+    function setBaseURI(string memory newUri) external onlyOwner {
+        _baseUri = newUri;
+        emit URI(uri(ORIGINAL_ID), ORIGINAL_ID);
+        emit URI(uri(EDITION_ID), EDITION_ID);
+    }
+
+    /// @notice function for minting the 1/1 to the owner's address
+    /// @dev requires contract owner or admin
+    /// @dev requires that the 1/1 has not been minted yet
+    /// @dev the owner should always be an EOA or trusted entity that can receive ERC-1155 tokens
+    function mint(string memory newUri) external adminOrOwner {
+        require(!isMinted, "Already minted the first piece");
+        isMinted = true;
+        _baseUri = newUri;
+        _mint(owner(), ORIGINAL_ID, 1, "");
+    }
+
+    /// @notice function for owner of token 0 to unlock the piece and turn it into editions
+    /// @dev requires msg.sender to be the owner of token 0
+    /// @dev requires a number of editions less than or equal to maxShatters or greater than or equal to minShatters
+    /// @dev requires isShattered to be false
+    /// @dev requires block timestamp to be greater than or equal to shatterTime
+    /// @dev purposefully not letting approved addresses shatter as we want owner to be the only one to shatter the token
+    /// @dev if number of editions == 1, fuse occurs at the same time
+    /// @dev the editions are minted as a single balance, so the cost doesn't depend on numShatters
+    /// @param numShatters is the total number of editions to make. Can be set between minShatters and maxShatters
+    function shatter(uint256 numShatters) external {
+        address sender = _msgSender();
+        require(!isShattered, "Already is shattered");
+        require(balanceOf(sender, ORIGINAL_ID) == 1, "Caller is not owner of token 0");
+        require(numShatters >= minShatters && numShatters <= maxShatters, "Cannot set number of editions above max or below the min");
+        require(block.timestamp >= shatterTime, "Cannot shatter prior to shatterTime");
+
+        isShattered = true;
+        shatters = numShatters;
+        if (numShatters > 1) {
+            _burn(sender, ORIGINAL_ID, 1);
+            _mint(sender, EDITION_ID, numShatters, "");
+            emit Shattered(sender, numShatters, block.timestamp);
+        } else {
+            isFused = true;
+            emit Shattered(sender, numShatters, block.timestamp);
+            emit Fused(sender, block.timestamp);
+        }
+    }
+
+    /// @notice function to fuse editions back into a 1/1
+    /// @dev requires msg.sender to own all of the editions
+    /// @dev can't have already fused
+    /// @dev must be shattered
+    /// @dev purposefully not letting approved addresses fuse as we want the owner to have only control over fusing
+    /// @dev burns the whole balance of editions in one write, so the cost doesn't depend on the number of editions
+    function fuse() external {
+        require(!isFused, "Already is fused");
+        require(isShattered, "Can't fuse if not already shattered");
+        address sender = _msgSender();
+        uint256 numShatters = shatters;
+        require(balanceOf(sender, EDITION_ID) == numShatters, "Msg sender must own all editions");
+
+        isFused = true;
+        shatters = 1;
+        _burn(sender, EDITION_ID, numShatters);
+        _mint(sender, ORIGINAL_ID, 1, "");
+
+        emit Fused(sender, block.timestamp);
+    }
+
+    /// @notice function to get the number of tokens in existence for a token id
+    /// @param id is the token id
+    function totalSupply(uint256 id) external view returns (uint256) {
+        if (id == ORIGINAL_ID) {
+            return isMinted && (!isShattered || isFused) ? 1 : 0;
+        } else if (id == EDITION_ID) {
+            return isShattered && !isFused ? shatters : 0;
+        } else {
+            return 0;
+        }
+    }
+
+    /// @notice function to get the uri of a token id
+    /// @dev the base uri followed by the token id, like the ERC-721 Shatter contracts
+    /// @param id is the token id
+    function uri(uint256 id) public view override returns (string memory) {
+        return bytes(_baseUri).length > 0 ? string(abi.encodePacked(_baseUri, id.toString())) : "";
+    }
+
+    /// @notice overrides supportsInterface function
+    /// @param interfaceId is supplied from anyone/contract calling this function, as defined in ERC 165
+    /// @return boolean saying if this contract supports the interface or not
+    function supportsInterface(bytes4 interfaceId) public view override(ERC1155, EIP2981AllToken) returns (bool) {
+        return ERC1155.supportsInterface(interfaceId) || EIP2981AllToken.supportsInterface(interfaceId);
+    }
+}
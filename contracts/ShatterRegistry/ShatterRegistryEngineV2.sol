@@ -0,0 +1,85 @@
+// SPDX-License-Identifier: Apache-2.0
+
+/// @title Shatter Registry Engine V2
+/// @author transientlabs.xyz
+
+/*
+   _____ __          __  __               ____             _      __                ______            _               _    _____
+  / ___// /_  ____ _/ /_/ /____  _____   / __ \___  ____ _(_)____/ /________  __   / ____/___  ____ _(_)___  ___     | |  / /__ \
+  \__ \/ __ \/ __ `/ __/ __/ _ \/ ___/  / /_/ / _ \/ __ `/ / ___/ __/ ___/ / / /  / __/ / __ \/ __ `/ / __ \/ _ \    | | / /__/ /
+ ___/ / / / / /_/ / /_/ /_/  __/ /     / _, _/  __/ /_/ / (__  ) /_/ /  / /_/ /  / /___/ / / / /_/ / / / / /  __/    | |/ // __/
+/____/_/ /_/\__,_/\__/\__/\___/_/     /_/ |_|\___/\__, /_/____/\__/_/   \__, /  /_____/_/ /_/\__, /_/_/ /_/\___/     |___//____/
+                                                 /____/                /____/               /____/
+*/
+
+pragma solidity ^0.8.9;
+
+import "./ShatterRegistryEngineV1.sol";
+
+contract ShatterRegistryEngineV2 is ShatterRegistryEngineV1 {
+
+    mapping(address => bool) internal isTrustedFactory;
+
+    event FactoryUpdate(address indexed _factory, bool indexed _trusted);
+
+    /// @notice function to trust or untrust a factory
+    /// @dev requires owner of the contract
+    /// @param _factory is the factory address
+    /// @param _trusted is whether the factory can register contracts without a signature
+    function setFactory(address _factory, bool _trusted) external onlyOwner {
+        isTrustedFactory[_factory] = _trusted;
+        emit FactoryUpdate(_factory, _trusted);
+    }
+
+    /// @notice function to lookup if a factory is trusted
+    /// @param _factory is the factory address to lookup
+    function isFactory(address _factory) external view returns(bool) {
+        return isTrustedFactory[_factory];
+    }
+
+    /// @notice function for trusted factories to register the shatter contracts they deploy
+    /// @dev the factory is trusted to only deploy official implementations, so no signature or nonce is checked
+    /// @param _deployer is the user deploying the shatter contract
+    /// @param _contract is the shatter contract address
+    /// @param _version is the shatter version
+    function registerFromFactory(address _deployer, address _contract, uint256 _version) external virtual {
+        require(isTrustedFactory[msg.sender], "Caller is not a trusted factory");
+        _register(_deployer, _contract, _version);
+    }
+
+    /// @notice function to manually add many shatter contracts in one transaction
+    /// @dev requires ownership of this contract
+    /// @dev reverts if any of the contracts is already registered
+    /// @param _deployers are the users that deployed the shatter contracts
+    /// @param _contracts are the shatter contract addresses
+    /// @param _versions are the shatter contract versions, index paired with `_contracts`
+    function manuallyRegisterBatch(address[] calldata _deployers, address[] calldata _contracts, uint256[] calldata _versions) external virtual onlyOwner {
+        require(_deployers.length == _contracts.length && _contracts.length == _versions.length, "Array lengths must be equal");
+        for (uint256 i = 0; i < _contracts.length; i++) {
+            _register(_deployers[i], _contracts[i], _versions[i]);
+        }
+    }
+
+    /// @notice function to lookup many contracts in one call
+    /// @param _contracts are the contract addresses to lookup
+    /// @return tfs booleans indicating if each contract is a shatter contract
+    /// @return vs the version of each contract. 0 is returned for contracts that are not shatter contracts
+    function lookupBatch(address[] calldata _contracts) external virtual view returns(bool[] memory tfs, uint256[] memory vs) {
+        tfs = new bool[](_contracts.length);
+        vs = new uint256[](_contracts.length);
+        for (uint256 i = 0; i < _contracts.length; i++) {
+            if (isShatterContract[_contracts[i]]) {
+                tfs[i] = true;
+                vs[i] = version[_contracts[i]];
+            }
+        }
+    }
+
+    /// @notice function to register a contract that has already been authorized
+    function _register(address _deployer, address _contract, uint256 _version) internal virtual {
+        require(!isShatterContract[_contract], "Already registered");
+        version[_contract] = _version;
+        isShatterContract[_contract] = true;
+        emit Register(_deployer, _contract, _version);
+    }
+}
@@ -0,0 +1,155 @@
+// SPDX-License-Identifier: Apache-2.0
+
+/// @title Shatter Registry Engine V3
+/// @author transientlabs.xyz
+
+/*
+   _____ __          __  __               ____             _      __                ______            _               _    _____
+  / ___// /_  ____ _/ /_/ /____  _____   / __ \___  ____ _(_)____/ /________  __   / ____/___  ____ _(_)___  ___     | |  / /__  /
+  \__ \/ __ \/ __ `/ __/ __/ _ \/ ___/  / /_/ / _ \/ __ `/ / ___/ __/ ___/ / / /  / __/ / __ \/ __ `/ / __ \/ _ \    | | / / /_ < 
+ ___/ / / / / /_/ / /_/ /_/  __/ /     / _, _/  __/ /_/ / (__  ) /_/ /  / /_/ /  / /___/ / / / /_/ / / / / /  __/    | |/ /___/ / 
+/____/_/ /_/\__,_/\__/\__/\___/_/     /_/ |_|\___/\__, /_/____/\__/_/   \__, /  /_____/_/ /_/\__, /_/_/ /_/\___/     |___//____/  
+                                                 /____/                /____/               /____/
+*/
+
+pragma solidity ^0.8.9;
+
+import "./ShatterRegistryEngineV2.sol";
+
+contract ShatterRegistryEngineV3 is ShatterRegistryEngineV2 {
+
+    // flag set in a `registration` entry, the remaining bits hold the version
+    uint256 internal constant _REGISTERED = 1 << 255;
+
+    bytes32 internal constant _DOMAIN_TYPEHASH = keccak256("EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)");
+    bytes32 internal constant _NAME_HASH = keccak256("ShatterRegistry");
+    bytes32 internal constant _VERSION_HASH = keccak256("3");
+    bytes32 internal constant _REGISTER_TYPEHASH = keccak256("Register(address deployer,uint256 version,uint256 nonce)");
+
+    // registered flag and version packed in one slot, so lookups of contracts registered on this engine need one SLOAD
+    mapping(address => uint256) internal registration;
+    // bit `nonce & 255` of word `nonce >> 8` is set once the deployer's nonce has been used
+    mapping(address => mapping(uint256 => uint256)) internal nonceBitmap;
+
+    event Migrate(address indexed _contract, uint256 indexed _version);
+
+    /// @notice function to register official shatter contracts based on an EIP-712 signature from the trusted signer
+    /// @dev the signature is passed in the EIP-2098 compact form, with `s` and the recovery bit packed into `_vs`
+    /// @dev nonces are tracked in per deployer bitmaps, so signers should hand out nonces sequentially to share storage slots
+    /// @dev meant to be called during contract deployment
+    /// @param _deployer is the user deploying the shatter contract
+    /// @param _version is the shatter version
+    /// @param _nonce is a number used to create unique signatures
+    /// @param _r is the `r` value of the signature
+    /// @param _vs is the `s` value of the signature with the recovery bit in its top bit
+    function registerCompact(address _deployer, uint256 _version, uint256 _nonce, bytes32 _r, bytes32 _vs) external virtual {
+        _useNonce(_deployer, _nonce);
+        bytes32 digest = ECDSA.toTypedDataHash(domainSeparator(), keccak256(abi.encode(_REGISTER_TYPEHASH, _deployer, _version, _nonce)));
+        require(ECDSA.recover(digest, _r, _vs) == signer, "Invalid signature supplied");
+        _register(_deployer, msg.sender, _version);
+    }
+
+    /// @notice function to register official shatter contracts based on an EIP-191 signature from the trusted signer
+    /// @dev kept for creators already deployed against earlier engines, stores the registration in the packed layout
+    /// @param _deployer is the user deploying the shatter contract
+    /// @param _version is the shatter version
+    /// @param _nonce is a number used to create unique signatures
+    /// @param _sig is the actual signature to check
+    function register(address _deployer, uint256 _version, bytes32 _nonce, bytes memory _sig) external virtual override {
+        require(!nonceUsed[_deployer][_nonce], "Nonce already has been used");
+        bytes32 msgHash = _generateMessageHash(_deployer, _version, _nonce);
+        require(ECDSA.recover(msgHash, _sig) == signer, "Invalid signature supplied");
+        nonceUsed[_deployer][_nonce] = true;
+        _register(_deployer, msg.sender, _version);
+    }
+
+    /// @notice function to manually add shatter contracts
+    /// @dev requires ownership of this contract
+    /// @param _deployer is the user that deployed the shatter contract
+    /// @param _contract is the shatter contract address
+    /// @param _version is the shatter contract version
+    function manuallyRegister(address _deployer, address _contract, uint256 _version) external virtual override onlyOwner {
+        _register(_deployer, _contract, _version);
+    }
+
+    /// @notice function to move registrations made on earlier engines to the packed layout
+    /// @dev requires ownership of this contract
+    /// @dev contracts that are not registered in the earlier layout are skipped
+    /// @param _contracts are the contract addresses to migrate
+    function migrate(address[] calldata _contracts) external onlyOwner {
+        for (uint256 i = 0; i < _contracts.length; i++) {
+            address c = _contracts[i];
+            if (isShatterContract[c]) {
+                uint256 v = version[c];
+                registration[c] = _REGISTERED | v;
+                delete isShatterContract[c];
+                delete version[c];
+                emit Migrate(c, v);
+            }
+        }
+    }
+
+    /// @notice function to lookup if a contract is a shattter contract
+    /// @param _contract is the contract address to lookup
+    /// @return tf boolean indicating if a shatter contract
+    /// @return v uint256 with the version. 0 is returned if the contract is not a shatter contract
+    function lookup(address _contract) external virtual view override returns(bool tf, uint256 v) {
+        return _lookup(_contract);
+    }
+
+    /// @notice function to lookup many contracts in one call
+    /// @param _contracts are the contract addresses to lookup
+    /// @return tfs booleans indicating if each contract is a shatter contract
+    /// @return vs the version of each contract. 0 is returned for contracts that are not shatter contracts
+    function lookupBatch(address[] calldata _contracts) external virtual view override returns(bool[] memory tfs, uint256[] memory vs) {
+        tfs = new bool[](_contracts.length);
+        vs = new uint256[](_contracts.length);
+        for (uint256 i = 0; i < _contracts.length; i++) {
+            (tfs[i], vs[i]) = _lookup(_contracts[i]);
+        }
+    }
+
+    /// @notice function to lookup if a nonce has been used by a deployer for `registerCompact`
+    /// @param _deployer is the deployer the nonce was signed for
+    /// @param _nonce is the nonce to lookup
+    function isNonceUsed(address _deployer, uint256 _nonce) external view returns(bool) {
+        return nonceBitmap[_deployer][_nonce >> 8] & (1 << (_nonce & 0xff)) != 0;
+    }
+
+    /// @notice function to get the EIP-712 domain separator
+    /// @dev computed on every call as the engine runs behind a proxy, so the verifying contract is the proxy address
+    function domainSeparator() public view returns(bytes32) {
+        return keccak256(abi.encode(_DOMAIN_TYPEHASH, _NAME_HASH, _VERSION_HASH, block.chainid, address(this)));
+    }
+
+    /// @notice function to register a contract that has already been authorized
+    /// @dev writes the packed layout only
+    function _register(address _deployer, address _contract, uint256 _version) internal virtual override {
+        require(_version < _REGISTERED, "Version must fit in 255 bits");
+        (bool tf, ) = _lookup(_contract);
+        require(!tf, "Already registered");
+        registration[_contract] = _REGISTERED | _version;
+        emit Register(_deployer, _contract, _version);
+    }
+
+    /// @notice function to mark a nonce as used, reverting if it already was
+    function _useNonce(address _deployer, uint256 _nonce) internal {
+        uint256 bit = 1 << (_nonce & 0xff);
+        uint256 word = nonceBitmap[_deployer][_nonce >> 8];
+        require(word & bit == 0, "Nonce already has been used");
+        nonceBitmap[_deployer][_nonce >> 8] = word | bit;
+    }
+
+    /// @notice function to read a registration from the packed layout, falling back to the layout of earlier engines
+    /// @dev contracts registered on this engine or migrated to it resolve with one SLOAD
+    function _lookup(address _contract) internal view returns(bool, uint256) {
+        uint256 packed = registration[_contract];
+        if (packed != 0) {
+            return (true, packed & ~_REGISTERED);
+        } else if (isShatterContract[_contract]) {
+            return (true, version[_contract]);
+        } else {
+            return (false, 0);
+        }
+    }
+}
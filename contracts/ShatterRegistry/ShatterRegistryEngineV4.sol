@@ -0,0 +1,94 @@
+// SPDX-License-Identifier: Apache-2.0
+
+/// @title Shatter Registry Engine V4
+/// @author transientlabs.xyz
+
+/*
+   _____ __          __  __               ____             _      __                ______            _               _    ____ __
+  / ___// /_  ____ _/ /_/ /____  _____   / __ \___  ____ _(_)____/ /________  __   / ____/___  ____ _(_)___  ___     | |  / / // /
+  \__ \/ __ \/ __ `/ __/ __/ _ \/ ___/  / /_/ / _ \/ __ `/ / ___/ __/ ___/ / / /  / __/ / __ \/ __ `/ / __ \/ _ \    | | / / // /_
+ ___/ / / / / /_/ / /_/ /_/  __/ /     / _, _/  __/ /_/ / (__  ) /_/ /  / /_/ /  / /___/ / / / /_/ / / / / /  __/    | |/ /__  __/
+/____/_/ /_/\__,_/\__/\__/\___/_/     /_/ |_|\___/\__, /_/____/\__/_/   \__, /  /_____/_/ /_/\__, /_/_/ /_/\___/     |___/  /_/   
+                                                 /____/                /____/               /____/
+*/
+
+pragma solidity ^0.8.9;
+
+import "./ShatterRegistryEngineV3.sol";
+
+contract ShatterRegistryEngineV4 is ShatterRegistryEngineV3 {
+
+    // registered flag and version for allow-listed runtime codehashes, packed like `registration`
+    mapping(bytes32 => uint256) internal codehashVersion;
+
+    event CodehashUpdate(bytes32 indexed _codehash, uint256 indexed _version, bool indexed _allowed);
+
+    /// @notice function to allow or disallow contracts by their runtime code
+    /// @dev requires owner of the contract
+    /// @dev only allow code that can't change its logic, as any contract with the same runtime code is recognized
+    /// @param _codehash is the EXTCODEHASH of the runtime code
+    /// @param _version is the shatter version reported for contracts with this code
+    /// @param _allowed is whether contracts with this code are recognized
+    function setCodehash(bytes32 _codehash, uint256 _version, bool _allowed) public onlyOwner {
+        require(_version < _REGISTERED, "Version must fit in 255 bits");
+        require(_codehash != bytes32(0) && _codehash != keccak256(""), "Codehash must be of deployed code");
+        if (_allowed) {
+            codehashVersion[_codehash] = _REGISTERED | _version;
+        } else {
+            delete codehashVersion[_codehash];
+        }
+        emit CodehashUpdate(_codehash, _version, _allowed);
+    }
+
+    /// @notice function to allow or disallow the EIP-1167 minimal clones of an implementation
+    /// @dev requires owner of the contract
+    /// @dev a clone's runtime code embeds the implementation address, so its codehash proves which implementation it runs
+    /// @param _implementation is the implementation the clones delegate to
+    /// @param _version is the shatter version reported for the clones
+    /// @param _allowed is whether the clones are recognized
+    function setCloneImplementation(address _implementation, uint256 _version, bool _allowed) external onlyOwner {
+        setCodehash(cloneCodehash(_implementation), _version, _allowed);
+    }
+
+    /// @notice function to get the codehash of an EIP-1167 minimal clone of an implementation
+    /// @param _implementation is the implementation the clone delegates to
+    function cloneCodehash(address _implementation) public pure returns(bytes32) {
+        return keccak256(abi.encodePacked(hex"363d3d373d3d3d363d73", _implementation, hex"5af43d82803e903d91602b57fd5bf3"));
+    }
+
+    /// @notice function to lookup if a contract is a shattter contract
+    /// @dev explicit registrations take precedence, then the runtime code of the contract is checked against the allow-list
+    /// @param _contract is the contract address to lookup
+    /// @return tf boolean indicating if a shatter contract
+    /// @return v uint256 with the version. 0 is returned if the contract is not a shatter contract
+    function lookup(address _contract) external virtual view override returns(bool tf, uint256 v) {
+        return _lookupWithCodehash(_contract);
+    }
+
+    /// @notice function to lookup many contracts in one call
+    /// @dev same resolution as `lookup`
+    /// @param _contracts are the contract addresses to lookup
+    /// @return tfs booleans indicating if each contract is a shatter contract
+    /// @return vs the version of each contract. 0 is returned for contracts that are not shatter contracts
+    function lookupBatch(address[] calldata _contracts) external virtual view override returns(bool[] memory tfs, uint256[] memory vs) {
+        tfs = new bool[](_contracts.length);
+        vs = new uint256[](_contracts.length);
+        for (uint256 i = 0; i < _contracts.length; i++) {
+            (tfs[i], vs[i]) = _lookupWithCodehash(_contracts[i]);
+        }
+    }
+
+    /// @notice function to resolve a contract from its explicit registration, or from its runtime code
+    /// @dev `_register` still only checks explicit registrations, so recognized contracts can be registered with another version
+    function _lookupWithCodehash(address _contract) internal view returns(bool, uint256) {
+        (bool tf, uint256 v) = _lookup(_contract);
+        if (tf) {
+            return (tf, v);
+        }
+        uint256 packed = codehashVersion[_contract.codehash];
+        if (packed != 0) {
+            return (true, packed & ~_REGISTERED);
+        }
+        return (false, 0);
+    }
+}
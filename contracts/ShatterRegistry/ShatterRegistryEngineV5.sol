@@ -0,0 +1,113 @@
+// SPDX-License-Identifier: Apache-2.0
+
+/// @title Shatter Registry Engine V5
+/// @author transientlabs.xyz
+
+/*
+   _____ __          __  __               ____             _      __                ______            _               _    ______
+  / ___// /_  ____ _/ /_/ /____  _____   / __ \___  ____ _(_)____/ /________  __   / ____/___  ____ _(_)___  ___     | |  / / ____/
+  \__ \/ __ \/ __ `/ __/ __/ _ \/ ___/  / /_/ / _ \/ __ `/ / ___/ __/ ___/ / / /  / __/ / __ \/ __ `/ / __ \/ _ \    | | / /___ \  
+ ___/ / / / / /_/ / /_/ /_/  __/ /     / _, _/  __/ /_/ / (__  ) /_/ /  / /_/ /  / /___/ / / / /_/ / / / / /  __/    | |/ /___/ /  
+/____/_/ /_/\__,_/\__/\__/\___/_/     /_/ |_|\___/\__, /_/____/\__/_/   \__, /  /_____/_/ /_/\__, /_/_/ /_/\___/     |___/_____/   
+                                                 /____/                /____/               /____/
+*/
+
+pragma solidity ^0.8.9;
+
+import "./ShatterRegistryEngineV4.sol";
+
+contract ShatterRegistryEngineV5 is ShatterRegistryEngineV4 {
+
+    // every registered contract, in the order it was registered or indexed
+    address[] internal registered;
+    // contracts registered by each deployer
+    mapping(address => address[]) internal deployerIndex;
+    // contracts registered with each version
+    mapping(uint256 => address[]) internal versionIndex;
+    // set once a contract is in the indexes, so registrations from earlier engines can only be indexed once
+    mapping(address => bool) internal isIndexed;
+
+    /// @notice function to add registrations made on earlier engines to the indexes
+    /// @dev requires ownership of this contract
+    /// @dev earlier engines don't store the deployer, so it is taken from the `Register` events off-chain
+    /// @dev contracts that are not registered or are already indexed are skipped
+    /// @param _deployers are the users that deployed the shatter contracts
+    /// @param _contracts are the shatter contract addresses
+    function indexRegistered(address[] calldata _deployers, address[] calldata _contracts) external onlyOwner {
+        require(_deployers.length == _contracts.length, "Array lengths must be equal");
+        for (uint256 i = 0; i < _contracts.length; i++) {
+            (bool tf, uint256 v) = _lookup(_contracts[i]);
+            if (tf && !isIndexed[_contracts[i]]) {
+                _index(_deployers[i], _contracts[i], v);
+            }
+        }
+    }
+
+    /// @notice function to get the number of indexed shatter contracts
+    function registeredCount() external view returns(uint256) {
+        return registered.length;
+    }
+
+    /// @notice function to page through every indexed shatter contract
+    /// @dev returns fewer than `_limit` addresses once the end of the index is reached
+    /// @param _start is the position of the first contract to return
+    /// @param _limit is the maximum number of contracts to return
+    function registeredAt(uint256 _start, uint256 _limit) external view returns(address[] memory) {
+        return _page(registered, _start, _limit);
+    }
+
+    /// @notice function to get the number of indexed shatter contracts from a deployer
+    /// @param _deployer is the user that deployed the shatter contracts
+    function deployerCount(address _deployer) external view returns(uint256) {
+        return deployerIndex[_deployer].length;
+    }
+
+    /// @notice function to page through the indexed shatter contracts from a deployer
+    /// @param _deployer is the user that deployed the shatter contracts
+    /// @param _start is the position of the first contract to return
+    /// @param _limit is the maximum number of contracts to return
+    function registeredByDeployer(address _deployer, uint256 _start, uint256 _limit) external view returns(address[] memory) {
+        return _page(deployerIndex[_deployer], _start, _limit);
+    }
+
+    /// @notice function to get the number of indexed shatter contracts with a version
+    /// @param _version is the shatter version
+    function versionCount(uint256 _version) external view returns(uint256) {
+        return versionIndex[_version].length;
+    }
+
+    /// @notice function to page through the indexed shatter contracts with a version
+    /// @param _version is the shatter version
+    /// @param _start is the position of the first contract to return
+    /// @param _limit is the maximum number of contracts to return
+    function registeredByVersion(uint256 _version, uint256 _start, uint256 _limit) external view returns(address[] memory) {
+        return _page(versionIndex[_version], _start, _limit);
+    }
+
+    /// @notice function to register a contract that has already been authorized
+    /// @dev adds the contract to the indexes, which covers `register`, `registerCompact`, `registerFromFactory`, and manual registration
+    function _register(address _deployer, address _contract, uint256 _version) internal virtual override {
+        super._register(_deployer, _contract, _version);
+        _index(_deployer, _contract, _version);
+    }
+
+    /// @notice function to append a registered contract to the indexes
+    function _index(address _deployer, address _contract, uint256 _version) internal {
+        isIndexed[_contract] = true;
+        registered.push(_contract);
+        deployerIndex[_deployer].push(_contract);
+        versionIndex[_version].push(_contract);
+    }
+
+    /// @notice function to copy a page of an index to memory
+    function _page(address[] storage _list, uint256 _start, uint256 _limit) internal view returns(address[] memory page) {
+        if (_start >= _list.length) {
+            return page;
+        }
+        uint256 end = _list.length - _start < _limit ? _list.length : _start + _limit;
+        page = new address[](end - _start);
+        for (uint256 i = _start; i < end; i++) {
+            page[i - _start] = _list[i];
+        }
+    }
+}
@@ -26,37 +26,21 @@ _____/\\\\\\\\\\\____/\\\_______________________________________________________
 /_/ /_/  \_,_/_//_/___/_/\__/_//_/\__/ /____/\_,_/_.__/___/
 */
 
-import "./ERC721S.sol";
-import "Transient-Labs/tl-contract-kit@6.1.0/contracts/royalty/EIP2981AllToken.sol";
-import "OpenZeppelin/openzeppelin-contracts@4.7.0/contracts/access/Ownable.sol";
+import "./ShatterBase.sol";
+import "OpenZeppelin/openzeppelin-contracts@4.7.0/contracts/utils/cryptography/MerkleProof.sol";
 
-contract ShatterV1 is ERC721S, EIP2981AllToken, Ownable {
+contract ShatterV1 is ShatterBase {
     using Strings for uint256;
 
-    bool public isShattered;
-    bool public isFused;
+    bool public isReshatterable;
     uint256 public minShatters;
     uint256 public maxShatters;
-    uint256 public shatters;
-    uint256 public shatterTime;
-    address public adminAddress;
-    address private _shatterAddress;
-    string private _baseUri;
+    bytes32 public claimRoot;
+    // bit `tokenId & 255` of word `tokenId >> 8` is set once the edition has been claimed in the epoch
+    mapping(uint256 => mapping(uint256 => uint256)) private _claimed;
 
-    event Shattered(address indexed user, uint256 indexed numShatters, uint256 indexed shatteredTime);
     event Fused(address indexed user, uint256 indexed fuseTime);
 
-    modifier adminOrOwner {
-        address sender = _msgSender();
-        require(sender == adminAddress || sender == owner(), "Address not admin or owner");
-        _;
-    }
-
-    modifier onlyAdmin {
-        require(_msgSender() == adminAddress, "Address not admin");
-        _;
-    }
-
     /// @param name is the name of the contract and piece
     /// @param symbol is the symbol
     /// @param royaltyRecipient is the royalty recipient
@@ -78,45 +62,54 @@ contract ShatterV1 is ERC721S, EIP2981AllToken, Ownable {
         ERC721S(name, symbol)
         EIP2981AllToken(royaltyRecipient, royaltyPercentage)
         Ownable() 
+        initializer
     {  
-        adminAddress = admin;
-        if (min < 1) {
-            minShatters = 1;
-        } else {
-            minShatters = min;
-        }
-        maxShatters = max;
-        shatterTime = time;
+        _initialize(admin, min, max, time);
+    }
+
+    /// @notice function to set up a minimal clone of this contract
+    /// @dev same parameters as the constructor, with the owner passed explicitly as clones are set up by a factory
+    /// @param newOwner is the owner of the contract
+    function initialize(
+        address newOwner,
+        string memory name,
+        string memory symbol,
+        address royaltyRecipient,
+        uint256 royaltyPercentage,
+        address admin,
+        uint256 min,
+        uint256 max,
+        uint256 time
+    )
+        external
+        initializer
+    {
+        _initializeClone(newOwner, name, symbol, royaltyRecipient, royaltyPercentage);
+        _initialize(admin, min, max, time);
     }
 
-    /// @notice function to change the royalty info
+    /// @notice function to allow the piece to be shattered again after it is fused
     /// @dev requires owner
-    /// @dev this is useful if the amount was set improperly at contract creation.
-    /// @param newAddr is the new royalty payout addresss
-    /// @param newPerc is the new royalty percentage, in basis points (out of 10,000)
-    function setRoyaltyInfo(address newAddr, uint256 newPerc) external onlyOwner {
-        _setRoyaltyInfo(newAddr, newPerc);
+    /// @dev can only be changed before the piece is first shattered
+    /// @param reshatterable is a boolean indicating if the piece can go through multiple shatter/fuse cycles
+    function setReshatterable(bool reshatterable) external onlyOwner {
+        require(!isShattered(), "Already is shattered");
+        isReshatterable = reshatterable;
     }
 
-    /// @notice function to renounce admin rights
-    /// @dev requires only admin
-    function renounceAdmin() external onlyAdmin {
-        adminAddress = address(0);
+    /// @notice function to get if the piece has been fused
+    function isFused() public view returns (bool) {
+        return _state.flags & _FUSED != 0;
     }
 
-    /// @notice function to set the admin address on the contract
-    /// @dev requires owner
-    /// @param newAdmin is the new admin address
-    function setAdminAddress(address newAdmin) external onlyOwner {
-        require(newAdmin != address(0), "New admin cannot be the zero address");
-        adminAddress = newAdmin;
+    /// @notice function to get if a fuse is in progress
+    function isFusing() public view returns (bool) {
+        return _state.flags & _FUSING != 0;
     }
 
-    /// @notice function to set base uri
-    /// @dev requires owner
-    /// @param newUri is the new base uri
-    function setBaseURI(string memory newUri) public onlyOwner {
-        _setBaseUri(newUri);
+    /// @notice function to get the number of completed fuses
+    function epoch() public view returns (uint64) {
+        return _state.epoch;
     }
 
     /// @notice function for minting the 1/1 to the owner's address
@@ -125,39 +118,102 @@ contract ShatterV1 is ERC721S, EIP2981AllToken, Ownable {
     /// @dev requires that shatters is equal to 0 -> meaning no piece has been minted
     /// @dev using _mint function as owner() should always be an EOA or trusted entity that can receive ERC721 tokens
     function mint(string memory newUri) external adminOrOwner {
-        require(shatters == 0, "Already minted the first piece");
+        require(_state.shatters == 0, "Already minted the first piece");
         _setBaseUri(newUri);
-        shatters = 1;
+        _state.shatters = 1;
         _mint(owner(), 0);
     }
 
     /// @notice function for owner of token 0 to unlock the piece and turn it into an edition
     /// @dev requires msg.sender to be the owner of token 0
     /// @dev requires a number of editions less than or equal to maxShatters or greater than or equal to minShatters
-    /// @dev requires isShattered to be false
+    /// @dev requires isShattered to be false, unless the piece is reshatterable and currently fused
     /// @dev requires block timestamp to be greater than or equal to shatterTime
     /// @dev purposefully not letting approved addresses shatter as we want owner to be the only one to shatter the token
     /// @dev if number of editions == 1, fuse occurs at the same time
+    /// @dev if batchSize is set, only the first batch is minted and the rest is minted through `continueShatter`.
+    ///     Editions already minted can be transferred while the shatter is in progress.
     /// @param numShatters is the total number of editions to make. Can be set between minShatters and maxShatters. This number is the total number of editions that will live on this contract
     function shatter(uint256 numShatters) external {
         address sender = _msgSender();
-        require(!isShattered, "Already is shattered");
-        require(sender == ownerOf(0), "Caller is not owner of token 0");
-        require(numShatters >= minShatters && numShatters <= maxShatters, "Cannot set number of editions above max or below the min");
-        require(block.timestamp >= shatterTime, "Cannot shatter prior to shatterTime");
+        _validateShatter(sender, numShatters);
 
         if (numShatters > 1) {
-            _burn(0);
-            _batchMint(sender, numShatters);
-            emit Shattered(sender, numShatters, block.timestamp);
+            _startShatter(sender, numShatters);
         } else {
-            isFused = true;
+            _state = ShatterState(_state.shatterAddress, 1, _state.epoch, _SHATTERED | _FUSED);
             emit Shattered(sender, numShatters, block.timestamp);
             emit Fused(sender, block.timestamp);
+            emit MetadataUpdate(0);
         }
-        // no reentrancy so can set these after burning and minting
-        isShattered = true;
-        shatters = numShatters;
+    }
+
+    /// @notice function for owner of token 0 to shatter the piece straight to a list of collectors
+    /// @dev same requirements as `shatter`, with the number of editions being the sum of `counts`
+    /// @dev recipients get contiguous ranges of tokenIds in order, starting at tokenId 1. Ownership is resolved through a range table,
+    ///     so the cost scales with the number of recipients rather than the number of editions (with `useConsecutiveTransfer` enabled)
+    /// @dev always completes in one transaction, regardless of batchSize
+    /// @param recipients are the addresses receiving editions
+    /// @param counts are the number of editions each recipient receives, index paired
+    function shatterTo(address[] calldata recipients, uint256[] calldata counts) external {
+        uint256 numShatters = _sumCounts(recipients, counts);
+        address sender = _msgSender();
+        _validateShatter(sender, numShatters);
+        require(numShatters > 1, "Cannot shatter to a single edition");
+
+        _burn(0);
+        _mintRanges(recipients, counts);
+        _state = ShatterState(sender, uint64(numShatters), _state.epoch, _SHATTERED | _RANGES);
+
+        emit Shattered(sender, numShatters, block.timestamp);
+    }
+
+    /// @notice function for owner of token 0 to shatter the piece for editions pre-allocated to a community
+    /// @dev same requirements as `shatter`. Editions are minted to msg.sender as usual, and each one can be claimed by the recipient
+    ///     it was allocated to through `claim`, so the cost of distribution is spread across claimers
+    /// @dev leaves of the merkle tree are `keccak256(bytes.concat(keccak256(abi.encode(tokenId, recipient))))`
+    /// @param numShatters is the total number of editions to make
+    /// @param root is the merkle root of the (tokenId, recipient) allocations
+    function shatterForClaims(uint256 numShatters, bytes32 root) external {
+        require(root != bytes32(0), "Claim root cannot be empty");
+        require(numShatters > 1, "Cannot shatter to a single edition");
+        address sender = _msgSender();
+        _validateShatter(sender, numShatters);
+
+        claimRoot = root;
+        _startShatter(sender, numShatters);
+    }
+
+    /// @notice function to claim editions allocated through `shatterForClaims`
+    /// @dev anyone can submit a claim as the editions always go to the recipient in the leaf
+    /// @dev an edition can only be claimed once per epoch, and only while it is still owned by the shatter executor
+    /// @param tokenIds are the editions to claim
+    /// @param recipient is the address the editions were allocated to
+    /// @param proofs are the merkle proofs for each (tokenId, recipient) leaf, index paired with tokenIds
+    function claim(uint256[] calldata tokenIds, address recipient, bytes32[][] calldata proofs) external {
+        require(tokenIds.length == proofs.length, "Array lengths must be equal");
+        bytes32 root = claimRoot;
+        require(root != bytes32(0), "No claims available");
+        ShatterState memory state = _state;
+        mapping(uint256 => uint256) storage claimed = _claimed[state.epoch];
+        for (uint256 i = 0; i < tokenIds.length; i++) {
+            uint256 tokenId = tokenIds[i];
+            bytes32 leaf = keccak256(bytes.concat(keccak256(abi.encode(tokenId, recipient))));
+            require(MerkleProof.verifyCalldata(proofs[i], root, leaf), "Invalid proof");
+            uint256 bit = 1 << (tokenId & 0xff);
+            uint256 word = claimed[tokenId >> 8];
+            require(word & bit == 0, "Already claimed");
+            claimed[tokenId >> 8] = word | bit;
+            address owner = _requireOwned(tokenId);
+            require(owner == state.shatterAddress, "Edition no longer held by shatterer");
+            _transfer(state.shatterAddress, recipient, tokenId, owner);
+        }
+    }
+
+    /// @notice function to get if an edition allocated through `shatterForClaims` has been claimed
+    /// @param tokenId is the edition to lookup
+    function isClaimed(uint256 tokenId) external view returns (bool) {
+        return _claimed[_state.epoch][tokenId >> 8] & (1 << (tokenId & 0xff)) != 0;
     }
 
     /// @notice function to fuse editions back into a 1/1
@@ -165,80 +221,91 @@ contract ShatterV1 is ERC721S, EIP2981AllToken, Ownable {
     /// @dev can't have already fused
     /// @dev must be shattered
     /// @dev purposefully not letting approved addresses fuse as we want the owner to have only control over fusing
+    /// @dev the supply while shattered is exactly `shatters`, so a balance equal to `shatters` proves ownership of every edition
+    ///     without calling `ownerOf` on each one
+    /// @dev moves to a new epoch so every owner and approval entry written for the editions is invalidated at once
+    /// @dev completing a fuse drops any unclaimed allocations from `shatterForClaims`
+    /// @dev if batchSize is set, only the first batch is burned and the rest is burned through `continueFuse`.
+    ///     Editions are locked until the fuse completes.
     function fuse() external {
-        require(!isFused, "Already is fused");
-        require(isShattered, "Can't fuse if not already shattered");
+        ShatterState memory state = _state;
+        require(state.flags & _FUSED == 0, "Already is fused");
+        require(state.flags & _SHATTERED != 0, "Can't fuse if not already shattered");
+        require(pendingShatters == 0, "Shatter or fuse in progress");
         address sender = _msgSender();
-        for (uint256 id = 1; id < shatters + 1; id++) {
-            require(sender == ownerOf(id), "Msg sender must own all editions");
-            _burn(id);
-        }
-        isFused = true;
-        shatters = 1;
-        _mint(sender, 0);
-
-        emit Fused(sender, block.timestamp);
-    }
-
-    /// @notice overrides supportsInterface function
-    /// @param interfaceId is supplied from anyone/contract calling this function, as defined in ERC 165
-    /// @return boolean saying if this contract supports the interface or not
-    function supportsInterface(bytes4 interfaceId) public view override(ERC721S, EIP2981AllToken) returns (bool) {
-        return ERC721S.supportsInterface(interfaceId) || EIP2981AllToken.supportsInterface(interfaceId);
-    }
-
-    /// @notice function to override ownerOf in ERC721S
-    /// @dev if is shattered and not fused, checks to see if that token has been transferred or if it belongs to the _shatterAddress.
-    ///     Otherwise, returns result from ERC721S.
-    function ownerOf(uint256 tokenId) public view virtual override(ERC721S) returns (address) {
-        if (isShattered && !isFused) {
-            if (tokenId > 0 && tokenId <= shatters) {
-                address owner = _owners[tokenId];
-                if (owner == address(0)) {
-                    return _shatterAddress;
-                } else {
-                    return owner;
-                }
-            } else {
-                revert("Invalid token id");
-            }
-        } else {
-            return ERC721S.ownerOf(tokenId);
-        }
+        require(balanceOf(sender) == state.shatters, "Msg sender must own all editions");
+        // sender owns every edition, so it can take over as the implicit owner while the fuse is in progress
+        state.shatterAddress = sender;
+        state.flags |= _FUSING;
+        _state = state;
+        pendingShatters = state.shatters;
+        _fuseBatch();
+    }
+
+    /// @notice function to burn the next batch of a fuse in progress
+    /// @dev anyone can push a fuse forward as the fuser already proved ownership of every edition
+    function continueFuse() external {
+        require(isFusing(), "No fuse in progress");
+        _fuseBatch();
     }
 
-    /// @notice function to override the _exists function in ERC721S
-    /// @dev if is shattered and not fused, checks to see if tokenId is in the range of shatters
-    ///     otherwise, returns result from ERC721S
-    function _exists(uint256 tokenId) internal view virtual override(ERC721S) returns (bool) {
-        if (isShattered && !isFused) {
-            if (tokenId > 0 && tokenId <= shatters) {
-                return true;
-            } else {
-                return false;
-            }
+    /// @notice function to burn the next batch of editions during fuse
+    /// @dev editions are burned in decreasing order, so tokenIds 1 -> shatters are always the ones left to burn
+    function _fuseBatch() internal {
+        ShatterState memory state = _state;
+        uint256 quantity = _nextBatch();
+        _batchBurn(state.shatterAddress, uint256(state.shatters) - quantity + 1, quantity);
+        state.shatters -= uint64(quantity);
+        pendingShatters -= quantity;
+        if (pendingShatters == 0) {
+            state.flags = _SHATTERED | _FUSED;
+            state.epoch++;
+            state.shatters = 1;
+            _state = state;
+            delete claimRoot;
+            _mint(state.shatterAddress, 0);
+
+            emit Fused(state.shatterAddress, block.timestamp);
         } else {
-            return ERC721S._exists(tokenId);
+            _state = state;
         }
     }
 
-    /// @notice function to batch mint upon shatter
-    /// @dev only mints tokenIds 1 -> quantity to shatterExecutor
-    function _batchMint(address shatterExecutor, uint256 quantity) internal {
-        _shatterAddress = shatterExecutor;
-        _balances[shatterExecutor] += quantity;
-        for (uint256 id = 1; id < quantity + 1; id++) {
-            emit Transfer(address(0), shatterExecutor, id);
-        }
+    /// @notice function to burn token 0 and start minting editions to the shatter executor
+    function _startShatter(address sender, uint256 numShatters) internal {
+        _burn(0);
+        _state = ShatterState(sender, 0, _state.epoch, _SHATTERED);
+        pendingShatters = numShatters;
+        _shatterBatch();
+    }
+
+    /// @notice function to check the requirements shared by `shatter`, `shatterTo` and `shatterForClaims`
+    function _validateShatter(address sender, uint256 numShatters) internal view {
+        require(!isShattered() || (isReshatterable && isFused()), "Already is shattered");
+        require(sender == ownerOf(0), "Caller is not owner of token 0");
+        require(numShatters >= minShatters && numShatters <= maxShatters, "Cannot set number of editions above max or below the min");
+        require(block.timestamp >= shatterTime, "Cannot shatter prior to shatterTime");
     }
 
-    /// @notice function to set base uri internally
-    function _setBaseUri(string memory newUri) internal {
-        _baseUri = newUri;
+    /// @notice override _beforeTokenTransfer() function from ERC721S
+    /// @dev editions are locked while a fuse is in progress
+    function _beforeTokenTransfer(address, address, uint256) internal view override {
+        require(_state.flags & _FUSING == 0, "Fuse in progress");
     }
 
-    /// @notice override _baseURI() function from ERC721A
-    function _baseURI() internal view override returns (string memory) {
-        return _baseUri;
+    /// @notice override _currentEpoch() function from ERC721S
+    function _currentEpoch() internal view override returns (uint64) {
+        return _state.epoch;
+    }
+
+    /// @notice function to set up the state from either the constructor or `initialize`
+    function _initialize(address admin, uint256 min, uint256 max, uint256 time) internal {
+        _initializeShatter(admin, time, max);
+        if (min < 1) {
+            minShatters = 1;
+        } else {
+            minShatters = min;
+        }
+        maxShatters = max;
     }
-}
\ No newline at end of file
+}
@@ -26,32 +26,11 @@ _____/\\\\\\\\\\\____/\\\_______________________________________________________
 /_/ /_/  \_,_/_//_/___/_/\__/_//_/\__/ /____/\_,_/_.__/___/                                                           
 */
 
-import "./ERC721S.sol";
-import "Transient-Labs/tl-contract-kit@6.1.0/contracts/royalty/EIP2981AllToken.sol";
-import "OpenZeppelin/openzeppelin-contracts@4.7.0/contracts/access/Ownable.sol";
+import "./ShatterBase.sol";
 
-contract ShatterV3 is ERC721S, EIP2981AllToken, Ownable {
+contract ShatterV3 is ShatterBase {
 
-    bool public isShattered;
     uint256 public numShatters;
-    uint256 public shatters;
-    uint256 public shatterTime;
-    address public adminAddress;
-    address private _shatterAddress;
-    string private _baseUri;
-
-    event Shattered(address indexed user, uint256 indexed numShatters, uint256 indexed shatteredTime);
-
-    modifier adminOrOwner {
-        address sender = _msgSender();
-        require(sender == adminAddress || sender == owner(), "Address not admin or owner");
-        _;
-    }
-
-    modifier onlyAdmin {
-        require(_msgSender() == adminAddress, "Address not admin");
-        _;
-    }
 
     /// @param name is the name of the contract
     /// @param symbol is the contract symbol
@@ -72,41 +51,29 @@ contract ShatterV3 is ERC721S, EIP2981AllToken, Ownable {
         ERC721S(name, symbol)
         EIP2981AllToken(royaltyRecipient, royaltyPercentage)
         Ownable()
+        initializer
     {
-        require(num >= 1, "Cannot deploy a shatter contract with 0 shatters");
-        adminAddress = admin;
-        numShatters = num;
-        shatterTime = time;
-    }
-
-    /// @notice function to change the royalty info
-    /// @dev requires owner
-    /// @dev this is useful if the amount was set improperly at contract creation.
-    /// @param newAddr is the new royalty payout addresss
-    /// @param newPerc is the new royalty percentage, in basis points (out of 10,000)
-    function setRoyaltyInfo(address newAddr, uint256 newPerc) external onlyOwner {
-        _setRoyaltyInfo(newAddr, newPerc);
-    }
-
-    /// @notice function to renounce admin rights
-    /// @dev requires only admin
-    function renounceAdmin() external onlyAdmin {
-        adminAddress = address(0);
-    }
-
-    /// @notice function to set the admin address on the contract
-    /// @dev requires owner
-    /// @param newAdmin is the new admin address
-    function setAdminAddress(address newAdmin) external onlyOwner {
-        require(newAdmin != address(0), "New admin cannot be the zero address");
-        adminAddress = newAdmin;
+        _initialize(admin, num, time);
     }
 
-    /// @notice function to set base uri
-    /// @dev requires owner
-    /// @param newUri is the new base uri
-    function setBaseURI(string memory newUri) public onlyOwner {
-        _setBaseUri(newUri);
+    /// @notice function to set up a minimal clone of this contract
+    /// @dev same parameters as the constructor, with the owner passed explicitly as clones are set up by a factory
+    /// @param newOwner is the owner of the contract
+    function initialize(
+        address newOwner,
+        string memory name,
+        string memory symbol,
+        address royaltyRecipient,
+        uint256 royaltyPercentage,
+        address admin,
+        uint256 num,
+        uint256 time
+    )
+        external
+        initializer
+    {
+        _initializeClone(newOwner, name, symbol, royaltyRecipient, royaltyPercentage);
+        _initialize(admin, num, time);
     }
 
     /// @notice function for minting the 1/1 to the owner's address
@@ -115,9 +82,9 @@ contract ShatterV3 is ERC721S, EIP2981AllToken, Ownable {
     /// @dev requires that shatters is equal to 0 -> meaning no piece has been minted
     /// @dev using _mint function as owner() should always be an EOA or trusted entity
     function mint(string memory newUri) external adminOrOwner {
-        require(shatters == 0, "Already minted the first piece");
+        require(_state.shatters == 0, "Already minted the first piece");
         _setBaseUri(newUri);
-        shatters = 1;
+        _state.shatters = 1;
         _mint(owner(), 1);
     }
 
@@ -127,83 +94,37 @@ contract ShatterV3 is ERC721S, EIP2981AllToken, Ownable {
     /// @dev requires isShattered to be false
     /// @dev requires block timestamp to be greater than or equal to shatterTime
     /// @dev purposefully not letting approved addresses shatter as we want owner to be the only one to shatter the token
+    /// @dev if batchSize is set, only the first batch is minted and the rest is minted through `continueShatter`.
+    ///     Editions already minted can be transferred while the shatter is in progress.
     function shatter() external {
         address sender = _msgSender();
-        require(!isShattered, "Already is shattered");
+        require(!isShattered(), "Already is shattered");
         require(sender == ownerOf(1), "Caller is not owner of token 1");
         require(block.timestamp >= shatterTime, "Cannot shatter prior to shatterTime");
 
         // removed _burn(0);
-        _batchMint(sender, numShatters);
-
-        // no reentrancy so can set these after burning and minting
-        isShattered = true;
-        shatters = numShatters + 1;
-
-        emit Shattered(msg.sender, numShatters, block.timestamp);
-
+        // token 1 stays, so shatters starts at 1 and ends at numShatters + 1
+        _state = ShatterState(sender, 1, 0, _SHATTERED);
+        pendingShatters = numShatters;
+        emit MetadataUpdate(1);
+        _shatterBatch();
     }
 
-    /// @notice overrides supportsInterface function
-    /// @param interfaceId is supplied from anyone/contract calling this function, as defined in ERC 165
-    /// @return boolean saying if this contract supports the interface or not
-    function supportsInterface(bytes4 interfaceId) public view override(ERC721S, EIP2981AllToken) returns (bool) {
-        return ERC721S.supportsInterface(interfaceId) || EIP2981AllToken.supportsInterface(interfaceId);
+    /// @notice override _tokenIdRange() function from ERC721S
+    /// @dev token 1 is kept through shatter, so tokenIds are always 1 -> shatters
+    function _tokenIdRange() internal view override returns (uint256, uint256) {
+        return (1, uint256(_state.shatters) + 1);
     }
 
-    /// @notice function to override ownerOf in ERC721S
-    /// @dev if is shattered and not fused, checks to see if that token has been transferred or if it belongs to the shatterAddress.
-    ///     Otherwise, returns result from ERC721S.
-    function ownerOf(uint256 tokenId) public view virtual override(ERC721S) returns (address) {
-        if (isShattered) {
-            if (tokenId > 0 && tokenId <= shatters) {
-                address owner = _owners[tokenId];
-                if (owner == address(0)) {
-                    return _shatterAddress;
-                } else {
-                    return owner;
-                }
-            } else {
-                revert("Invalid token id");
-            }
-        } else {
-            return ERC721S.ownerOf(tokenId);
-        }
+    /// @notice override _shatterCount() function from ShatterBase
+    function _shatterCount() internal view override returns (uint256) {
+        return numShatters;
     }
 
-    /// @notice function to override the _exists function in ERC721S
-    /// @dev if is shattered and not fused, checks to see if tokenId is in the range of shatters
-    ///     otherwise, returns result from ERC721S
-    function _exists(uint256 tokenId) internal view virtual override(ERC721S) returns (bool) {
-        if (isShattered) {
-            if (tokenId > 0 && tokenId <= shatters) {
-                return true;
-            } else {
-                return false;
-            }
-        } else {
-            return ERC721S._exists(tokenId);
-        }
-    }
-
-    /// @notice function to batch mint upon shatter
-    /// @dev only mints tokenIds 2 -> quantity to shatterExecutor
-    function _batchMint(address shatterExecutor, uint256 quantity) internal {
-        _shatterAddress = shatterExecutor;
-        _balances[shatterExecutor] += quantity;
-        for (uint256 id = 2; id < quantity + 2; id++) {
-            emit Transfer(address(0), shatterExecutor, id);
-        }
-        // TODO replace with consecutive transfer
-    }
-
-    /// @notice function to set base uri internally
-    function _setBaseUri(string memory newUri) internal {
-        _baseUri = newUri;
-    }
-
-    /// @notice override _baseURI() function from ERC721A
-    function _baseURI() internal view override returns (string memory) {
-        return _baseUri;
+    /// @notice function to set up the state from either the constructor or `initialize`
+    function _initialize(address admin, uint256 num, uint256 time) internal {
+        require(num >= 1, "Cannot deploy a shatter contract with 0 shatters");
+        _initializeShatter(admin, time, num);
+        numShatters = num;
     }
-}
\ No newline at end of file
+}
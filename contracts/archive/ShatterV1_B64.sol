@@ -27,9 +27,9 @@ _____/\\\\\\\\\\\____/\\\_______________________________________________________
 */
 
 import "../ERC721S.sol";
+import "../MetadataRenderer.sol";
 import "Transient-Labs/tl-contract-kit@6.1.0/contracts/royalty/EIP2981AllToken.sol";
 import "OpenZeppelin/openzeppelin-contracts@4.7.0/contracts/access/Ownable.sol";
-import "OpenZeppelin/openzeppelin-contracts@4.7.0/contracts/utils/Base64.sol";
 import "OpenZeppelin/openzeppelin-contracts@4.7.0/contracts/utils/Strings.sol";
 
 contract ShatterV1_B64 is ERC721S, EIP2981AllToken, Ownable {
@@ -225,55 +225,46 @@ contract ShatterV1_B64 is ERC721S, EIP2981AllToken, Ownable {
     }
 
     /// @notice function to override tokenURI
+    /// @dev the JSON is passed to the renderer as a list of pieces, so no buffer is copied per trait
     function tokenURI(uint256 tokenId) override public view returns(string memory) {
         require(_exists(tokenId), "URI query for nonexistent token");
-        string memory name = name();
-        string memory attr = "[";
-        string memory shatterStr = "No";
-        string memory fuseStr = "No";
-        for (uint256 i; i < _traitNames.length; i++) {
-            attr = string(abi.encodePacked(attr, '{"trait_type": "', _traitNames[i], '", "value": "', _traitValues[i], '"},'));
-        }
+        string memory nameSuffix;
+        string memory attr;
         if (shatters > 1) {
-            shatterStr = "Yes";
-            name = string(abi.encodePacked(name, ' #', tokenId.toString(), '/', shatters.toString()));
-            attr = string(abi.encodePacked(attr, '{"trait_type": "Edition", "value": "', tokenId.toString(), '"},{"trait_type": "Shattered", "value": "', shatterStr, '"},{"trait_type": "Fused", "value": "', fuseStr, '"}'));
+            nameSuffix = string(abi.encodePacked(' #', tokenId.toString(), '/', shatters.toString()));
+            attr = string(abi.encodePacked('{"trait_type": "Edition", "value": "', tokenId.toString(), '"},{"trait_type": "Shattered", "value": "Yes"},{"trait_type": "Fused", "value": "No"}'));
         } else {
+            string memory shatterStr = "No";
+            string memory fuseStr = "No";
             if (isShattered) {
                 shatterStr = "Yes";
             }
             if (isFused) {
                 fuseStr = "Yes";
             }
-            attr = string(abi.encodePacked(attr, '{"trait_type": "Shattered", "value": "', shatterStr, '"},{"trait_type": "Fused", "value": "', fuseStr, '"}'));
+            attr = string(abi.encodePacked('{"trait_type": "Shattered", "value": "', shatterStr, '"},{"trait_type": "Fused", "value": "', fuseStr, '"}'));
+        }
+        uint256 numTraits = _traitNames.length;
+        bytes[] memory parts = new bytes[](6 + 5 * numTraits);
+        parts[0] = unicode'{"name": "';
+        parts[1] = bytes(name());
+        parts[2] = bytes(nameSuffix);
+        parts[3] = abi.encodePacked(unicode'",', unicode'"description": "', _description, '",', unicode'"attributes": ', "[");
+        for (uint256 i; i < numTraits; i++) {
+            uint256 j = 4 + 5 * i;
+            parts[j] = '{"trait_type": "';
+            parts[j + 1] = bytes(_traitNames[i]);
+            parts[j + 2] = '", "value": "';
+            parts[j + 3] = bytes(_traitValues[i]);
+            parts[j + 4] = '"},';
         }
-        attr = string(abi.encodePacked(attr, "]"));
+        parts[4 + 5 * numTraits] = bytes(attr);
         if (bytes(_animationUrl).length == 0) {
-            return string(
-                abi.encodePacked(
-                    "data:application/json;base64,",
-                    Base64.encode(bytes(abi.encodePacked(
-                        unicode'{"name": "', name, '",',
-                        unicode'"description": "', _description, '",',
-                        unicode'"attributes": ', attr, ',',
-                        '"image": "', _image, '"}'
-                    )))
-                )
-            );
+            parts[5 + 5 * numTraits] = abi.encodePacked("],", '"image": "', _image, '"}');
         } else {
-            return string(
-                abi.encodePacked(
-                    "data:application/json;base64,",
-                    Base64.encode(bytes(abi.encodePacked(
-                        unicode'{"name": "', name, '",',
-                        unicode'"description": "', _description, '",',
-                        unicode'"attributes": ', attr, ',',
-                        '"image": "', _image, '",',
-                        '"animation_url": "', _animationUrl, '"}'
-                    )))
-                )
-            );
+            parts[5 + 5 * numTraits] = abi.encodePacked("],", '"image": "', _image, '",', '"animation_url": "', _animationUrl, '"}');
         }
+        return MetadataRenderer.jsonDataURI(parts);
     }
 
     /// @notice overrides supportsInterface function
@@ -283,23 +274,23 @@ contract ShatterV1_B64 is ERC721S, EIP2981AllToken, Ownable {
         return ERC721S.supportsInterface(interfaceId) || EIP2981AllToken.supportsInterface(interfaceId);
     }
 
-    /// @notice function to override ownerOf in ERC721S
+    /// @notice function to override _ownershipOf in ERC721S, which backs ownerOf, approve, transfers and burns
     /// @dev if is shattered and not fused, checks to see if that token has been transferred or if it belongs to the _shatterAddress.
     ///     Otherwise, returns result from ERC721S.
-    function ownerOf(uint256 tokenId) public view virtual override(ERC721S) returns (address) {
+    function _ownershipOf(uint256 tokenId) internal view virtual override(ERC721S) returns (address, bool) {
         if (isShattered && !isFused) {
             if (tokenId > 0 && tokenId <= shatters) {
-                address owner = _owners[tokenId];
+                address owner = _ownerAt(tokenId);
                 if (owner == address(0)) {
-                    return _shatterAddress;
+                    return (_shatterAddress, true);
                 } else {
-                    return owner;
+                    return (owner, true);
                 }
             } else {
                 revert("Invalid token id");
             }
         } else {
-            return ERC721S.ownerOf(tokenId);
+            return ERC721S._ownershipOf(tokenId);
         }
     }
 
@@ -318,6 +309,16 @@ contract ShatterV1_B64 is ERC721S, EIP2981AllToken, Ownable {
         }
     }
 
+    /// @notice override _tokenIdRange() function from ERC721S
+    /// @dev tokenIds 1 -> shatters while shattered and not fused, otherwise token 0 once minted
+    function _tokenIdRange() internal view override returns (uint256, uint256) {
+        if (isShattered && !isFused) {
+            return (1, shatters + 1);
+        } else {
+            return (0, shatters);
+        }
+    }
+
     /// @notice function to batch mint upon shatter
     /// @dev only mints tokenIds 1 -> quantity to shatterExecutor
     function _batchMint(address shatterExecutor, uint256 quantity) internal {
@@ -0,0 +1,48 @@
+from brownie import ShatterCreatorV1Test, accounts
+from brownie.network.contract import Contract
+import pytest
+
+# metadata minted by the shared ShatterCoreV1 helpers, tests that check the metadata mint their own
+core_metadata = ("An amazing description", "ipfs://IMAGE", "ipfs://ANIM", ["T1", "T2", "T3"], ["V1", "V2", "V3"])
+
+@pytest.fixture(scope="class")
+def deploy_core(logic_contract):
+    # deploys a ShatterCoreV1 proxy on the `logic_contract` of the requesting test module
+    def deploy(max_shatters, shatter_time=0, checkpoint_interval=0):
+        proxy_contract = ShatterCreatorV1Test.deploy(logic_contract.address, "Test", "TST", accounts[1].address, 500, accounts[2].address, 1, max_shatters, shatter_time, checkpoint_interval, {"from": accounts[0]})
+        return Contract.from_abi("ShatterContract", proxy_contract.address, logic_contract.abi)
+    return deploy
+
+@pytest.fixture(scope="class")
+def shatter_and_transfer_last(deploy_core):
+    # shatters in batches of 1000 and returns the gas of the first transfer of the last edition
+    def run(num_shatters, checkpoint_interval):
+        contract = deploy_core(num_shatters, checkpoint_interval=checkpoint_interval)
+        contract.setBatchSize(1000, {"from": accounts[0]})
+        contract.mint(*core_metadata, {"from": accounts[0]})
+        contract.shatter(num_shatters, {"from": accounts[0]})
+        while contract.pendingShatters() > 0:
+            contract.continueShatter({"from": accounts[0]})
+        tx = contract.transferFrom(accounts[0].address, accounts[1].address, num_shatters, {"from": accounts[0]})
+        assert contract.ownerOf(num_shatters) == accounts[1].address and contract.ownerOf(num_shatters - 1) == accounts[0].address
+        return tx.gas_used
+    return run
+
+@pytest.fixture(scope="class")
+def shatter_and_fuse(deploy_core):
+    # shatters, moves one edition out and back, fuses, and returns the number of storage writes of the fuse
+    def run(num_shatters):
+        contract = deploy_core(num_shatters)
+        contract.mint(*core_metadata, {"from": accounts[0]})
+        contract.shatter(num_shatters, {"from": accounts[0]})
+        contract.transferFrom(accounts[0].address, accounts[1].address, num_shatters // 2, {"from": accounts[0]})
+        contract.transferFrom(accounts[1].address, accounts[0].address, num_shatters // 2, {"from": accounts[1]})
+        tx = contract.fuse({"from": accounts[0]})
+        assert (
+            contract.isFused() and
+            contract.balanceOf(accounts[0].address) == 1 and
+            contract.totalSupply() == 1 and
+            len(tx.events["Transfer"]) == num_shatters + 1
+        )
+        return len([step for step in tx.trace if step["op"] == "SSTORE"])
+    return run
@@ -0,0 +1,165 @@
+from brownie import ShatterV1, ShatterV2, ShatterV3, ShatterFactoryV1, accounts, reverts
+from brownie.network.contract import Contract
+import pytest
+
+salt = "0x" + "11" * 32
+num_shatters = 10
+
+# constructor arguments after name, symbol, royalty recipient, royalty percentage and admin
+versions = {
+    "v1": (ShatterV1, [1, 100, 0]),
+    "v2": (ShatterV2, [num_shatters, 0]),
+    "v3": (ShatterV3, [num_shatters, 0])
+}
+
+def shatter(piece, version, sender):
+    if version == "v1":
+        return piece.shatter(num_shatters, {"from": sender})
+    return piece.shatter({"from": sender})
+
+def token_ids(version):
+    # ShatterV3 keeps token 1 through shatter and mints the editions after it
+    if version == "v3":
+        return range(1, num_shatters + 2)
+    return range(1, num_shatters + 1)
+
+def event_summary(tx):
+    return [(event.name, dict(event)) for event in tx.events]
+
+@pytest.fixture(scope="class")
+def factory():
+    v1 = ShatterV1.deploy("Impl", "IMPL", accounts[9].address, 0, accounts[9].address, 1, 1, 0, {"from": accounts[9]})
+    v2 = ShatterV2.deploy("Impl", "IMPL", accounts[9].address, 0, accounts[9].address, 1, 0, {"from": accounts[9]})
+    v3 = ShatterV3.deploy("Impl", "IMPL", accounts[9].address, 0, accounts[9].address, 1, 0, {"from": accounts[9]})
+    return ShatterFactoryV1.deploy(v1.address, v2.address, v3.address, {"from": accounts[9]})
+
+def create_clone(factory, version, deployer_salt):
+    contract_type, args = versions[version]
+    create = getattr(factory, f"createShatter{version.upper()}")
+    tx = create(deployer_salt, "Test", "TST", accounts[1].address, 500, accounts[2].address, *args, {"from": accounts[0]})
+    return tx, Contract.from_abi(f"Shatter{version.upper()}Clone", tx.return_value, contract_type.abi)
+
+@pytest.fixture(scope="class", params=list(versions))
+def pieces(request, factory):
+    version = request.param
+    contract_type, args = versions[version]
+    direct = contract_type.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, *args, {"from": accounts[0]})
+    _, clone = create_clone(factory, version, salt)
+    return version, direct, clone
+
+class TestCloneMatchesConstructor:
+
+    def test_default_values(self, pieces):
+        version, direct, clone = pieces
+        for getter in ["name", "symbol", "owner", "adminAddress", "shatterTime", "batchSize", "useConsecutiveTransfer", "isShattered", "shatters"]:
+            assert getattr(direct, getter)() == getattr(clone, getter)()
+        for getter in (["minShatters", "maxShatters", "isReshatterable"] if version == "v1" else ["numShatters"]):
+            assert getattr(direct, getter)() == getattr(clone, getter)()
+        assert (
+            direct.royaltyInfo(1, 10000) == clone.royaltyInfo(1, 10000) and
+            clone.owner() == accounts[0].address and
+            clone.adminAddress() == accounts[2].address
+        )
+
+    def test_interfaces(self, pieces):
+        _, direct, clone = pieces
+        for interface_id in ["0x80ac58cd", "0x2a55205a", "0x01ffc9a7", "0x5b5e139f", "0x49064906"]:
+            assert direct.supportsInterface(interface_id) == clone.supportsInterface(interface_id) == True
+
+    def test_initialize_again(self, pieces):
+        version, direct, clone = pieces
+        _, args = versions[version]
+        for piece in [direct, clone]:
+            with reverts("Already initialized"):
+                piece.initialize(accounts[3].address, "New", "NEW", accounts[3].address, 1000, accounts[3].address, *args, {"from": accounts[3]})
+
+    def test_mint(self, pieces):
+        version, direct, clone = pieces
+        tx_direct = direct.mint("test/", {"from": accounts[2]})
+        tx_clone = clone.mint("test/", {"from": accounts[2]})
+        first_id = 1 if version == "v3" else 0
+        assert (
+            event_summary(tx_direct) == event_summary(tx_clone) and
+            direct.ownerOf(first_id) == clone.ownerOf(first_id) == accounts[0].address and
+            direct.tokenURI(first_id) == clone.tokenURI(first_id)
+        )
+
+    def test_shatter(self, pieces):
+        version, direct, clone = pieces
+        tx_direct = shatter(direct, version, accounts[0])
+        tx_clone = shatter(clone, version, accounts[0])
+        assert (
+            [event.name for event in tx_direct.events] == [event.name for event in tx_clone.events] and
+            direct.isShattered() == clone.isShattered() == True and
+            direct.shatters() == clone.shatters() and
+            direct.totalSupply() == clone.totalSupply() and
+            direct.balanceOf(accounts[0].address) == clone.balanceOf(accounts[0].address)
+        )
+        for i in token_ids(version):
+            assert direct.ownerOf(i) == clone.ownerOf(i) and direct.tokenURI(i) == clone.tokenURI(i)
+
+    def test_transfer(self, pieces):
+        _, direct, clone = pieces
+        tx_direct = direct.transferFrom(accounts[0].address, accounts[3].address, 2, {"from": accounts[0]})
+        tx_clone = clone.transferFrom(accounts[0].address, accounts[3].address, 2, {"from": accounts[0]})
+        assert (
+            event_summary(tx_direct) == event_summary(tx_clone) and
+            tx_clone.events["Transfer"]["tokenId"] == 2 and
+            direct.ownerOf(2) == clone.ownerOf(2) == accounts[3].address and
+            direct.balanceOf(accounts[3].address) == clone.balanceOf(accounts[3].address) == 1
+        )
+
+    def test_set_base_uri(self, pieces):
+        version, direct, clone = pieces
+        tx_direct = direct.setBaseURI("newURI/", {"from": accounts[0]})
+        tx_clone = clone.setBaseURI("newURI/", {"from": accounts[0]})
+        assert event_summary(tx_direct) == event_summary(tx_clone)
+        for i in token_ids(version):
+            assert direct.tokenURI(i) == clone.tokenURI(i)
+
+class TestCloneFuse:
+    """only ShatterV1 can fuse"""
+    def test_fuse(self, factory):
+        contract_type, args = versions["v1"]
+        direct = contract_type.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, *args, {"from": accounts[0]})
+        _, clone = create_clone(factory, "v1", "0x" + "66" * 32)
+        for piece in [direct, clone]:
+            piece.mint("test/", {"from": accounts[2]})
+            shatter(piece, "v1", accounts[0])
+            piece.transferFrom(accounts[0].address, accounts[3].address, 2, {"from": accounts[0]})
+            piece.transferFrom(accounts[3].address, accounts[0].address, 2, {"from": accounts[3]})
+        tx_direct = direct.fuse({"from": accounts[0]})
+        tx_clone = clone.fuse({"from": accounts[0]})
+        assert (
+            [event.name for event in tx_direct.events] == [event.name for event in tx_clone.events] and
+            direct.isFused() == clone.isFused() == True and
+            direct.ownerOf(0) == clone.ownerOf(0) == accounts[0].address and
+            direct.tokenURI(0) == clone.tokenURI(0)
+        )
+
+class TestCreateClone:
+
+    @pytest.mark.parametrize("version", list(versions))
+    def test_create_at_predicted_address(self, factory, version):
+        implementation = getattr(factory, f"shatter{version.upper()}")()
+        predicted = factory.predictShatterAddress(implementation, accounts[0].address, "0x" + "33" * 32)
+        tx, clone = create_clone(factory, version, "0x" + "33" * 32)
+        assert (
+            clone.address == predicted and
+            tx.events["ShatterCreated"]["_contract"] == predicted and
+            tx.events["ShatterCreated"]["_deployer"] == accounts[0].address
+        )
+
+    def test_same_salt(self, factory):
+        create_clone(factory, "v2", "0x" + "44" * 32)
+        with reverts("ERC1167: create2 failed"):
+            create_clone(factory, "v2", "0x" + "44" * 32)
+
+class TestCloneGas:
+
+    @pytest.mark.parametrize("version", list(versions))
+    def test_clone_cheaper_than_constructor(self, factory, version):
+        contract_type, args = versions[version]
+        direct = contract_type.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, *args, {"from": accounts[0]})
+        tx_clone, _ = create_clone(factory, version, "0x" + "55" * 32)
+        assert tx_clone.gas_used * 4 < direct.tx.gas_used
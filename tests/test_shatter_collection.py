@@ -0,0 +1,318 @@
+from brownie import ShatterCollection, ShatterV1, accounts, reverts, chain
+import pytest
+
+shatter_time = int(chain.time() + 2 * 3600)
+
+def token_id(piece_id, edition):
+    return (piece_id << 128) | edition
+
+@pytest.fixture(scope="class")
+def contract():
+    return ShatterCollection.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, {"from": accounts[0]})
+
+class TestDefault:
+
+    def test_default_values(self, contract):
+        recp, amt = contract.royaltyInfo(1, 10000)
+        assert (
+            contract.name() == "Test" and
+            contract.symbol() == "TST" and
+            contract.numPieces() == 0 and
+            contract.totalSupply() == 0 and
+            contract.adminAddress() == accounts[2].address and
+            recp == accounts[1].address and
+            amt == 500
+        )
+
+    def test_token_id_helpers(self, contract):
+        assert (
+            contract.tokenIdOf(3, 7) == token_id(3, 7) and
+            contract.pieceOf(token_id(3, 7)) == (3, 7)
+        )
+
+class TestInterface:
+
+    def test_erc721_interface(self, contract):
+        assert contract.supportsInterface("0x80ac58cd")
+
+    def test_eip2981_interface(self, contract):
+        assert contract.supportsInterface("0x2a55205a")
+
+    def test_erc165_interface(self, contract):
+        assert contract.supportsInterface("0x01ffc9a7")
+
+    def test_erc721_metadata_interface(self, contract):
+        assert contract.supportsInterface("0x5b5e139f")
+
+    def test_eip4906_interface(self, contract):
+        assert contract.supportsInterface("0x49064906")
+
+class TestAddPiece:
+
+    def test_add_piece_no_access(self, contract):
+        with reverts("Address not admin or owner"):
+            contract.addPiece(1, 100, 0, {"from": accounts[3]})
+
+    def test_add_piece_owner(self, contract):
+        tx = contract.addPiece(1, 100, shatter_time, {"from": accounts[0]})
+        assert (
+            tx.return_value == 0 and
+            tx.events["PieceAdded"]["pieceId"] == 0 and
+            contract.numPieces() == 1 and
+            contract.ownerOf(token_id(0, 0)) == accounts[0].address and
+            contract.pieceConfig(0) == (1, 100, shatter_time) and
+            contract.totalSupply() == 1
+        )
+
+    def test_add_piece_admin(self, contract):
+        tx = contract.addPiece(0, 10, 0, {"from": accounts[2]})
+        assert (
+            tx.return_value == 1 and
+            contract.ownerOf(token_id(1, 0)) == accounts[0].address and
+            contract.pieceConfig(1) == (1, 10, 0) and
+            contract.balanceOf(accounts[0].address) == 2 and
+            contract.totalSupply() == 2
+        )
+
+    def test_nonexistent_piece(self, contract):
+        with reverts("ERC721: invalid token ID"):
+            contract.ownerOf(token_id(2, 0))
+
+    def test_nonexistent_edition(self, contract):
+        with reverts("ERC721: invalid token ID"):
+            contract.ownerOf(token_id(1, 1))
+
+    def test_max_shatters_too_large(self, contract):
+        with reverts("Max shatters must fit in 64 bits"):
+            contract.addPiece(1, 2**64, 0, {"from": accounts[0]})
+
+    def test_min_above_max(self, contract):
+        with reverts("Min shatters cannot be greater than max shatters"):
+            contract.addPiece(11, 10, 0, {"from": accounts[0]})
+        with reverts("Min shatters cannot be greater than max shatters"):
+            contract.addPiece(0, 0, 0, {"from": accounts[0]})
+
+class TestShatter:
+
+    @pytest.fixture(scope="class", autouse=True)
+    def pieces(self, contract):
+        contract.addPiece(1, 100, shatter_time, {"from": accounts[0]})
+        contract.addPiece(5, 10, 0, {"from": accounts[0]})
+        contract.setBaseURI("ipfs://collection/", {"from": accounts[0]})
+
+    def test_shatter_non_owner(self, contract):
+        with reverts("Caller is not owner of the piece"):
+            contract.shatter(1, 10, {"from": accounts[1]})
+
+    def test_shatter_before_time(self, contract):
+        with reverts("Cannot shatter prior to shatterTime"):
+            contract.shatter(0, 10, {"from": accounts[0]})
+
+    def test_shatter_above_max(self, contract):
+        with reverts("Cannot set number of editions above max or below the min"):
+            contract.shatter(1, 11, {"from": accounts[0]})
+
+    def test_shatter_below_min(self, contract):
+        with reverts("Cannot set number of editions above max or below the min"):
+            contract.shatter(1, 4, {"from": accounts[0]})
+
+    def test_shatter(self, contract):
+        contract.transferFrom(accounts[0].address, accounts[3].address, token_id(1, 0), {"from": accounts[0]})
+        tx = contract.shatter(1, 10, {"from": accounts[3]})
+        assert (
+            tx.events["Shattered"]["pieceId"] == 1 and
+            tx.events["Shattered"]["numShatters"] == 10 and
+            len(tx.events["Transfer"]) == 11 and
+            contract.isShattered(1) and
+            not contract.isFused(1) and
+            contract.shatters(1) == 10 and
+            contract.balanceOf(accounts[3].address) == 10 and
+            contract.totalSupply() == 11
+        )
+
+    def test_shatter_only_touches_its_piece(self, contract):
+        assert (
+            not contract.isShattered(0) and
+            contract.ownerOf(token_id(0, 0)) == accounts[0].address and
+            contract.balanceOf(accounts[0].address) == 1
+        )
+
+    def test_owner_of_editions(self, contract):
+        for edition in range(1, 11):
+            assert contract.ownerOf(token_id(1, edition)) == accounts[3].address
+
+    def test_burned_one_of_one(self, contract):
+        with reverts("ERC721: invalid token ID"):
+            contract.ownerOf(token_id(1, 0))
+
+    def test_edition_out_of_range(self, contract):
+        with reverts("ERC721: invalid token ID"):
+            contract.ownerOf(token_id(1, 11))
+
+    def test_token_uri(self, contract):
+        assert (
+            contract.tokenURI(token_id(1, 4)) == "ipfs://collection/1/4" and
+            contract.tokenURI(token_id(0, 0)) == "ipfs://collection/0/0"
+        )
+
+    def test_transfer_edition(self, contract):
+        contract.transferFrom(accounts[3].address, accounts[4].address, token_id(1, 5), {"from": accounts[3]})
+        assert (
+            contract.ownerOf(token_id(1, 5)) == accounts[4].address and
+            contract.ownerOf(token_id(1, 6)) == accounts[3].address and
+            contract.balanceOf(accounts[4].address) == 1
+        )
+
+    def test_shatter_again(self, contract):
+        with reverts("Already is shattered"):
+            contract.shatter(1, 10, {"from": accounts[3]})
+
+    def test_second_piece_after_time(self, contract):
+        chain.sleep(int(shatter_time - chain.time()) + 1)
+        contract.shatter(0, 100, {"from": accounts[0]})
+        assert (
+            contract.balanceOf(accounts[0].address) == 100 and
+            contract.ownerOf(token_id(0, 100)) == accounts[0].address and
+            contract.ownerOf(token_id(1, 10)) == accounts[3].address and
+            contract.totalSupply() == 110
+        )
+
+    def test_tokens_of_owner(self, contract):
+        token_ids, _ = contract.tokensOfOwner(accounts[4].address, token_id(1, 0), 11)
+        assert list(token_ids) == [token_id(1, 5)]
+
+class TestFuse:
+
+    @pytest.fixture(scope="class", autouse=True)
+    def piece(self, contract):
+        contract.addPiece(1, 10, 0, {"from": accounts[0]})
+        contract.shatter(0, 10, {"from": accounts[0]})
+        contract.transferFrom(accounts[0].address, accounts[5].address, token_id(0, 3), {"from": accounts[0]})
+
+    def test_fuse_not_all_editions(self, contract):
+        with reverts("Msg sender must own all editions"):
+            contract.fuse(0, {"from": accounts[0]})
+
+    def test_fuse_by_edition_holder(self, contract):
+        with reverts("Msg sender must own all editions"):
+            contract.fuse(0, {"from": accounts[5]})
+
+    def test_fuse_after_edition_round_trip(self, contract):
+        contract.transferFrom(accounts[5].address, accounts[6].address, token_id(0, 3), {"from": accounts[5]})
+        with reverts("Msg sender must own all editions"):
+            contract.fuse(0, {"from": accounts[6]})
+        contract.transferFrom(accounts[6].address, accounts[5].address, token_id(0, 3), {"from": accounts[6]})
+
+    def test_fuse(self, contract):
+        contract.transferFrom(accounts[5].address, accounts[0].address, token_id(0, 3), {"from": accounts[5]})
+        tx = contract.fuse(0, {"from": accounts[0]})
+        assert (
+            tx.events["Fused"]["pieceId"] == 0 and
+            len(tx.events["Transfer"]) == 11 and
+            contract.isFused(0) and
+            contract.ownerOf(token_id(0, 0)) == accounts[0].address and
+            contract.balanceOf(accounts[0].address) == 1 and
+            contract.balanceOf(accounts[5].address) == 0 and
+            contract.totalSupply() == 1
+        )
+
+    def test_editions_gone_after_fuse(self, contract):
+        with reverts("ERC721: invalid token ID"):
+            contract.ownerOf(token_id(0, 3))
+
+    def test_fuse_again(self, contract):
+        with reverts("Already is fused"):
+            contract.fuse(0, {"from": accounts[0]})
+
+    def test_fuse_unshattered(self, contract):
+        contract.addPiece(1, 10, 0, {"from": accounts[0]})
+        with reverts("Can't fuse if not already shattered"):
+            contract.fuse(1, {"from": accounts[0]})
+
+class TestSingleShatter:
+
+    def test_shatter_to_one(self, contract):
+        contract.addPiece(1, 10, 0, {"from": accounts[0]})
+        tx = contract.shatter(0, 1, {"from": accounts[0]})
+        assert (
+            "Shattered" in tx.events and
+            "Fused" in tx.events and
+            tx.events["MetadataUpdate"]["_tokenId"] == token_id(0, 0) and
+            contract.isShattered(0) and
+            contract.isFused(0) and
+            contract.ownerOf(token_id(0, 0)) == accounts[0].address and
+            contract.totalSupply() == 1
+        )
+
+class TestConsecutiveTransfer:
+
+    def test_shatter_and_fuse(self, contract):
+        contract.setConsecutiveTransfer(True, {"from": accounts[0]})
+        contract.addPiece(1, 100, 0, {"from": accounts[0]})
+        contract.addPiece(1, 100, 0, {"from": accounts[0]})
+        tx_shatter = contract.shatter(1, 100, {"from": accounts[0]})
+        tx_fuse = contract.fuse(1, {"from": accounts[0]})
+        assert (
+            tx_shatter.events["ConsecutiveTransfer"]["fromTokenId"] == token_id(1, 1) and
+            tx_shatter.events["ConsecutiveTransfer"]["toTokenId"] == token_id(1, 100) and
+            tx_fuse.events["ConsecutiveTransfer"]["fromAddress"] == accounts[0].address and
+            contract.ownerOf(token_id(0, 0)) == accounts[0].address and
+            contract.ownerOf(token_id(1, 0)) == accounts[0].address
+        )
+
+    def test_fuse_cost_independent_of_editions(self, contract):
+        gas = []
+        for num in [10, 100]:
+            contract.addPiece(1, 100, 0, {"from": accounts[0]})
+            piece_id = contract.numPieces() - 1
+            contract.shatter(piece_id, num, {"from": accounts[0]})
+            gas.append(contract.fuse(piece_id, {"from": accounts[0]}).gas_used)
+        assert abs(gas[1] - gas[0]) < 1000
+
+class TestBulkViews:
+
+    @pytest.fixture(scope="class", autouse=True)
+    def pieces(self, contract):
+        for _ in range(3):
+            contract.addPiece(1, 10, 0, {"from": accounts[0]})
+        contract.shatter(0, 5, {"from": accounts[0]})
+        contract.shatter(2, 3, {"from": accounts[0]})
+        contract.transferFrom(accounts[0].address, accounts[3].address, token_id(0, 2), {"from": accounts[0]})
+        contract.transferFrom(accounts[0].address, accounts[3].address, token_id(2, 1), {"from": accounts[0]})
+
+    def test_tokens_of_owner(self, contract):
+        token_ids, cursor = contract.tokensOfOwner(accounts[0].address, 0, 100)
+        assert (
+            list(token_ids) == [token_id(0, 1), token_id(0, 3), token_id(0, 4), token_id(0, 5), token_id(1, 0), token_id(2, 2), token_id(2, 3)] and
+            cursor == 0
+        )
+
+    def test_tokens_of_owner_pages(self, contract):
+        # 5 + 1 + 3 ids can exist, so a limit of 3 covers every piece in 3 calls
+        token_ids, cursor = contract.tokensOfOwner(accounts[3].address, 0, 3)
+        pages = [(list(token_ids), cursor)]
+        while cursor != 0:
+            token_ids, cursor = contract.tokensOfOwner(accounts[3].address, cursor, 3)
+            pages.append((list(token_ids), cursor))
+        assert pages == [([token_id(0, 2)], token_id(0, 4)), ([], token_id(2, 1)), ([token_id(2, 1)], 0)]
+
+    def test_tokens_of_owner_zero_limit(self, contract):
+        with reverts("Limit must be greater than 0"):
+            contract.tokensOfOwner(accounts[3].address, 0, 0)
+
+    def test_owners_of_range(self, contract):
+        owners = contract.ownersOfRange(token_id(0, 1), 6)
+        assert list(owners) == [accounts[0].address, accounts[3].address] + [accounts[0].address] * 3 + [f"0x{bytes(20).hex()}"]
+
+    def test_owners_of_range_across_pieces(self, contract):
+        with reverts("Range must stay within one piece"):
+            contract.ownersOfRange(token_id(0, 1), 2**128)
+
+class TestAddPieceGas:
+
+    def test_add_piece_cheaper_than_deploy(self, contract):
+        contract.addPiece(1, 100, 0, {"from": accounts[0]})
+        tx = contract.addPiece(1, 100, 0, {"from": accounts[0]})
+        deployed = ShatterV1.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 100, 0, {"from": accounts[0]})
+        tx_mint = deployed.mint("test/", {"from": accounts[0]})
+        assert tx.gas_used * 10 < deployed.tx.gas_used + tx_mint.gas_used
@@ -0,0 +1,112 @@
+from brownie import ShatterCoreV1, ShatterCoreFactoryV1, ShatterCreatorV1Test, ShatterRegistryTest, ShatterRegistryEngineV2, accounts, reverts
+from brownie.network.contract import Contract
+from evm_sc_utils.signers import EIP191Signer
+import pytest
+from secrets import token_hex
+
+salt = "0x" + "11" * 32
+
+@pytest.fixture(scope="class")
+def logic_contract():
+    return ShatterCoreV1.deploy({"from": accounts[9]})
+
+@pytest.fixture(scope="class")
+def registry():
+    logic_registry = ShatterRegistryEngineV2.deploy({"from": accounts[9]})
+    proxy_contract = ShatterRegistryTest.deploy(logic_registry.address, {"from": accounts[0]})
+    return Contract.from_abi("ShatterRegistry", proxy_contract.address, logic_registry.abi)
+
+@pytest.fixture(scope="class")
+def factory(logic_contract, registry):
+    factory = ShatterCoreFactoryV1.deploy(logic_contract.address, registry.address, {"from": accounts[0]})
+    registry.setFactory(factory.address, True, {"from": accounts[0]})
+    return factory
+
+def create_shatter(factory, deployer, deployer_salt):
+    return factory.createShatter(deployer_salt, "Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 100, 0, 0, {"from": deployer})
+
+class TestRegistryAccess:
+    def test_set_factory_non_owner(self, registry):
+        with reverts("Ownable: caller is not the owner"):
+            registry.setFactory(accounts[1].address, True, {"from": accounts[1]})
+
+    def test_register_from_untrusted_factory(self, registry):
+        with reverts("Caller is not a trusted factory"):
+            registry.registerFromFactory(accounts[1].address, accounts[2].address, 1, {"from": accounts[1]})
+
+    def test_set_factory(self, registry):
+        tx = registry.setFactory(accounts[1].address, True, {"from": accounts[0]})
+        assert registry.isFactory(accounts[1].address) and tx.events["FactoryUpdate"]["_trusted"]
+
+    def test_register_from_factory(self, registry):
+        registry.registerFromFactory(accounts[3].address, accounts[4].address, 1, {"from": accounts[1]})
+        tf, version = registry.lookup(accounts[4].address)
+        assert tf and version == 1
+
+    def test_register_from_factory_already_registered(self, registry):
+        with reverts("Already registered"):
+            registry.registerFromFactory(accounts[3].address, accounts[4].address, 1, {"from": accounts[1]})
+
+    def test_untrust_factory(self, registry):
+        registry.setFactory(accounts[1].address, False, {"from": accounts[0]})
+        with reverts("Caller is not a trusted factory"):
+            registry.registerFromFactory(accounts[3].address, accounts[5].address, 1, {"from": accounts[1]})
+
+class TestCreateShatter:
+    def test_create_at_predicted_address(self, factory, registry, logic_contract):
+        predicted = factory.predictShatterAddress(accounts[0].address, salt)
+        tx = create_shatter(factory, accounts[0], salt)
+        piece = Contract.from_abi("ShatterContract", tx.return_value, logic_contract.abi)
+        tf, version = registry.lookup(piece.address)
+        assert (
+            tx.return_value == predicted and
+            tx.events["ShatterCreated"]["_contract"] == predicted and
+            tx.events["Register"]["_deployer"] == accounts[0].address and
+            tf and version == 1 and
+            piece.name() == "Test" and
+            piece.owner() == accounts[0].address and
+            piece.admin() == accounts[2].address and
+            piece.maxShatters() == 100
+        )
+
+    def test_clone_is_functional(self, factory, logic_contract):
+        piece = Contract.from_abi("ShatterContract", factory.predictShatterAddress(accounts[0].address, salt), logic_contract.abi)
+        piece.mint("desc", "img", "", [], [], {"from": accounts[0]})
+        piece.shatter(10, {"from": accounts[0]})
+        assert piece.balanceOf(accounts[0].address) == 10
+
+    def test_initialize_again(self, factory, logic_contract):
+        piece = Contract.from_abi("ShatterContract", factory.predictShatterAddress(accounts[0].address, salt), logic_contract.abi)
+        with reverts():
+            piece.initialize("newName", "NAME", accounts[3].address, 1000, accounts[3].address, 1, 100, 0, 0, {"from": accounts[0]})
+
+    def test_same_salt(self, factory):
+        with reverts("ERC1167: create2 failed"):
+            create_shatter(factory, accounts[0], salt)
+
+    def test_same_salt_other_deployer(self, factory, logic_contract):
+        tx = create_shatter(factory, accounts[1], salt)
+        piece = Contract.from_abi("ShatterContract", tx.return_value, logic_contract.abi)
+        assert (
+            tx.return_value == factory.predictShatterAddress(accounts[1].address, salt) and
+            tx.return_value != factory.predictShatterAddress(accounts[0].address, salt) and
+            piece.owner() == accounts[1].address
+        )
+
+    def test_untrusted_factory(self, logic_contract, registry):
+        untrusted = ShatterCoreFactoryV1.deploy(logic_contract.address, registry.address, {"from": accounts[0]})
+        with reverts("Caller is not a trusted factory"):
+            create_shatter(untrusted, accounts[0], salt)
+
+class TestCreateShatterGas:
+    def test_clone_cheaper_than_proxy(self, factory, registry, logic_contract):
+        tx_clone = create_shatter(factory, accounts[0], "0x" + "22" * 32)
+        # ShatterCreatorV1 deploys an ERC1967 proxy and registers it with a signature in the same transaction
+        signer = EIP191Signer()
+        registry.setSigner(signer.address, {"from": accounts[0]})
+        proxy_contract = ShatterCreatorV1Test.deploy(logic_contract.address, "Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 100, 0, 0, {"from": accounts[0]})
+        nonce = token_hex(32)
+        sig = signer.sign(["address", "uint256", "bytes32"], [accounts[0].address, 1, nonce]).signature
+        tx_register = registry.register(accounts[0].address, 1, nonce, sig, {"from": accounts[5]})
+        proxy_gas = proxy_contract.tx.gas_used + tx_register.gas_used - 21000
+        assert tx_clone.gas_used < proxy_gas
@@ -1,5 +1,4 @@
-from brownie import ShatterCoreV1, ShatterCreatorV1Test, accounts, reverts, chain
-from brownie.network.contract import Contract
+from brownie import ShatterCoreV1, accounts, reverts, chain, web3
 import pytest
 import base64
 import json
@@ -28,9 +27,12 @@ def logic_contract():
     return ShatterCoreV1.deploy({"from": accounts[9]})
 
 @pytest.fixture(scope="class")
-def contract(logic_contract):
-    proxy_contract = ShatterCreatorV1Test.deploy(logic_contract.address, "Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 100, shatter_time, {"from": accounts[0]})
-    return Contract.from_abi("ShatterContract", proxy_contract.address, logic_contract.abi)
+def contract(deploy_core):
+    return deploy_core(100, shatter_time)
+
+@pytest.fixture(scope="class")
+def large_contract(deploy_core):
+    return deploy_core(20000)
 
 class TestDefault:
 
@@ -47,6 +49,11 @@ class TestDefault:
             amt == 500
         )
 
+class TestContractSize:
+
+    def test_under_eip170_limit(self, logic_contract):
+        assert len(web3.eth.get_code(logic_contract.address)) <= 24576
+
 class TestInterface:
 
     def test_erc721_interface(self, contract):
@@ -61,6 +68,9 @@ class TestInterface:
     def test_erc721_metadata_interface(self, contract):
         assert contract.supportsInterface("0x5b5e139f")
 
+    def test_eip4906_interface(self, contract):
+        assert contract.supportsInterface("0x49064906")
+
     
 class TestNoAccess:
 
@@ -401,4 +411,340 @@ class TestTokenURIMultipleAnimation:
             "Shattered" not in tx.events.keys() and
             "Fused" in tx.events.keys() and
             tx.events["Fused"]["_user"] == accounts[0].address
-        )
\ No newline at end of file
+        )
+
+class TestFuseOwnershipProof:
+    def test_fuse_not_owner_of_all(self, contract):
+        contract.mint(desc, img, anim, trait_names, trait_values, {"from": accounts[0]})
+        contract.shatter(100, {"from": accounts[0]})
+        contract.safeTransferFrom(accounts[0].address, accounts[1].address, 100, {"from": accounts[0]})
+        with reverts("Msg sender must own all editions"):
+            contract.fuse({"from": accounts[0]})
+
+    def test_fuse(self, contract):
+        contract.safeTransferFrom(accounts[1].address, accounts[0].address, 100, {"from": accounts[1]})
+        contract.fuse({"from": accounts[0]})
+        assert (
+            contract.balanceOf(accounts[0].address) == 1 and
+            contract.totalSupply() == 1 and
+            contract.ownerOf(101) == accounts[0].address
+        )
+
+    def test_burned_shards(self, contract):
+        with reverts():
+            contract.ownerOf(1)
+        with reverts():
+            contract.ownerOf(100)
+        with reverts():
+            contract.tokenURI(50)
+        with reverts():
+            contract.transferFrom(accounts[0].address, accounts[1].address, 100, {"from": accounts[0]})
+
+class TestBatchedShatterAndFuse:
+    def test_set_batch_size_non_admin_owner(self, large_contract):
+        with reverts("Address not admin or owner"):
+            large_contract.setBatchSize(2500, {"from": accounts[3]})
+
+    def test_shatter(self, large_contract):
+        large_contract.setBatchSize(2500, {"from": accounts[0]})
+        large_contract.mint(desc, img, anim, trait_names, trait_values, {"from": accounts[0]})
+        tx = large_contract.shatter(20000, {"from": accounts[0]})
+        assert(
+            large_contract.shatters() == 2500 and
+            large_contract.pendingShatters() == 17500 and
+            "Shattered" not in tx.events.keys() and
+            large_contract.balanceOf(accounts[0].address) == 2500
+        )
+
+    def test_set_batch_size_in_progress(self, large_contract):
+        with reverts("Shatter or fuse in progress"):
+            large_contract.setBatchSize(5000, {"from": accounts[0]})
+
+    def test_transfer_finalized_shard(self, large_contract):
+        large_contract.transferFrom(accounts[0].address, accounts[1].address, 2500, {"from": accounts[0]})
+        assert large_contract.ownerOf(2500) == accounts[1].address
+        with reverts():
+            large_contract.ownerOf(2501)
+
+    def test_fuse_during_shatter(self, large_contract):
+        with reverts("Shatter or fuse in progress"):
+            large_contract.fuse({"from": accounts[0]})
+
+    def test_continue_shatter(self, large_contract):
+        num_txs = 0
+        while large_contract.pendingShatters() > 0:
+            tx = large_contract.continueShatter({"from": accounts[3]})
+            num_txs += 1
+        assert(
+            num_txs == 7 and
+            tx.events["Shattered"]["_user"] == accounts[0].address and
+            tx.events["Shattered"]["_numShatters"] == 20000 and
+            large_contract.ownerOf(20000) == accounts[0].address and
+            large_contract.balanceOf(accounts[0].address) == 19999
+        )
+
+    def test_fuse(self, large_contract):
+        large_contract.transferFrom(accounts[1].address, accounts[0].address, 2500, {"from": accounts[1]})
+        tx = large_contract.fuse({"from": accounts[0]})
+        assert(
+            large_contract.isFusing() and
+            large_contract.pendingShatters() == 17500 and
+            "Fused" not in tx.events.keys()
+        )
+
+    def test_transfer_during_fuse(self, large_contract):
+        with reverts("Fuse in progress"):
+            large_contract.transferFrom(accounts[0].address, accounts[1].address, 20000, {"from": accounts[0]})
+        with reverts():
+            large_contract.ownerOf(1)
+
+    def test_continue_fuse(self, large_contract):
+        num_txs = 0
+        while large_contract.isFusing():
+            tx = large_contract.continueFuse({"from": accounts[3]})
+            num_txs += 1
+        assert(
+            num_txs == 7 and
+            tx.events["Fused"]["_user"] == accounts[0].address and
+            large_contract.isFused() and
+            large_contract.ownerOf(20001) == accounts[0].address and
+            large_contract.balanceOf(accounts[0].address) == 1 and
+            large_contract.totalSupply() == 1
+        )
+
+    def test_continue_fuse_when_done(self, large_contract):
+        with reverts("No fuse in progress"):
+            large_contract.continueFuse({"from": accounts[0]})
+
+class TestOwnershipCheckpoints:
+    def test_checkpoint_interval(self, contract, deploy_core):
+        checkpointed = deploy_core(100, checkpoint_interval=10)
+        assert contract.checkpointInterval() == 0 and checkpointed.checkpointInterval() == 10
+
+    def test_initialize_again(self, contract):
+        with reverts("ERC721A__Initializable: contract is already initialized"):
+            contract.initialize("newName", "NAME", accounts[3].address, 1000, accounts[3].address, 1, 100, 0, 10, {"from": accounts[0]})
+
+    def test_shatter_unaligned_batches(self, deploy_core):
+        c = deploy_core(100, checkpoint_interval=10)
+        c.setBatchSize(33, {"from": accounts[0]})
+        c.mint(desc, img, anim, trait_names, trait_values, {"from": accounts[0]})
+        c.shatter(100, {"from": accounts[0]})
+        while c.pendingShatters() > 0:
+            c.continueShatter({"from": accounts[0]})
+        assert (
+            c.balanceOf(accounts[0].address) == 100 and
+            all(c.ownerOf(i) == accounts[0].address for i in range(1, 101))
+        )
+
+    def test_first_transfer_cost_at_end_of_range(self, shatter_and_transfer_last):
+        gas = [shatter_and_transfer_last(n, 10) for n in [100, 1000, 5000]]
+        unbounded_gas = [shatter_and_transfer_last(n, 0) for n in [100, 1000]]
+        assert (
+            max(gas) - min(gas) < 1000 and
+            unbounded_gas[0] > gas[0] and
+            unbounded_gas[1] - gas[1] > 1000000
+        )
+
+class TestRangeBurn:
+    def test_fuse_writes_no_storage_per_edition(self, shatter_and_fuse):
+        small, large = [shatter_and_fuse(n) for n in [100, 1000]]
+        # only the Transfer event is emitted per edition, the storage writes of a fuse don't depend on the edition count
+        assert small == large
+
+class TestMetadataTemplate:
+    def test_no_traits(self, contract):
+        contract.mint(desc, img, "", [], [], {"from": accounts[0]})
+        uri = get_uri(contract, 0)
+        assert (
+            uri["name"] == "Test" and
+            get_trait_dict(uri["attributes"]) == {"Shattered": "No", "Fused": "No"} and
+            "animation_url" not in uri
+        )
+
+    def test_setters_after_shatter(self, contract):
+        contract.shatter(50, {"from": accounts[0]})
+        contract.setDescription("newDescription", {"from": accounts[0]})
+        contract.setImage("newImage", {"from": accounts[0]})
+        contract.setAnimation("newAnimation", {"from": accounts[0]})
+        contract.setTraits(["T4"], ["V4"], {"from": accounts[0]})
+        uri = get_uri(contract, 25)
+        assert (
+            uri["name"] == "Test #25/50" and
+            uri["description"] == "newDescription" and
+            uri["image"] == "newImage" and
+            uri["animation_url"] == "newAnimation" and
+            get_trait_dict(uri["attributes"]) == {"T4": "V4", "Edition": "25", "Shattered": "Yes", "Fused": "No"}
+        )
+
+    def test_remove_animation(self, contract):
+        contract.setAnimation("", {"from": accounts[0]})
+        uri = get_uri(contract, 50)
+        assert uri["name"] == "Test #50/50" and uri["image"] == "newImage" and "animation_url" not in uri
+
+class TestLargeMetadata:
+    # a data URI image pushes the metadata template past the 24,576 byte code size limit, so it is rendered from storage
+    large_img = "data:image/svg+xml;base64," + "A" * 24600
+
+    @pytest.fixture(scope="class")
+    def piece(self, deploy_core):
+        return deploy_core(100)
+
+    def test_mint_large_image(self, piece):
+        piece.mint(desc, self.large_img, anim, trait_names, trait_values, {"from": accounts[0]})
+        uri = get_uri(piece, 0)
+        assert (
+            uri["name"] == "Test" and
+            uri["description"] == desc and
+            uri["image"] == self.large_img and
+            uri["animation_url"] == anim and
+            get_trait_dict(uri["attributes"]) == {"T1": "V1", "T2": "V2", "T3": "V3", "Shattered": "No", "Fused": "No"}
+        )
+
+    def test_shatter_large_image(self, piece):
+        piece.shatter(10, {"from": accounts[0]})
+        uri = get_uri(piece, 4)
+        assert uri["name"] == "Test #4/10" and uri["image"] == self.large_img
+
+    def test_set_small_image(self, piece):
+        piece.setImage(img, {"from": accounts[0]})
+        uri = get_uri(piece, 4)
+        assert uri["image"] == img and uri["description"] == desc
+
+    def test_set_large_animation_and_trait(self, piece):
+        piece.setAnimation(self.large_img, {"from": accounts[0]})
+        piece.setTrait(1, "T2", self.large_img, {"from": accounts[0]})
+        uri = get_uri(piece, 10)
+        assert (
+            uri["animation_url"] == self.large_img and
+            get_trait_dict(uri["attributes"]) == {"T1": "V1", "T2": self.large_img, "T3": "V3", "Edition": "10", "Shattered": "Yes", "Fused": "No"}
+        )
+
+class TestTokenURIRenderer:
+    def test_gas_curve(self, contract):
+        contract.mint(desc, img, anim, [], [], {"from": accounts[0]})
+        gas = []
+        for num_traits in range(0, 51, 10):
+            contract.setTraits([f"T{i}" for i in range(num_traits)], [f"V{i}" for i in range(num_traits)], {"from": accounts[0]})
+            uri = get_uri(contract, 0)
+            assert len(uri["attributes"]) == num_traits + 2 and uri["animation_url"] == anim
+            gas.append(contract.tokenURI.estimate_gas(0))
+        steps = [gas[i + 1] - gas[i] for i in range(len(gas) - 1)]
+        assert max(steps) - min(steps) < min(steps) // 10
+
+class TestTraitPatching:
+    def test_set_trait_non_admin_owner(self, contract):
+        contract.mint(desc, img, anim, trait_names, trait_values, {"from": accounts[0]})
+        with reverts("Address not admin or owner"):
+            contract.setTrait(0, "T1", "V9", {"from": accounts[3]})
+        with reverts("Address not admin or owner"):
+            contract.appendTraits(["T4"], ["V4"], {"from": accounts[3]})
+        with reverts("Address not admin or owner"):
+            contract.removeTrait(0, {"from": accounts[3]})
+
+    def test_out_of_bounds(self, contract):
+        with reverts("Trait index out of bounds"):
+            contract.setTrait(3, "T4", "V4", {"from": accounts[0]})
+        with reverts("Trait index out of bounds"):
+            contract.removeTrait(3, {"from": accounts[0]})
+        with reverts("Array lengths must be equal"):
+            contract.appendTraits(["T4"], [], {"from": accounts[0]})
+
+    def test_set_trait(self, contract):
+        contract.setTrait(1, "T2", "V9", {"from": accounts[2]})
+        uri = get_uri(contract, 0)
+        assert [a["trait_type"] for a in uri["attributes"]][:3] == ["T1", "T2", "T3"] and get_trait_dict(uri["attributes"])["T2"] == "V9"
+
+    def test_append_traits(self, contract):
+        contract.appendTraits(["T4", "T5"], ["V4", "V5"], {"from": accounts[0]})
+        uri = get_uri(contract, 0)
+        assert [a["trait_type"] for a in uri["attributes"]] == ["T1", "T2", "T3", "T4", "T5", "Shattered", "Fused"]
+
+    def test_remove_trait(self, contract):
+        contract.removeTrait(1, {"from": accounts[0]})
+        uri = get_uri(contract, 0)
+        assert (
+            [a["trait_type"] for a in uri["attributes"]] == ["T1", "T5", "T3", "T4", "Shattered", "Fused"] and
+            [a["value"] for a in uri["attributes"]][:4] == ["V1", "V5", "V3", "V4"]
+        )
+
+    def test_set_trait_after_remove(self, contract):
+        contract.setTrait(2, "T3", "V8", {"from": accounts[0]})
+        uri = get_uri(contract, 0)
+        assert [a["value"] for a in uri["attributes"]][:4] == ["V1", "V5", "V8", "V4"]
+
+    def test_remove_last_trait(self, contract):
+        contract.removeTrait(3, {"from": accounts[0]})
+        uri = get_uri(contract, 0)
+        assert [a["trait_type"] for a in uri["attributes"]] == ["T1", "T5", "T3", "Shattered", "Fused"]
+
+    def test_set_traits_shrinks(self, contract):
+        contract.setTraits(["A"], ["1"], {"from": accounts[0]})
+        uri = get_uri(contract, 0)
+        assert get_trait_dict(uri["attributes"]) == {"A": "1", "Shattered": "No", "Fused": "No"}
+
+    def test_set_trait_cost(self, contract):
+        names = [f"Trait name number {i} with some length" for i in range(30)]
+        values = [f"Trait value number {i} " + "x" * 80 for i in range(30)]
+        contract.setTraits(names, values, {"from": accounts[0]})
+        values[15] = "A new value " + "y" * 80
+        tx_all = contract.setTraits(names, values, {"from": accounts[0]})
+        tx_one = contract.setTrait(15, names[15], "Another value " + "z" * 80, {"from": accounts[0]})
+        assert (
+            get_trait_dict(get_uri(contract, 0)["attributes"])[names[15]] == "Another value " + "z" * 80 and
+            tx_one.gas_used < tx_all.gas_used // 10
+        )
+
+    def test_remove_trait_cost(self, contract):
+        gas = []
+        for num_traits in [5, 30]:
+            contract.setTraits([f"Trait name {i:03}" for i in range(num_traits)], [f"Trait value {i:03}" for i in range(num_traits)], {"from": accounts[0]})
+            gas.append(contract.removeTrait(0, {"from": accounts[0]}).gas_used)
+        assert abs(gas[1] - gas[0]) < 1000
+
+class TestMetadataUpdate:
+    @pytest.fixture(scope="class")
+    def small_contract(self, deploy_core):
+        return deploy_core(100)
+
+    def test_setter_before_mint(self, small_contract):
+        tx = small_contract.setDescription(desc, {"from": accounts[0]})
+        assert "MetadataUpdate" not in tx.events and "BatchMetadataUpdate" not in tx.events
+
+    def test_setters_after_mint(self, small_contract):
+        small_contract.mint(desc, img, anim, trait_names, trait_values, {"from": accounts[0]})
+        txs = [
+            small_contract.setDescription("newDescription", {"from": accounts[0]}),
+            small_contract.setImage("newImage", {"from": accounts[0]}),
+            small_contract.setAnimation("newAnimation", {"from": accounts[0]}),
+            small_contract.setTraits(["T1"], ["V1"], {"from": accounts[0]}),
+            small_contract.setTrait(0, "T1", "V2", {"from": accounts[0]}),
+            small_contract.appendTraits(["T2"], ["V2"], {"from": accounts[0]}),
+            small_contract.removeTrait(1, {"from": accounts[0]})
+        ]
+        assert all(tx.events["MetadataUpdate"]["_tokenId"] == 0 for tx in txs)
+
+    def test_batched_shatter(self, small_contract):
+        small_contract.setBatchSize(40, {"from": accounts[0]})
+        tx = small_contract.shatter(100, {"from": accounts[0]})
+        assert "BatchMetadataUpdate" not in tx.events
+        tx = small_contract.continueShatter({"from": accounts[0]})
+        assert tx.events["BatchMetadataUpdate"]["_fromTokenId"] == 1 and tx.events["BatchMetadataUpdate"]["_toTokenId"] == 40
+        tx = small_contract.continueShatter({"from": accounts[0]})
+        assert tx.events["BatchMetadataUpdate"]["_fromTokenId"] == 1 and tx.events["BatchMetadataUpdate"]["_toTokenId"] == 80
+
+    def test_setter_after_shatter(self, small_contract):
+        tx = small_contract.setDescription(desc, {"from": accounts[0]})
+        assert tx.events["BatchMetadataUpdate"]["_fromTokenId"] == 1 and tx.events["BatchMetadataUpdate"]["_toTokenId"] == 100
+
+    def test_setter_after_fuse(self, small_contract):
+        small_contract.setBatchSize(0, {"from": accounts[0]})
+        small_contract.fuse({"from": accounts[0]})
+        tx = small_contract.setDescription(desc, {"from": accounts[0]})
+        assert tx.events["MetadataUpdate"]["_tokenId"] == 101
+
+    def test_shatter_to_one_of_one(self, deploy_core):
+        single = deploy_core(100)
+        single.mint(desc, img, anim, trait_names, trait_values, {"from": accounts[0]})
+        tx = single.shatter(1, {"from": accounts[0]})
+        assert tx.events["MetadataUpdate"]["_tokenId"] == 0
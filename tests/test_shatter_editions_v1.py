@@ -0,0 +1,194 @@
+from brownie import ShatterEditionsV1, accounts, reverts, chain
+import pytest
+
+shatter_time = int(chain.time() + 2 * 3600)
+
+@pytest.fixture(scope="class")
+def contract():
+    return ShatterEditionsV1.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 100, shatter_time, {"from": accounts[0]})
+
+@pytest.fixture(scope="class")
+def large_contract():
+    return ShatterEditionsV1.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 2**64, 0, {"from": accounts[0]})
+
+class TestDefault:
+
+    def test_default_values(self, contract):
+        recp, amt = contract.royaltyInfo(1, 10000)
+        assert (
+            contract.name() == "Test" and
+            contract.symbol() == "TST" and
+            contract.minShatters() == 1 and
+            contract.maxShatters() == 100 and
+            contract.shatterTime() == shatter_time and
+            not contract.isShattered() and
+            not contract.isFused() and
+            contract.totalSupply(0) == 0 and
+            recp == accounts[1].address and
+            amt == 500
+        )
+
+class TestInterface:
+
+    def test_erc1155_interface(self, contract):
+        assert contract.supportsInterface("0xd9b67a26")
+
+    def test_erc1155_metadata_uri_interface(self, contract):
+        assert contract.supportsInterface("0x0e89341c")
+
+    def test_eip2981_interface(self, contract):
+        assert contract.supportsInterface("0x2a55205a")
+
+    def test_erc165_interface(self, contract):
+        assert contract.supportsInterface("0x01ffc9a7")
+
+class TestNoUserAccess:
+
+    def test_set_royalty_info(self, contract):
+        with reverts("Ownable: caller is not the owner"):
+            contract.setRoyaltyInfo(accounts[3].address, 1000, {"from": accounts[3]})
+
+    def test_renounce_admin(self, contract):
+        with reverts("Address not admin"):
+            contract.renounceAdmin({"from": accounts[3]})
+
+    def test_set_admin_address(self, contract):
+        with reverts("Ownable: caller is not the owner"):
+            contract.setAdminAddress(accounts[3].address, {"from": accounts[3]})
+
+    def test_set_base_uri(self, contract):
+        with reverts("Ownable: caller is not the owner"):
+            contract.setBaseURI("newURI/", {"from": accounts[3]})
+
+    def test_mint(self, contract):
+        with reverts("Address not admin or owner"):
+            contract.mint("test/", {"from": accounts[3]})
+
+class TestMint:
+
+    def test_mint(self, contract):
+        tx = contract.mint("test/", {"from": accounts[2]})
+        assert (
+            tx.events["TransferSingle"]["id"] == 0 and
+            contract.balanceOf(accounts[0].address, 0) == 1 and
+            contract.isMinted() and
+            contract.totalSupply(0) == 1 and
+            contract.uri(0) == "test/0"
+        )
+
+    def test_mint_again(self, contract):
+        with reverts("Already minted the first piece"):
+            contract.mint("test/", {"from": accounts[0]})
+
+class TestShatter:
+
+    def test_shatter_not_minted(self, contract):
+        with reverts("Caller is not owner of token 0"):
+            contract.shatter(10, {"from": accounts[0]})
+
+    def test_shatter_non_owner(self, contract):
+        contract.mint("test/", {"from": accounts[0]})
+        with reverts("Caller is not owner of token 0"):
+            contract.shatter(10, {"from": accounts[1]})
+
+    def test_shatter_above_max(self, contract):
+        with reverts("Cannot set number of editions above max or below the min"):
+            contract.shatter(101, {"from": accounts[0]})
+
+    def test_shatter_before_time(self, contract):
+        with reverts("Cannot shatter prior to shatterTime"):
+            contract.shatter(10, {"from": accounts[0]})
+
+    def test_shatter(self, contract):
+        chain.sleep(int(shatter_time - chain.time()) + 1)
+        contract.safeTransferFrom(accounts[0].address, accounts[5].address, 0, 1, "", {"from": accounts[0]})
+        tx = contract.shatter(100, {"from": accounts[5]})
+        assert (
+            tx.events["Shattered"]["numShatters"] == 100 and
+            len(tx.events["TransferSingle"]) == 2 and
+            contract.isShattered() and
+            not contract.isFused() and
+            contract.shatters() == 100 and
+            contract.balanceOf(accounts[5].address, 0) == 0 and
+            contract.balanceOf(accounts[5].address, 1) == 100 and
+            contract.totalSupply(0) == 0 and
+            contract.totalSupply(1) == 100 and
+            contract.uri(1) == "test/1"
+        )
+
+    def test_shatter_again(self, contract):
+        with reverts("Already is shattered"):
+            contract.shatter(10, {"from": accounts[5]})
+
+    def test_transfer_editions(self, contract):
+        contract.safeTransferFrom(accounts[5].address, accounts[6].address, 1, 40, "", {"from": accounts[5]})
+        assert (
+            contract.balanceOf(accounts[5].address, 1) == 60 and
+            contract.balanceOf(accounts[6].address, 1) == 40
+        )
+
+    def test_fuse_not_all_editions(self, contract):
+        with reverts("Msg sender must own all editions"):
+            contract.fuse({"from": accounts[5]})
+
+    def test_fuse(self, contract):
+        contract.safeTransferFrom(accounts[6].address, accounts[5].address, 1, 40, "", {"from": accounts[6]})
+        tx = contract.fuse({"from": accounts[5]})
+        assert (
+            "Fused" in tx.events and
+            contract.isFused() and
+            contract.balanceOf(accounts[5].address, 1) == 0 and
+            contract.balanceOf(accounts[5].address, 0) == 1 and
+            contract.totalSupply(0) == 1 and
+            contract.totalSupply(1) == 0
+        )
+
+    def test_fuse_again(self, contract):
+        with reverts("Already is fused"):
+            contract.fuse({"from": accounts[5]})
+
+class TestSingleShatter:
+
+    def test_shatter_to_one(self, large_contract):
+        large_contract.mint("test/", {"from": accounts[0]})
+        tx = large_contract.shatter(1, {"from": accounts[0]})
+        assert (
+            "Shattered" in tx.events and
+            "Fused" in tx.events and
+            large_contract.isFused() and
+            large_contract.balanceOf(accounts[0].address, 0) == 1 and
+            large_contract.totalSupply(1) == 0
+        )
+
+    def test_fuse_without_shatter(self):
+        contract = ShatterEditionsV1.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 100, 0, {"from": accounts[0]})
+        contract.mint("test/", {"from": accounts[0]})
+        with reverts("Can't fuse if not already shattered"):
+            contract.fuse({"from": accounts[0]})
+
+class TestSetBaseURI:
+
+    def test_set_base_uri(self, contract):
+        tx = contract.setBaseURI("newURI/", {"from": accounts[0]})
+        assert (
+            [e["value"] for e in tx.events["URI"]] == ["newURI/0", "newURI/1"] and
+            contract.uri(1) == "newURI/1"
+        )
+
+class TestConstantCost:
+
+    def shatter_and_fuse(self, num_shatters):
+        contract = ShatterEditionsV1.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 2**64, 0, {"from": accounts[0]})
+        contract.mint("test/", {"from": accounts[0]})
+        tx_shatter = contract.shatter(num_shatters, {"from": accounts[0]})
+        tx_transfer = contract.safeTransferFrom(accounts[0].address, accounts[3].address, 1, num_shatters // 2, "", {"from": accounts[0]})
+        contract.safeTransferFrom(accounts[3].address, accounts[0].address, 1, num_shatters // 2, "", {"from": accounts[3]})
+        tx_fuse = contract.fuse({"from": accounts[0]})
+        return tx_shatter.gas_used, tx_transfer.gas_used, tx_fuse.gas_used
+
+    def test_cost_independent_of_editions(self):
+        small = self.shatter_and_fuse(10)
+        large = self.shatter_and_fuse(100000)
+        # only the calldata encoding of the edition count can differ
+        for small_gas, large_gas in zip(small, large):
+            assert abs(small_gas - large_gas) < 100
@@ -0,0 +1,103 @@
+from brownie import ShatterRegistryTest, ShatterRegistryEngineV1, ShatterRegistryEngineV2, accounts, reverts
+from brownie.network.contract import Contract
+from evm_sc_utils.signers import EIP191Signer
+import pytest
+from secrets import token_hex
+
+signer = EIP191Signer()
+used_nonce = token_hex(32)
+
+@pytest.fixture(scope="class")
+def contract():
+    # registry populated on the V1 engine, then upgraded in place to V2
+    logic_v1 = ShatterRegistryEngineV1.deploy({"from": accounts[9]})
+    proxy_contract = ShatterRegistryTest.deploy(logic_v1.address, {"from": accounts[0]})
+    registry = Contract.from_abi("ShatterRegistry", proxy_contract.address, logic_v1.abi)
+    registry.setSigner(signer.address, {"from": accounts[0]})
+    registry.manuallyRegister(accounts[1].address, accounts[2].address, 1, {"from": accounts[0]})
+    sig = signer.sign(["address", "uint256", "bytes32"], [accounts[3].address, 2, used_nonce]).signature
+    registry.register(accounts[3].address, 2, used_nonce, sig, {"from": accounts[4]})
+
+    logic_v2 = ShatterRegistryEngineV2.deploy({"from": accounts[9]})
+    registry.upgradeTo(logic_v2.address, {"from": accounts[0]})
+    return Contract.from_abi("ShatterRegistry", proxy_contract.address, logic_v2.abi)
+
+class TestUpgrade:
+
+    def test_upgrade_non_owner(self):
+        logic_v1 = ShatterRegistryEngineV1.deploy({"from": accounts[9]})
+        proxy_contract = ShatterRegistryTest.deploy(logic_v1.address, {"from": accounts[0]})
+        registry = Contract.from_abi("ShatterRegistry", proxy_contract.address, logic_v1.abi)
+        logic_v2 = ShatterRegistryEngineV2.deploy({"from": accounts[9]})
+        with reverts("Ownable: caller is not the owner"):
+            registry.upgradeTo(logic_v2.address, {"from": accounts[1]})
+
+    def test_state_preserved(self, contract):
+        tf_manual, v_manual = contract.lookup(accounts[2].address)
+        tf_signed, v_signed = contract.lookup(accounts[4].address)
+        assert (
+            contract.owner() == accounts[0].address and
+            contract.signer() == signer.address and
+            tf_manual and v_manual == 1 and
+            tf_signed and v_signed == 2
+        )
+
+    def test_nonce_preserved(self, contract):
+        sig = signer.sign(["address", "uint256", "bytes32"], [accounts[3].address, 2, used_nonce]).signature
+        with reverts("Nonce already has been used"):
+            contract.register(accounts[3].address, 2, used_nonce, sig, {"from": accounts[5]})
+
+    def test_initialize_again(self, contract):
+        with reverts():
+            contract.initialize({"from": accounts[0]})
+
+    def test_register_after_upgrade(self, contract):
+        nonce = token_hex(32)
+        sig = signer.sign(["address", "uint256", "bytes32"], [accounts[3].address, 1, nonce]).signature
+        contract.register(accounts[3].address, 1, nonce, sig, {"from": accounts[5]})
+        tf, version = contract.lookup(accounts[5].address)
+        assert tf and version == 1
+
+class TestBatch:
+
+    def test_register_batch_non_owner(self, contract):
+        with reverts("Ownable: caller is not the owner"):
+            contract.manuallyRegisterBatch([accounts[1].address], [accounts[6].address], [1], {"from": accounts[1]})
+
+    def test_register_batch_length_mismatch(self, contract):
+        with reverts("Array lengths must be equal"):
+            contract.manuallyRegisterBatch([accounts[1].address], [accounts[6].address, accounts[7].address], [1, 2], {"from": accounts[0]})
+
+    def test_register_batch_already_registered(self, contract):
+        with reverts("Already registered"):
+            contract.manuallyRegisterBatch([accounts[1].address, accounts[1].address], [accounts[6].address, accounts[2].address], [1, 1], {"from": accounts[0]})
+
+    def test_register_batch(self, contract):
+        tx = contract.manuallyRegisterBatch(
+            [accounts[1].address, accounts[1].address, accounts[3].address],
+            [accounts[6].address, accounts[7].address, accounts[8].address],
+            [1, 2, 3],
+            {"from": accounts[0]}
+        )
+        assert (
+            len(tx.events["Register"]) == 3 and
+            tx.events["Register"][2]["_contract"] == accounts[8].address and
+            tx.events["Register"][2]["_version"] == 3
+        )
+
+    def test_lookup_batch(self, contract):
+        tfs, versions = contract.lookupBatch([accounts[6].address, accounts[9].address, accounts[8].address, accounts[2].address])
+        assert (
+            list(tfs) == [True, False, True, True] and
+            list(versions) == [1, 0, 3, 1]
+        )
+
+    def test_lookup_batch_empty(self, contract):
+        tfs, versions = contract.lookupBatch([])
+        assert len(tfs) == 0 and len(versions) == 0
+
+    def test_lookup_batch_matches_lookup(self, contract):
+        addresses = [accounts[i].address for i in range(10)]
+        tfs, versions = contract.lookupBatch(addresses)
+        for i, address in enumerate(addresses):
+            assert contract.lookup(address) == (tfs[i], versions[i])
@@ -0,0 +1,179 @@
+from brownie import ShatterRegistryTest, ShatterRegistryEngineV1, ShatterRegistryEngineV3, accounts, reverts, chain
+from brownie.network.contract import Contract
+from eth_account import Account
+from eth_account.messages import encode_structured_data
+from evm_sc_utils.signers import EIP191Signer
+import pytest
+from secrets import token_hex
+
+legacy_signer = EIP191Signer()
+signer = accounts.add()
+
+def sign_register(registry, deployer, version, nonce, key=None):
+    data = {
+        "types": {
+            "EIP712Domain": [
+                {"name": "name", "type": "string"},
+                {"name": "version", "type": "string"},
+                {"name": "chainId", "type": "uint256"},
+                {"name": "verifyingContract", "type": "address"}
+            ],
+            "Register": [
+                {"name": "deployer", "type": "address"},
+                {"name": "version", "type": "uint256"},
+                {"name": "nonce", "type": "uint256"}
+            ]
+        },
+        "primaryType": "Register",
+        "domain": {"name": "ShatterRegistry", "version": "3", "chainId": chain.id, "verifyingContract": registry.address},
+        "message": {"deployer": deployer, "version": version, "nonce": nonce}
+    }
+    sig = Account.sign_message(encode_structured_data(data), key or signer.private_key)
+    # EIP-2098 compact form, the recovery bit is stored in the top bit of s
+    vs = sig.s | ((sig.v - 27) << 255)
+    return "0x" + sig.r.to_bytes(32, "big").hex(), "0x" + vs.to_bytes(32, "big").hex()
+
+def deploy_registry(logic):
+    proxy_contract = ShatterRegistryTest.deploy(logic.address, {"from": accounts[0]})
+    return Contract.from_abi("ShatterRegistry", proxy_contract.address, logic.abi)
+
+@pytest.fixture(scope="class")
+def contract():
+    # registry populated on the V1 engine, then upgraded in place to V3
+    registry = deploy_registry(ShatterRegistryEngineV1.deploy({"from": accounts[9]}))
+    registry.setSigner(legacy_signer.address, {"from": accounts[0]})
+    registry.manuallyRegister(accounts[1].address, accounts[2].address, 1, {"from": accounts[0]})
+    logic_v3 = ShatterRegistryEngineV3.deploy({"from": accounts[9]})
+    registry.upgradeTo(logic_v3.address, {"from": accounts[0]})
+    registry = Contract.from_abi("ShatterRegistry", registry.address, logic_v3.abi)
+    registry.setSigner(signer.address, {"from": accounts[0]})
+    return registry
+
+class TestRegisterCompact:
+
+    def test_register(self, contract):
+        r, vs = sign_register(contract, accounts[3].address, 1, 0)
+        tx = contract.registerCompact(accounts[3].address, 1, 0, r, vs, {"from": accounts[4]})
+        tf, version = contract.lookup(accounts[4].address)
+        assert (
+            tf and version == 1 and
+            tx.events["Register"]["_contract"] == accounts[4].address and
+            contract.isNonceUsed(accounts[3].address, 0) and
+            not contract.isNonceUsed(accounts[3].address, 1)
+        )
+
+    def test_same_nonce(self, contract):
+        r, vs = sign_register(contract, accounts[3].address, 1, 0)
+        with reverts("Nonce already has been used"):
+            contract.registerCompact(accounts[3].address, 1, 0, r, vs, {"from": accounts[5]})
+
+    def test_next_nonce_in_same_word(self, contract):
+        r, vs = sign_register(contract, accounts[3].address, 2, 1)
+        contract.registerCompact(accounts[3].address, 2, 1, r, vs, {"from": accounts[5]})
+        tf, version = contract.lookup(accounts[5].address)
+        assert tf and version == 2 and contract.isNonceUsed(accounts[3].address, 1)
+
+    def test_nonce_in_other_word(self, contract):
+        r, vs = sign_register(contract, accounts[3].address, 1, 256 + 7)
+        contract.registerCompact(accounts[3].address, 1, 256 + 7, r, vs, {"from": accounts[6]})
+        assert (
+            contract.isNonceUsed(accounts[3].address, 256 + 7) and
+            not contract.isNonceUsed(accounts[3].address, 7)
+        )
+
+    def test_nonce_is_per_deployer(self, contract):
+        r, vs = sign_register(contract, accounts[8].address, 1, 0)
+        contract.registerCompact(accounts[8].address, 1, 0, r, vs, {"from": accounts[7]})
+        tf, _ = contract.lookup(accounts[7].address)
+        assert tf
+
+    def test_wrong_signer(self, contract):
+        other = accounts.add()
+        r, vs = sign_register(contract, accounts[3].address, 1, 2, other.private_key)
+        with reverts("Invalid signature supplied"):
+            contract.registerCompact(accounts[3].address, 1, 2, r, vs, {"from": accounts[9]})
+
+    def test_tampered_version(self, contract):
+        r, vs = sign_register(contract, accounts[3].address, 1, 2)
+        with reverts("Invalid signature supplied"):
+            contract.registerCompact(accounts[3].address, 2, 2, r, vs, {"from": accounts[9]})
+
+    def test_already_registered(self, contract):
+        r, vs = sign_register(contract, accounts[3].address, 1, 3)
+        with reverts("Already registered"):
+            contract.registerCompact(accounts[3].address, 1, 3, r, vs, {"from": accounts[4]})
+
+class TestLegacy:
+
+    def test_legacy_registration_lookup(self, contract):
+        tf, version = contract.lookup(accounts[2].address)
+        assert tf and version == 1
+
+    def test_legacy_already_registered(self, contract):
+        with reverts("Already registered"):
+            contract.manuallyRegister(accounts[1].address, accounts[2].address, 1, {"from": accounts[0]})
+
+    def test_legacy_register(self, contract):
+        contract.setSigner(legacy_signer.address, {"from": accounts[0]})
+        nonce = token_hex(32)
+        sig = legacy_signer.sign(["address", "uint256", "bytes32"], [accounts[3].address, 1, nonce]).signature
+        contract.register(accounts[3].address, 1, nonce, sig, {"from": accounts[4]})
+        tf, version = contract.lookup(accounts[4].address)
+        with reverts("Nonce already has been used"):
+            contract.register(accounts[3].address, 1, nonce, sig, {"from": accounts[5]})
+        contract.setSigner(signer.address, {"from": accounts[0]})
+        assert tf and version == 1
+
+    def test_migrate_non_owner(self, contract):
+        with reverts("Ownable: caller is not the owner"):
+            contract.migrate([accounts[2].address], {"from": accounts[1]})
+
+    def test_migrate(self, contract):
+        tx = contract.migrate([accounts[2].address, accounts[9].address], {"from": accounts[0]})
+        tf, version = contract.lookup(accounts[2].address)
+        assert (
+            len(tx.events["Migrate"]) == 1 and
+            tx.events["Migrate"]["_contract"] == accounts[2].address and
+            tf and version == 1
+        )
+
+    def test_lookup_batch(self, contract):
+        tfs, versions = contract.lookupBatch([accounts[2].address, accounts[4].address, accounts[9].address])
+        assert list(tfs) == [True, True, False] and list(versions) == [1, 1, 0]
+
+class TestRegisterGas:
+
+    def test_register_cheaper_than_v1(self):
+        v1 = deploy_registry(ShatterRegistryEngineV1.deploy({"from": accounts[9]}))
+        v1.setSigner(legacy_signer.address, {"from": accounts[0]})
+        v3 = deploy_registry(ShatterRegistryEngineV3.deploy({"from": accounts[9]}))
+        v3.setSigner(signer.address, {"from": accounts[0]})
+
+        gas_v1 = []
+        gas_v3 = []
+        for i in range(2):
+            nonce = token_hex(32)
+            sig = legacy_signer.sign(["address", "uint256", "bytes32"], [accounts[3].address, 1, nonce]).signature
+            gas_v1.append(v1.register(accounts[3].address, 1, nonce, sig, {"from": accounts[4 + i]}).gas_used)
+            r, vs = sign_register(v3, accounts[3].address, 1, i)
+            gas_v3.append(v3.registerCompact(accounts[3].address, 1, i, r, vs, {"from": accounts[4 + i]}).gas_used)
+
+        # storage alone goes from 68,400 gas on V1 to 48,400 for the first nonce and 31,300 for the second nonce on V3,
+        # leaving room for the extra EIP-712 hashing
+        assert gas_v1[0] - gas_v3[0] > 15000 and gas_v1[1] - gas_v3[1] > 30000
+
+    def test_lookup_single_slot(self):
+        registry = deploy_registry(ShatterRegistryEngineV1.deploy({"from": accounts[9]}))
+        registry.manuallyRegister(accounts[1].address, accounts[2].address, 1, {"from": accounts[0]})
+        registry.manuallyRegister(accounts[1].address, accounts[3].address, 1, {"from": accounts[0]})
+        logic_v3 = ShatterRegistryEngineV3.deploy({"from": accounts[9]})
+        registry.upgradeTo(logic_v3.address, {"from": accounts[0]})
+        registry = Contract.from_abi("ShatterRegistry", registry.address, logic_v3.abi)
+        registry.manuallyRegister(accounts[1].address, accounts[4].address, 1, {"from": accounts[0]})
+        registry.migrate([accounts[2].address], {"from": accounts[0]})
+
+        gas_new = registry.lookup.estimate_gas(accounts[4].address)
+        gas_migrated = registry.lookup.estimate_gas(accounts[2].address)
+        gas_legacy = registry.lookup.estimate_gas(accounts[3].address)
+        # calldata costs differ slightly between addresses, the legacy fallback pays two more cold SLOADs
+        assert abs(gas_new - gas_migrated) < 200 and gas_legacy > gas_migrated + 4000
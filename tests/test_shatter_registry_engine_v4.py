@@ -0,0 +1,99 @@
+from brownie import ShatterRegistryTest, ShatterRegistryEngineV1, ShatterRegistryEngineV4, ShatterV1, ShatterV2, ShatterV3, ShatterFactoryV1, accounts, reverts, web3
+from brownie.network.contract import Contract
+import pytest
+
+@pytest.fixture(scope="class")
+def contract():
+    # registry populated on the V1 engine, then upgraded in place to V4
+    logic_v1 = ShatterRegistryEngineV1.deploy({"from": accounts[9]})
+    proxy_contract = ShatterRegistryTest.deploy(logic_v1.address, {"from": accounts[0]})
+    registry = Contract.from_abi("ShatterRegistry", proxy_contract.address, logic_v1.abi)
+    registry.manuallyRegister(accounts[1].address, accounts[2].address, 1, {"from": accounts[0]})
+    logic_v4 = ShatterRegistryEngineV4.deploy({"from": accounts[9]})
+    registry.upgradeTo(logic_v4.address, {"from": accounts[0]})
+    return Contract.from_abi("ShatterRegistry", proxy_contract.address, logic_v4.abi)
+
+@pytest.fixture(scope="class")
+def factory():
+    v1 = ShatterV1.deploy("Impl", "IMPL", accounts[9].address, 0, accounts[9].address, 1, 1, 0, {"from": accounts[9]})
+    v2 = ShatterV2.deploy("Impl", "IMPL", accounts[9].address, 0, accounts[9].address, 1, 0, {"from": accounts[9]})
+    v3 = ShatterV3.deploy("Impl", "IMPL", accounts[9].address, 0, accounts[9].address, 1, 0, {"from": accounts[9]})
+    return ShatterFactoryV1.deploy(v1.address, v2.address, v3.address, {"from": accounts[9]})
+
+def create_clone(factory, salt):
+    return factory.createShatterV1(salt, "Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 100, 0, {"from": accounts[0]}).return_value
+
+def create_clone_v2(factory, salt):
+    return factory.createShatterV2(salt, "Test", "TST", accounts[1].address, 500, accounts[2].address, 10, 0, {"from": accounts[0]}).return_value
+
+class TestAccess:
+
+    def test_set_codehash_non_owner(self, contract):
+        with reverts("Ownable: caller is not the owner"):
+            contract.setCodehash("0x" + "11" * 32, 1, True, {"from": accounts[1]})
+
+    def test_set_clone_implementation_non_owner(self, contract):
+        with reverts("Ownable: caller is not the owner"):
+            contract.setCloneImplementation(accounts[3].address, 1, True, {"from": accounts[1]})
+
+    def test_set_empty_codehash(self, contract):
+        with reverts("Codehash must be of deployed code"):
+            contract.setCodehash(web3.keccak(b""), 1, True, {"from": accounts[0]})
+
+class TestCloneVerification:
+
+    def test_clone_codehash(self, contract, factory):
+        clone = create_clone(factory, "0x" + "11" * 32)
+        assert contract.cloneCodehash(factory.shatterV1()) == web3.keccak(web3.eth.get_code(clone)).hex()
+
+    def test_clone_not_allowed(self, contract, factory):
+        clone = create_clone(factory, "0x" + "22" * 32)
+        assert contract.lookup(clone) == (False, 0)
+
+    def test_allow_clones(self, contract, factory):
+        tx = contract.setCloneImplementation(factory.shatterV1(), 1, True, {"from": accounts[0]})
+        assert (
+            tx.events["CodehashUpdate"]["_codehash"] == contract.cloneCodehash(factory.shatterV1()) and
+            contract.lookup(factory.predictShatterAddress(factory.shatterV1(), accounts[0].address, "0x" + "11" * 32)) == (True, 1) and
+            contract.lookup(factory.predictShatterAddress(factory.shatterV1(), accounts[0].address, "0x" + "22" * 32)) == (True, 1)
+        )
+
+    def test_new_clone_without_registration(self, contract, factory):
+        clone = create_clone(factory, "0x" + "33" * 32)
+        assert contract.lookup(clone) == (True, 1)
+
+    def test_other_implementation_not_allowed(self, contract, factory):
+        clone = create_clone_v2(factory, "0x" + "44" * 32)
+        assert contract.lookup(clone) == (False, 0)
+
+    def test_implementation_itself_not_recognized(self, contract, factory):
+        assert contract.lookup(factory.shatterV1()) == (False, 0)
+
+    def test_explicit_registration_overrides(self, contract, factory):
+        clone = create_clone(factory, "0x" + "55" * 32)
+        contract.manuallyRegister(accounts[0].address, clone, 7, {"from": accounts[0]})
+        assert contract.lookup(clone) == (True, 7)
+
+    def test_legacy_registration(self, contract):
+        assert contract.lookup(accounts[2].address) == (True, 1)
+
+    def test_lookup_batch(self, contract, factory):
+        clone = factory.predictShatterAddress(factory.shatterV1(), accounts[0].address, "0x" + "33" * 32)
+        overridden = factory.predictShatterAddress(factory.shatterV1(), accounts[0].address, "0x" + "55" * 32)
+        other = factory.predictShatterAddress(factory.shatterV2(), accounts[0].address, "0x" + "44" * 32)
+        tfs, versions = contract.lookupBatch([clone, overridden, other, accounts[2].address, accounts[3].address])
+        assert list(tfs) == [True, True, False, True, False] and list(versions) == [1, 7, 0, 1, 0]
+
+    def test_disallow_clones(self, contract, factory):
+        contract.setCloneImplementation(factory.shatterV1(), 1, False, {"from": accounts[0]})
+        clone = factory.predictShatterAddress(factory.shatterV1(), accounts[0].address, "0x" + "33" * 32)
+        overridden = factory.predictShatterAddress(factory.shatterV1(), accounts[0].address, "0x" + "55" * 32)
+        assert contract.lookup(clone) == (False, 0) and contract.lookup(overridden) == (True, 7)
+
+class TestCodehashVerification:
+
+    def test_allow_runtime_code(self, contract):
+        piece = ShatterV2.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 10, 0, {"from": accounts[0]})
+        assert contract.lookup(piece.address) == (False, 0)
+        contract.setCodehash(web3.keccak(web3.eth.get_code(piece.address)), 2, True, {"from": accounts[0]})
+        assert contract.lookup(piece.address) == (True, 2)
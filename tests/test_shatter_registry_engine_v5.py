@@ -0,0 +1,113 @@
+from brownie import ShatterRegistryTest, ShatterRegistryEngineV1, ShatterRegistryEngineV5, accounts, reverts
+from brownie.network.contract import Contract
+import pytest
+
+@pytest.fixture(scope="class")
+def contract():
+    # registry populated on the V1 engine, then upgraded in place to V5
+    logic_v1 = ShatterRegistryEngineV1.deploy({"from": accounts[9]})
+    proxy_contract = ShatterRegistryTest.deploy(logic_v1.address, {"from": accounts[0]})
+    registry = Contract.from_abi("ShatterRegistry", proxy_contract.address, logic_v1.abi)
+    registry.manuallyRegister(accounts[1].address, accounts[2].address, 1, {"from": accounts[0]})
+    registry.manuallyRegister(accounts[3].address, accounts[4].address, 2, {"from": accounts[0]})
+    logic_v5 = ShatterRegistryEngineV5.deploy({"from": accounts[9]})
+    registry.upgradeTo(logic_v5.address, {"from": accounts[0]})
+    return Contract.from_abi("ShatterRegistry", proxy_contract.address, logic_v5.abi)
+
+class TestIndexRegistered:
+
+    def test_legacy_not_indexed(self, contract):
+        assert contract.registeredCount() == 0 and len(contract.registeredAt(0, 10)) == 0
+
+    def test_index_non_owner(self, contract):
+        with reverts("Ownable: caller is not the owner"):
+            contract.indexRegistered([accounts[1].address], [accounts[2].address], {"from": accounts[1]})
+
+    def test_index_length_mismatch(self, contract):
+        with reverts("Array lengths must be equal"):
+            contract.indexRegistered([accounts[1].address], [accounts[2].address, accounts[4].address], {"from": accounts[0]})
+
+    def test_index_registered(self, contract):
+        contract.indexRegistered(
+            [accounts[1].address, accounts[3].address, accounts[1].address, accounts[1].address],
+            [accounts[2].address, accounts[4].address, accounts[5].address, accounts[2].address],
+            {"from": accounts[0]}
+        )
+        assert (
+            contract.registeredCount() == 2 and
+            list(contract.registeredAt(0, 10)) == [accounts[2].address, accounts[4].address] and
+            list(contract.registeredByDeployer(accounts[1].address, 0, 10)) == [accounts[2].address] and
+            list(contract.registeredByVersion(2, 0, 10)) == [accounts[4].address]
+        )
+
+    def test_index_again(self, contract):
+        contract.indexRegistered([accounts[1].address], [accounts[2].address], {"from": accounts[0]})
+        assert contract.registeredCount() == 2
+
+class TestRegister:
+
+    def test_manually_register(self, contract):
+        contract.manuallyRegister(accounts[1].address, accounts[5].address, 2, {"from": accounts[0]})
+        assert (
+            contract.registeredCount() == 3 and
+            contract.deployerCount(accounts[1].address) == 2 and
+            contract.versionCount(2) == 2 and
+            list(contract.registeredByDeployer(accounts[1].address, 0, 10)) == [accounts[2].address, accounts[5].address] and
+            list(contract.registeredByVersion(2, 0, 10)) == [accounts[4].address, accounts[5].address]
+        )
+
+    def test_register_batch(self, contract):
+        contract.manuallyRegisterBatch(
+            [accounts[6].address, accounts[6].address],
+            [accounts[7].address, accounts[8].address],
+            [1, 3],
+            {"from": accounts[0]}
+        )
+        assert (
+            contract.registeredCount() == 5 and
+            list(contract.registeredByDeployer(accounts[6].address, 0, 10)) == [accounts[7].address, accounts[8].address] and
+            list(contract.registeredByVersion(1, 0, 10)) == [accounts[2].address, accounts[7].address] and
+            list(contract.registeredByVersion(3, 0, 10)) == [accounts[8].address]
+        )
+
+    def test_already_registered_not_indexed(self, contract):
+        with reverts("Already registered"):
+            contract.manuallyRegister(accounts[6].address, accounts[7].address, 1, {"from": accounts[0]})
+        assert contract.registeredCount() == 5
+
+    def test_unknown_deployer_and_version(self, contract):
+        assert (
+            contract.deployerCount(accounts[9].address) == 0 and
+            contract.versionCount(4) == 0 and
+            len(contract.registeredByDeployer(accounts[9].address, 0, 10)) == 0 and
+            len(contract.registeredByVersion(4, 0, 10)) == 0
+        )
+
+class TestPagination:
+
+    def test_pages(self, contract):
+        for i in range(5):
+            contract.manuallyRegister(accounts[9].address, "0x" + f"{i + 1:040x}", 4, {"from": accounts[0]})
+        first = list(contract.registeredByDeployer(accounts[9].address, 0, 2))
+        second = list(contract.registeredByDeployer(accounts[9].address, 2, 2))
+        last = list(contract.registeredByDeployer(accounts[9].address, 4, 2))
+        assert (
+            len(first) == 2 and len(second) == 2 and len(last) == 1 and
+            first + second + last == list(contract.registeredByVersion(4, 0, 5))
+        )
+
+    def test_page_past_end(self, contract):
+        count = contract.registeredCount()
+        assert len(contract.registeredAt(count, 10)) == 0 and len(contract.registeredAt(count + 10, 10)) == 0
+
+    def test_zero_limit(self, contract):
+        assert len(contract.registeredAt(0, 0)) == 0
+
+    def test_max_limit(self, contract):
+        count = contract.registeredCount()
+        assert len(contract.registeredAt(1, 2**256 - 1)) == count - 1
+
+    def test_all_registered(self, contract):
+        addresses = list(contract.registeredAt(0, contract.registeredCount()))
+        tfs, _ = contract.lookupBatch(addresses)
+        assert len(set(addresses)) == len(addresses) and all(tfs)
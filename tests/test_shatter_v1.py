@@ -1,15 +1,39 @@
-from brownie import ShatterV1, accounts, reverts, chain
+from brownie import ShatterV1, ShatterV1_B64, ShatterV1Baseline, accounts, reverts, chain
 import pytest
+from brownie.convert import to_address
+from eth_utils import keccak
 import base64
 import json
 from random import randint
 
 shatter_time = int(chain.time() + 2 * 3600)
 
+def claim_leaf(token_id, recipient):
+    return keccak(keccak(token_id.to_bytes(32, "big") + bytes.fromhex(recipient[2:].rjust(64, "0"))))
+
+def merkle_layers(leaves):
+    layers = [leaves]
+    while len(layers[-1]) > 1:
+        layer = layers[-1]
+        layers.append([keccak(b"".join(sorted(layer[i:i + 2]))) if i + 1 < len(layer) else layer[i] for i in range(0, len(layer), 2)])
+    return layers
+
+def merkle_proof(layers, index):
+    proof = []
+    for layer in layers[:-1]:
+        if index ^ 1 < len(layer):
+            proof.append("0x" + layer[index ^ 1].hex())
+        index //= 2
+    return proof
+
 @pytest.fixture(scope="class")
 def contract():
     return ShatterV1.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 100, shatter_time, {"from": accounts[0]})
 
+@pytest.fixture(scope="class")
+def large_contract():
+    return ShatterV1.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 20000, 0, {"from": accounts[0]})
+
 class TestDefault:
 
     def test_default_values(self, contract):
@@ -38,6 +62,9 @@ class TestInterface:
     def test_erc721_metadata_interface(self, contract):
         assert contract.supportsInterface("0x5b5e139f")
 
+    def test_eip4906_interface(self, contract):
+        assert contract.supportsInterface("0x49064906")
+
 class TestERC721Init:
     def test_balance_of_zero_address(self, contract):
         with reverts("ERC721: address zero is not a valid owner"):
@@ -766,3 +793,679 @@ class TestShatterConstructor:
     def test_zero_min_shatter(self):
         contract = ShatterV1.deploy("SH", "SH", accounts[1].address, 750, accounts[1].address, 0, 100, 0, {"from": accounts[0]})
         assert contract.minShatters() == 1
+
+    def test_max_shatters_too_large(self):
+        with reverts("Max shatters must fit in 64 bits"):
+            ShatterV1.deploy("SH", "SH", accounts[1].address, 750, accounts[1].address, 1, 2**64 - 1, 0, {"from": accounts[0]})
+
+class TestConsecutiveTransfer:
+    def test_set_consecutive_transfer_non_owner(self, contract):
+        with reverts("Ownable: caller is not the owner"):
+            contract.setConsecutiveTransfer(True, {"from": accounts[2]})
+
+    def test_shatter(self, contract):
+        contract.setConsecutiveTransfer(True, {"from": accounts[0]})
+        contract.mint("test/", {"from": accounts[0]})
+        tx = contract.shatter(100, {"from": accounts[0]})
+        assert(
+            contract.useConsecutiveTransfer() and
+            len(tx.events) == 3 and # 1 transfer to 0 address, 1 ConsecutiveTransfer, Shatter event
+            tx.events["ConsecutiveTransfer"]["fromTokenId"] == 1 and
+            tx.events["ConsecutiveTransfer"]["toTokenId"] == 100 and
+            tx.events["ConsecutiveTransfer"]["fromAddress"] == f"0x{bytes(20).hex()}" and
+            tx.events["ConsecutiveTransfer"]["toAddress"] == accounts[0].address and
+            contract.ownerOf(100) == accounts[0].address and
+            contract.balanceOf(accounts[0].address) == 100
+        )
+
+    def test_fuse(self, contract):
+        contract.safeTransferFrom(accounts[0].address, accounts[1].address, 50, {"from": accounts[0]})
+        contract.safeTransferFrom(accounts[1].address, accounts[0].address, 50, {"from": accounts[1]})
+        tx = contract.fuse({"from": accounts[0]})
+        assert(
+            len(tx.events) == 3 and # 1 ConsecutiveTransfer, 1 mint, Fuse event
+            tx.events["ConsecutiveTransfer"]["fromTokenId"] == 1 and
+            tx.events["ConsecutiveTransfer"]["toTokenId"] == 100 and
+            tx.events["ConsecutiveTransfer"]["fromAddress"] == accounts[0].address and
+            tx.events["ConsecutiveTransfer"]["toAddress"] == f"0x{bytes(20).hex()}" and
+            contract.ownerOf(0) == accounts[0].address and
+            contract.balanceOf(accounts[0].address) == 1
+        )
+
+    def test_owner_of_burned_shard(self, contract):
+        with reverts("ERC721: invalid token ID"):
+            contract.ownerOf(50)
+
+    def test_shatter_gas_is_flat(self):
+        gas = []
+        for num in [10, 100, 1000]:
+            c = ShatterV1.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 1000, 0, {"from": accounts[0]})
+            c.setConsecutiveTransfer(True, {"from": accounts[0]})
+            c.mint("test/", {"from": accounts[0]})
+            tx = c.shatter(num, {"from": accounts[0]})
+            gas.append(tx.gas_used)
+        assert max(gas) - min(gas) < 1000
+
+class TestFuseOwnershipProof:
+    def test_fuse_not_owner_of_all(self, contract):
+        contract.mint("test/", {"from": accounts[0]})
+        contract.shatter(100, {"from": accounts[0]})
+        contract.safeTransferFrom(accounts[0].address, accounts[1].address, 100, {"from": accounts[0]})
+        with reverts("Msg sender must own all editions"):
+            contract.fuse({"from": accounts[0]})
+
+    def test_fuse(self, contract):
+        contract.safeTransferFrom(accounts[1].address, accounts[0].address, 100, {"from": accounts[1]})
+        contract.fuse({"from": accounts[0]})
+        assert contract.balanceOf(accounts[0].address) == 1 and contract.ownerOf(0) == accounts[0].address
+
+    def test_transferred_shard_is_burned(self, contract):
+        with reverts("ERC721: invalid token ID"):
+            contract.ownerOf(100)
+        with reverts("ERC721: invalid token ID"):
+            contract.getApproved(100)
+        with reverts("ERC721: invalid token ID"):
+            contract.transferFrom(accounts[0].address, accounts[1].address, 100, {"from": accounts[0]})
+
+    def test_fuse_gas_is_flat(self):
+        gas = []
+        for num in [10, 100, 1000]:
+            c = ShatterV1.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 1000, 0, {"from": accounts[0]})
+            c.setConsecutiveTransfer(True, {"from": accounts[0]})
+            c.mint("test/", {"from": accounts[0]})
+            c.shatter(num, {"from": accounts[0]})
+            tx = c.fuse({"from": accounts[0]})
+            gas.append(tx.gas_used)
+        assert max(gas) - min(gas) < 1000
+
+class TestReshatter:
+    def test_set_reshatterable_non_owner(self, contract):
+        with reverts("Ownable: caller is not the owner"):
+            contract.setReshatterable(True, {"from": accounts[2]})
+
+    def test_shatter(self, contract):
+        contract.setReshatterable(True, {"from": accounts[0]})
+        contract.mint("test/", {"from": accounts[0]})
+        contract.shatter(100, {"from": accounts[0]})
+        assert contract.isReshatterable() and contract.epoch() == 0
+
+    def test_set_reshatterable_after_shatter(self, contract):
+        with reverts("Already is shattered"):
+            contract.setReshatterable(False, {"from": accounts[0]})
+
+    def test_shatter_before_fuse(self, contract):
+        with reverts("Already is shattered"):
+            contract.shatter(50, {"from": accounts[0]})
+
+    def test_fuse(self, contract):
+        contract.transferFrom(accounts[0].address, accounts[1].address, 5, {"from": accounts[0]})
+        contract.transferFrom(accounts[1].address, accounts[0].address, 5, {"from": accounts[1]})
+        contract.approve(accounts[3].address, 6, {"from": accounts[0]})
+        contract.fuse({"from": accounts[0]})
+        assert contract.epoch() == 1 and contract.ownerOf(0) == accounts[0].address
+
+    def test_stale_entries_after_fuse(self, contract):
+        with reverts("ERC721: invalid token ID"):
+            contract.ownerOf(5)
+        with reverts("ERC721: invalid token ID"):
+            contract.getApproved(6)
+
+    def test_reshatter(self, contract):
+        contract.safeTransferFrom(accounts[0].address, accounts[4].address, 0, {"from": accounts[0]})
+        contract.shatter(50, {"from": accounts[4]})
+        assert(
+            contract.isShattered() and
+            not contract.isFused() and
+            contract.shatters() == 50 and
+            contract.balanceOf(accounts[4].address) == 50 and
+            contract.balanceOf(accounts[0].address) == 0 and
+            contract.ownerOf(5) == accounts[4].address and
+            contract.getApproved(6) == f"0x{bytes(20).hex()}"
+        )
+
+    def test_shard_outside_new_range(self, contract):
+        with reverts("Invalid token id"):
+            contract.ownerOf(100)
+
+    def test_fuse_again(self, contract):
+        contract.fuse({"from": accounts[4]})
+        assert contract.epoch() == 2 and contract.ownerOf(0) == accounts[4].address and contract.balanceOf(accounts[4].address) == 1
+
+    def test_cycle_gas_is_flat(self):
+        c = ShatterV1.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 1000, 0, {"from": accounts[0]})
+        c.setReshatterable(True, {"from": accounts[0]})
+        c.setConsecutiveTransfer(True, {"from": accounts[0]})
+        c.mint("test/", {"from": accounts[0]})
+        gas = []
+        # the first cycle pays for initializing the shatter address, so it is left out of the comparison
+        for num in [10, 10, 1000, 10]:
+            tx1 = c.shatter(num, {"from": accounts[0]})
+            for i in range(1, 11):
+                c.transferFrom(accounts[0].address, accounts[1].address, i, {"from": accounts[0]})
+                c.transferFrom(accounts[1].address, accounts[0].address, i, {"from": accounts[1]})
+            tx2 = c.fuse({"from": accounts[0]})
+            gas.append(tx1.gas_used + tx2.gas_used)
+        assert max(gas[1:]) - min(gas[1:]) < 1000
+
+class TestNotReshatterable:
+    def test_shatter_after_fuse(self, contract):
+        contract.mint("test/", {"from": accounts[0]})
+        contract.shatter(10, {"from": accounts[0]})
+        contract.fuse({"from": accounts[0]})
+        with reverts("Already is shattered"):
+            contract.shatter(10, {"from": accounts[0]})
+
+class TestBatchedShatterAndFuse:
+    def test_set_batch_size_non_owner(self, large_contract):
+        with reverts("Ownable: caller is not the owner"):
+            large_contract.setBatchSize(2500, {"from": accounts[2]})
+
+    def test_shatter(self, large_contract):
+        large_contract.setBatchSize(2500, {"from": accounts[0]})
+        large_contract.mint("test/", {"from": accounts[0]})
+        tx = large_contract.shatter(20000, {"from": accounts[0]})
+        assert(
+            large_contract.shatters() == 2500 and
+            large_contract.pendingShatters() == 17500 and
+            "Shattered" not in tx.events.keys() and
+            large_contract.balanceOf(accounts[0].address) == 2500
+        )
+
+    def test_set_batch_size_in_progress(self, large_contract):
+        with reverts("Shatter or fuse in progress"):
+            large_contract.setBatchSize(5000, {"from": accounts[0]})
+
+    def test_transfer_finalized_shard(self, large_contract):
+        large_contract.transferFrom(accounts[0].address, accounts[1].address, 2500, {"from": accounts[0]})
+        assert large_contract.ownerOf(2500) == accounts[1].address
+        with reverts("Invalid token id"):
+            large_contract.ownerOf(2501)
+
+    def test_fuse_during_shatter(self, large_contract):
+        with reverts("Shatter or fuse in progress"):
+            large_contract.fuse({"from": accounts[0]})
+
+    def test_continue_shatter(self, large_contract):
+        num_txs = 0
+        while large_contract.pendingShatters() > 0:
+            tx = large_contract.continueShatter({"from": accounts[3]})
+            num_txs += 1
+        assert(
+            num_txs == 7 and
+            tx.events["Shattered"]["user"] == accounts[0].address and
+            tx.events["Shattered"]["numShatters"] == 20000 and
+            large_contract.shatters() == 20000 and
+            large_contract.ownerOf(20000) == accounts[0].address and
+            large_contract.balanceOf(accounts[0].address) == 19999
+        )
+
+    def test_continue_shatter_when_done(self, large_contract):
+        with reverts("No shatter in progress"):
+            large_contract.continueShatter({"from": accounts[0]})
+
+    def test_fuse(self, large_contract):
+        large_contract.transferFrom(accounts[1].address, accounts[0].address, 2500, {"from": accounts[1]})
+        tx = large_contract.fuse({"from": accounts[0]})
+        assert(
+            large_contract.isFusing() and
+            large_contract.shatters() == 17500 and
+            large_contract.pendingShatters() == 17500 and
+            "Fused" not in tx.events.keys()
+        )
+
+    def test_transfer_during_fuse(self, large_contract):
+        with reverts("Fuse in progress"):
+            large_contract.transferFrom(accounts[0].address, accounts[1].address, 1, {"from": accounts[0]})
+        with reverts("Invalid token id"):
+            large_contract.ownerOf(17501)
+
+    def test_continue_fuse(self, large_contract):
+        num_txs = 0
+        while large_contract.isFusing():
+            tx = large_contract.continueFuse({"from": accounts[3]})
+            num_txs += 1
+        assert(
+            num_txs == 7 and
+            tx.events["Fused"]["user"] == accounts[0].address and
+            large_contract.isFused() and
+            large_contract.ownerOf(0) == accounts[0].address and
+            large_contract.balanceOf(accounts[0].address) == 1
+        )
+        with reverts("ERC721: invalid token ID"):
+            large_contract.ownerOf(1)
+
+    def test_continue_fuse_when_done(self, large_contract):
+        with reverts("No fuse in progress"):
+            large_contract.continueFuse({"from": accounts[0]})
+
+class TestPackedStateGas:
+    """ShatterV1Baseline is ShatterV1 and ERC721S unchanged from the baseline commit, where ownerOf reads the flags, shatters
+    and shatter address from separate slots"""
+    @pytest.fixture(scope="class")
+    def unpacked_contract(self):
+        return ShatterV1Baseline.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 100, 0, {"from": accounts[0]})
+
+    def test_mint_and_shatter(self, large_contract, unpacked_contract):
+        large_contract.mint("test/", {"from": accounts[0]})
+        unpacked_contract.mint("test/", {"from": accounts[0]})
+        large_contract.shatter(100, {"from": accounts[0]})
+        unpacked_contract.shatter(100, {"from": accounts[0]})
+        assert large_contract.shatters() == unpacked_contract.shatters() == 100
+
+    def test_transfer_from_highest_id(self, large_contract, unpacked_contract):
+        tx_packed = large_contract.transferFrom(accounts[0].address, accounts[1].address, 100, {"from": accounts[0]})
+        tx_unpacked = unpacked_contract.transferFrom(accounts[0].address, accounts[1].address, 100, {"from": accounts[0]})
+        # two cold SLOADs saved, minus the warm reads of the epoch and fusing flag
+        assert tx_unpacked.gas_used - tx_packed.gas_used > 2000
+
+    def test_safe_transfer_from_highest_id(self, large_contract, unpacked_contract):
+        tx_packed = large_contract.safeTransferFrom(accounts[1].address, accounts[2].address, 100, {"from": accounts[1]})
+        tx_unpacked = unpacked_contract.safeTransferFrom(accounts[1].address, accounts[2].address, 100, {"from": accounts[1]})
+        assert tx_unpacked.gas_used - tx_packed.gas_used > 2000
+
+class TestOwnershipLookup:
+    def test_mint_and_shatter(self, large_contract):
+        large_contract.mint("test/", {"from": accounts[0]})
+        large_contract.shatter(100, {"from": accounts[0]})
+
+    def test_approve_untouched_shard(self, large_contract):
+        tx = large_contract.approve(accounts[1].address, 100, {"from": accounts[0]})
+        assert (
+            tx.events["Approval"]["owner"] == accounts[0].address and
+            large_contract.getApproved(100) == accounts[1].address
+        )
+
+    def test_approved_transfer_from_incorrect_owner(self, large_contract):
+        with reverts("ERC721: transfer from incorrect owner"):
+            large_contract.transferFrom(accounts[2].address, accounts[1].address, 100, {"from": accounts[1]})
+
+    def test_approved_transfer(self, large_contract):
+        large_contract.transferFrom(accounts[0].address, accounts[1].address, 100, {"from": accounts[1]})
+        assert (
+            large_contract.ownerOf(100) == accounts[1].address and
+            large_contract.getApproved(100) == f"0x{bytes(20).hex()}"
+        )
+
+    def test_operator_safe_transfer(self, large_contract):
+        large_contract.setApprovalForAll(accounts[3].address, True, {"from": accounts[0]})
+        large_contract.safeTransferFrom(accounts[0].address, accounts[2].address, 99, {"from": accounts[3]})
+        assert large_contract.ownerOf(99) == accounts[2].address
+
+    def test_transfer_nonexistent_shard(self, large_contract):
+        with reverts("Invalid token id"):
+            large_contract.transferFrom(accounts[0].address, accounts[1].address, 101, {"from": accounts[0]})
+        with reverts("Invalid token id"):
+            large_contract.safeTransferFrom(accounts[0].address, accounts[1].address, 0, {"from": accounts[0]})
+
+class TestApprovalFlag:
+    """a transfer of a token without an approval writes the two balances and the owner, and skips `_tokenApprovals`"""
+    def test_mint_and_shatter(self, large_contract):
+        large_contract.mint("test/", {"from": accounts[0]})
+        large_contract.shatter(100, {"from": accounts[0]})
+
+    def test_transfer_without_approval(self, large_contract):
+        tx = large_contract.transferFrom(accounts[0].address, accounts[1].address, 100, {"from": accounts[0]})
+        assert (
+            len([step for step in tx.trace if step["op"] == "SSTORE"]) == 3 and
+            large_contract.getApproved(100) == f"0x{bytes(20).hex()}"
+        )
+
+    def test_approve_untouched_shard(self, large_contract):
+        large_contract.approve(accounts[1].address, 99, {"from": accounts[0]})
+        assert (
+            large_contract.ownerOf(99) == accounts[0].address and
+            large_contract.getApproved(99) == accounts[1].address
+        )
+
+    def test_transfer_with_approval(self, large_contract):
+        tx = large_contract.transferFrom(accounts[0].address, accounts[2].address, 99, {"from": accounts[1]})
+        assert (
+            len([step for step in tx.trace if step["op"] == "SSTORE"]) == 4 and
+            large_contract.ownerOf(99) == accounts[2].address and
+            large_contract.getApproved(99) == f"0x{bytes(20).hex()}"
+        )
+
+    def test_clear_approval(self, large_contract):
+        large_contract.approve(accounts[1].address, 98, {"from": accounts[0]})
+        large_contract.approve(f"0x{bytes(20).hex()}", 98, {"from": accounts[0]})
+        assert (
+            large_contract.ownerOf(98) == accounts[0].address and
+            large_contract.getApproved(98) == f"0x{bytes(20).hex()}"
+        )
+        with reverts("ERC721: caller is not token owner or approved"):
+            large_contract.transferFrom(accounts[0].address, accounts[1].address, 98, {"from": accounts[1]})
+
+    def test_fuse_with_approvals(self, large_contract):
+        large_contract.approve(accounts[3].address, 97, {"from": accounts[0]})
+        large_contract.transferFrom(accounts[1].address, accounts[0].address, 100, {"from": accounts[1]})
+        large_contract.transferFrom(accounts[2].address, accounts[0].address, 99, {"from": accounts[2]})
+        large_contract.fuse({"from": accounts[0]})
+        assert large_contract.ownerOf(0) == accounts[0].address and large_contract.getApproved(0) == f"0x{bytes(20).hex()}"
+
+class TestBatchTransfer:
+    def test_mint_and_shatter(self, large_contract):
+        large_contract.mint("test/", {"from": accounts[0]})
+        large_contract.shatter(100, {"from": accounts[0]})
+
+    def test_batch_transfer(self, large_contract):
+        ids = list(range(1, 11))
+        tx = large_contract.batchTransferFrom(accounts[0].address, accounts[1].address, ids, {"from": accounts[0]})
+        assert (
+            large_contract.balanceOf(accounts[0].address) == 90 and
+            large_contract.balanceOf(accounts[1].address) == 10 and
+            all(large_contract.ownerOf(i) == accounts[1].address for i in ids) and
+            [e["tokenId"] for e in tx.events["Transfer"]] == ids
+        )
+
+    def test_batch_transfer_incorrect_owner(self, large_contract):
+        with reverts("ERC721: transfer from incorrect owner"):
+            large_contract.batchTransferFrom(accounts[0].address, accounts[1].address, [11, 1], {"from": accounts[0]})
+
+    def test_batch_transfer_invalid_id(self, large_contract):
+        with reverts("Invalid token id"):
+            large_contract.batchTransferFrom(accounts[0].address, accounts[1].address, [11, 101], {"from": accounts[0]})
+
+    def test_batch_transfer_zero_address(self, large_contract):
+        with reverts("ERC721: transfer to the zero address"):
+            large_contract.batchTransferFrom(accounts[0].address, f"0x{bytes(20).hex()}", [11], {"from": accounts[0]})
+
+    def test_batch_transfer_not_approved(self, large_contract):
+        large_contract.approve(accounts[2].address, 11, {"from": accounts[0]})
+        with reverts("ERC721: caller is not token owner or approved"):
+            large_contract.batchTransferFrom(accounts[0].address, accounts[2].address, [11, 12], {"from": accounts[2]})
+
+    def test_batch_transfer_approved(self, large_contract):
+        large_contract.approve(accounts[2].address, 12, {"from": accounts[0]})
+        large_contract.batchTransferFrom(accounts[0].address, accounts[2].address, [11, 12], {"from": accounts[2]})
+        assert (
+            large_contract.ownerOf(11) == accounts[2].address and
+            large_contract.ownerOf(12) == accounts[2].address and
+            large_contract.getApproved(11) == f"0x{bytes(20).hex()}" and
+            large_contract.balanceOf(accounts[2].address) == 2
+        )
+
+    def test_batch_transfer_operator(self, large_contract):
+        large_contract.setApprovalForAll(accounts[3].address, True, {"from": accounts[0]})
+        large_contract.batchTransferFrom(accounts[0].address, accounts[3].address, [13, 14, 15], {"from": accounts[3]})
+        assert large_contract.balanceOf(accounts[3].address) == 3
+
+    def test_safe_batch_transfer_to_non_receiver(self, large_contract):
+        with reverts("ERC721: transfer to non ERC721Receiver implementer"):
+            large_contract.safeBatchTransferFrom(accounts[0].address, large_contract.address, [16], "0x", {"from": accounts[0]})
+
+    def test_safe_batch_transfer(self, large_contract):
+        large_contract.safeBatchTransferFrom(accounts[0].address, accounts[4].address, [16, 17], "0x", {"from": accounts[0]})
+        assert large_contract.ownerOf(16) == large_contract.ownerOf(17) == accounts[4].address
+
+    def test_batch_transfer_gas(self, large_contract):
+        single_gas = 0
+        for i in range(20, 30):
+            tx = large_contract.transferFrom(accounts[0].address, accounts[5].address, i, {"from": accounts[0]})
+            single_gas += tx.gas_used
+        tx = large_contract.batchTransferFrom(accounts[0].address, accounts[6].address, list(range(30, 40)), {"from": accounts[0]})
+        assert tx.gas_used < single_gas / 2
+
+    def test_batch_transfer_back_and_fuse(self, large_contract):
+        for account, ids in [(1, range(1, 11)), (2, [11, 12]), (3, [13, 14, 15]), (4, [16, 17]), (5, range(20, 30)), (6, range(30, 40))]:
+            large_contract.setApprovalForAll(accounts[0].address, True, {"from": accounts[account]})
+            large_contract.batchTransferFrom(accounts[account].address, accounts[0].address, list(ids), {"from": accounts[0]})
+        large_contract.fuse({"from": accounts[0]})
+        assert large_contract.ownerOf(0) == accounts[0].address
+
+class TestShatterTo:
+    def test_shatter_to_array_lengths(self, large_contract):
+        large_contract.mint("test/", {"from": accounts[0]})
+        with reverts("Array lengths must be equal"):
+            large_contract.shatterTo([accounts[1].address], [10, 10], {"from": accounts[0]})
+
+    def test_shatter_to_zero_count(self, large_contract):
+        with reverts("Cannot shatter 0 editions to a recipient"):
+            large_contract.shatterTo([accounts[1].address, accounts[2].address], [10, 0], {"from": accounts[0]})
+
+    def test_shatter_to_single_edition(self, large_contract):
+        with reverts("Cannot shatter to a single edition"):
+            large_contract.shatterTo([accounts[1].address], [1], {"from": accounts[0]})
+
+    def test_shatter_to_non_owner(self, large_contract):
+        with reverts("Caller is not owner of token 0"):
+            large_contract.shatterTo([accounts[1].address], [10], {"from": accounts[1]})
+
+    def test_shatter_to_zero_address(self, large_contract):
+        with reverts("ERC721: mint to the zero address"):
+            large_contract.shatterTo([accounts[1].address, f"0x{bytes(20).hex()}"], [10, 10], {"from": accounts[0]})
+
+    def test_shatter_to(self, large_contract):
+        tx = large_contract.shatterTo([accounts[1].address, accounts[2].address, accounts[3].address], [10, 1, 20], {"from": accounts[0]})
+        assert (
+            tx.events["Shattered"]["numShatters"] == 31 and
+            len(tx.events["Transfer"]) == 32 and
+            large_contract.shatters() == 31 and
+            large_contract.isShattered() and
+            not large_contract.isFused() and
+            large_contract.balanceOf(accounts[0].address) == 0 and
+            large_contract.balanceOf(accounts[1].address) == 10 and
+            large_contract.balanceOf(accounts[2].address) == 1 and
+            large_contract.balanceOf(accounts[3].address) == 20
+        )
+
+    def test_owner_of_ranges(self, large_contract):
+        assert (
+            all(large_contract.ownerOf(i) == accounts[1].address for i in range(1, 11)) and
+            large_contract.ownerOf(11) == accounts[2].address and
+            all(large_contract.ownerOf(i) == accounts[3].address for i in range(12, 32))
+        )
+        with reverts("Invalid token id"):
+            large_contract.ownerOf(32)
+
+    def test_transfer_from_range(self, large_contract):
+        large_contract.transferFrom(accounts[3].address, accounts[1].address, 12, {"from": accounts[3]})
+        with reverts("ERC721: transfer from incorrect owner"):
+            large_contract.transferFrom(accounts[3].address, accounts[1].address, 11, {"from": accounts[3]})
+        assert (
+            large_contract.ownerOf(12) == accounts[1].address and
+            large_contract.ownerOf(13) == accounts[3].address and
+            large_contract.balanceOf(accounts[1].address) == 11
+        )
+
+    def test_fuse(self, large_contract):
+        large_contract.transferFrom(accounts[2].address, accounts[1].address, 11, {"from": accounts[2]})
+        large_contract.batchTransferFrom(accounts[3].address, accounts[1].address, list(range(13, 32)), {"from": accounts[3]})
+        large_contract.fuse({"from": accounts[1]})
+        assert large_contract.ownerOf(0) == accounts[1].address and large_contract.balanceOf(accounts[1].address) == 1
+
+class TestShatterToGas:
+    def test_gas_scales_with_recipients(self):
+        recipients = [to_address(f"0x{i + 1:040x}") for i in range(50)]
+        gas = []
+        for count in [2, 20]:
+            c = ShatterV1.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 20000, 0, {"from": accounts[0]})
+            c.setConsecutiveTransfer(True, {"from": accounts[0]})
+            c.mint("test/", {"from": accounts[0]})
+            tx = c.shatterTo(recipients, [count] * 50, {"from": accounts[0]})
+            gas.append(tx.gas_used)
+            assert c.ownerOf(50 * count) == recipients[-1] and c.ownerOf(count + 1) == recipients[1]
+        assert gas[1] - gas[0] < 1000
+
+class TestShatterForClaims:
+    allocations = [(i, 1) for i in range(1, 5)] + [(i, 2) for i in range(5, 8)] + [(i, 3) for i in range(8, 11)]
+
+    @pytest.fixture(scope="class")
+    def layers(self):
+        return merkle_layers([claim_leaf(token_id, accounts[a].address) for token_id, a in self.allocations])
+
+    def test_shatter_for_claims_empty_root(self, large_contract):
+        large_contract.mint("test/", {"from": accounts[0]})
+        with reverts("Claim root cannot be empty"):
+            large_contract.shatterForClaims(12, f"0x{bytes(32).hex()}", {"from": accounts[0]})
+
+    def test_claim_before_shatter(self, large_contract, layers):
+        with reverts("No claims available"):
+            large_contract.claim([1], accounts[1].address, [merkle_proof(layers, 0)], {"from": accounts[1]})
+
+    def test_shatter_for_claims(self, large_contract, layers):
+        large_contract.shatterForClaims(12, "0x" + layers[-1][0].hex(), {"from": accounts[0]})
+        assert (
+            large_contract.claimRoot() == "0x" + layers[-1][0].hex() and
+            large_contract.balanceOf(accounts[0].address) == 12 and
+            all(large_contract.ownerOf(i) == accounts[0].address for i in range(1, 13))
+        )
+
+    def test_claim_invalid_proof(self, large_contract, layers):
+        with reverts("Invalid proof"):
+            large_contract.claim([5], accounts[1].address, [merkle_proof(layers, 4)], {"from": accounts[1]})
+
+    def test_claim_array_lengths(self, large_contract, layers):
+        with reverts("Array lengths must be equal"):
+            large_contract.claim([1, 2], accounts[1].address, [merkle_proof(layers, 0)], {"from": accounts[1]})
+
+    def test_claim(self, large_contract, layers):
+        proofs = [merkle_proof(layers, i) for i in range(4)]
+        large_contract.claim([1, 2, 3, 4], accounts[1].address, proofs, {"from": accounts[5]})
+        assert (
+            all(large_contract.ownerOf(i) == accounts[1].address for i in range(1, 5)) and
+            large_contract.balanceOf(accounts[1].address) == 4 and
+            large_contract.balanceOf(accounts[0].address) == 8
+        )
+
+    def test_claim_twice(self, large_contract, layers):
+        with reverts("Already claimed"):
+            large_contract.claim([1], accounts[1].address, [merkle_proof(layers, 0)], {"from": accounts[1]})
+
+    def test_claim_after_return_to_shatterer(self, large_contract, layers):
+        large_contract.transferFrom(accounts[1].address, accounts[0].address, 1, {"from": accounts[1]})
+        with reverts("Already claimed"):
+            large_contract.claim([1], accounts[1].address, [merkle_proof(layers, 0)], {"from": accounts[5]})
+        assert large_contract.ownerOf(1) == accounts[0].address and large_contract.isClaimed(1) and not large_contract.isClaimed(5)
+        large_contract.transferFrom(accounts[0].address, accounts[1].address, 1, {"from": accounts[0]})
+
+    def test_claim_after_shatterer_transfer(self, large_contract, layers):
+        large_contract.transferFrom(accounts[0].address, accounts[4].address, 5, {"from": accounts[0]})
+        with reverts("Edition no longer held by shatterer"):
+            large_contract.claim([5], accounts[2].address, [merkle_proof(layers, 4)], {"from": accounts[2]})
+        assert not large_contract.isClaimed(5)
+
+    def test_claim_batch_with_edition_no_longer_held(self, large_contract, layers):
+        with reverts("Edition no longer held by shatterer"):
+            large_contract.claim([6, 5], accounts[2].address, [merkle_proof(layers, 5), merkle_proof(layers, 4)], {"from": accounts[2]})
+        assert large_contract.ownerOf(6) == accounts[0].address and not large_contract.isClaimed(6)
+        large_contract.claim([6, 7], accounts[2].address, [merkle_proof(layers, 5), merkle_proof(layers, 6)], {"from": accounts[2]})
+        assert (
+            large_contract.ownerOf(5) == accounts[4].address and
+            large_contract.ownerOf(7) == accounts[2].address and
+            large_contract.ownerOf(8) == accounts[0].address
+        )
+
+    def test_fuse_drops_claims(self, large_contract, layers):
+        large_contract.batchTransferFrom(accounts[1].address, accounts[0].address, [1, 2, 3, 4], {"from": accounts[1]})
+        large_contract.batchTransferFrom(accounts[2].address, accounts[0].address, [6, 7], {"from": accounts[2]})
+        large_contract.transferFrom(accounts[4].address, accounts[0].address, 5, {"from": accounts[4]})
+        large_contract.fuse({"from": accounts[0]})
+        assert large_contract.claimRoot() == f"0x{bytes(32).hex()}"
+        with reverts("No claims available"):
+            large_contract.claim([8], accounts[3].address, [merkle_proof(layers, 7)], {"from": accounts[3]})
+
+class TestBulkViews:
+    def test_total_supply_before_mint(self, large_contract):
+        assert large_contract.totalSupply() == 0 and list(large_contract.ownersOfRange(0, 2)) == [f"0x{bytes(20).hex()}"] * 2
+
+    def test_total_supply_after_mint(self, large_contract):
+        large_contract.mint("test/", {"from": accounts[0]})
+        assert large_contract.totalSupply() == 1 and list(large_contract.ownersOfRange(0, 1)) == [accounts[0].address]
+
+    def test_owners_of_range(self, large_contract):
+        large_contract.shatter(100, {"from": accounts[0]})
+        large_contract.batchTransferFrom(accounts[0].address, accounts[1].address, [3, 50, 99], {"from": accounts[0]})
+        owners = large_contract.ownersOfRange(1, 100)
+        assert (
+            large_contract.totalSupply() == 100 and
+            list(owners) == [large_contract.ownerOf(i) for i in range(1, 101)] and
+            owners[2] == owners[49] == owners[98] == accounts[1].address
+        )
+
+    def test_owners_of_range_out_of_bounds(self, large_contract):
+        owners = large_contract.ownersOfRange(0, 3)
+        assert owners[0] == f"0x{bytes(20).hex()}" and owners[1] == accounts[0].address
+        owners = large_contract.ownersOfRange(99, 5)
+        assert owners[0] == accounts[1].address and owners[1] == accounts[0].address and list(owners)[2:] == [f"0x{bytes(20).hex()}"] * 3
+
+    def test_tokens_of_owner(self, large_contract):
+        token_ids, cursor = large_contract.tokensOfOwner(accounts[1].address, 0, 40)
+        assert list(token_ids) == [3] and cursor == 41
+        token_ids, cursor = large_contract.tokensOfOwner(accounts[1].address, cursor, 40)
+        assert list(token_ids) == [50] and cursor == 81
+        token_ids, cursor = large_contract.tokensOfOwner(accounts[1].address, cursor, 40)
+        assert list(token_ids) == [99] and cursor == 0
+
+    def test_tokens_of_owner_zero_limit(self, large_contract):
+        with reverts("Limit must be greater than 0"):
+            large_contract.tokensOfOwner(accounts[1].address, 0, 0)
+
+    def test_tokens_of_owner_whole_collection(self, large_contract):
+        token_ids, cursor = large_contract.tokensOfOwner(accounts[0].address, 0, 2**256 - 1)
+        assert len(token_ids) == 97 and cursor == 0
+
+    def test_total_supply_after_fuse(self, large_contract):
+        large_contract.batchTransferFrom(accounts[1].address, accounts[0].address, [3, 50, 99], {"from": accounts[1]})
+        large_contract.fuse({"from": accounts[0]})
+        token_ids, cursor = large_contract.tokensOfOwner(accounts[0].address, 0, 10)
+        assert large_contract.totalSupply() == 1 and list(token_ids) == [0] and cursor == 0
+
+class TestTokenURIRenderer:
+    """ShatterV1_B64 renders its metadata on-chain, trait by trait"""
+    @pytest.fixture(scope="class")
+    def b64_contract(self):
+        return ShatterV1_B64.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 100, 0, {"from": accounts[0]})
+
+    def test_base64_padding(self, b64_contract):
+        b64_contract.mint("desc", "image", "", ["T1"], ["V1"], {"from": accounts[0]})
+        # each description length shifts the JSON length by one byte, covering the three padding cases
+        for description in ["d", "de", "des"]:
+            b64_contract.setDescription(description, {"from": accounts[0]})
+            expected = (
+                '{"name": "Test","description": "' + description + '","attributes": [{"trait_type": "T1", "value": "V1"},'
+                '{"trait_type": "Shattered", "value": "No"},{"trait_type": "Fused", "value": "No"}],"image": "image"}'
+            )
+            uri = b64_contract.tokenURI(0)
+            assert uri == "data:application/json;base64," + base64.b64encode(expected.encode("utf-8")).decode("utf-8")
+
+    def test_animation(self, b64_contract):
+        b64_contract.setAnimation("anim", {"from": accounts[0]})
+        uri = json.loads(base64.b64decode(b64_contract.tokenURI(0)[29:]))
+        assert uri["image"] == "image" and uri["animation_url"] == "anim"
+
+    def test_gas_curve(self, b64_contract):
+        gas = []
+        for num_traits in range(0, 51, 10):
+            b64_contract.setTraits([f"T{i}" for i in range(num_traits)], [f"V{i}" for i in range(num_traits)], {"from": accounts[0]})
+            uri = json.loads(base64.b64decode(b64_contract.tokenURI(0)[29:]))
+            assert len(uri["attributes"]) == num_traits + 2
+            gas.append(b64_contract.tokenURI.estimate_gas(0))
+        steps = [gas[i + 1] - gas[i] for i in range(len(gas) - 1)]
+        # every ten traits cost the same, where copying the growing buffer made each step more expensive than the last
+        assert max(steps) - min(steps) < min(steps) // 10
+
+class TestMetadataUpdate:
+    @pytest.fixture(scope="class")
+    def small_contract(self):
+        return ShatterV1.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 100, 0, {"from": accounts[0]})
+
+    def test_set_base_uri_before_mint(self, small_contract):
+        tx = small_contract.setBaseURI("a/", {"from": accounts[0]})
+        assert "BatchMetadataUpdate" not in tx.events
+
+    def test_set_base_uri_after_mint(self, small_contract):
+        small_contract.mint("test/", {"from": accounts[0]})
+        tx = small_contract.setBaseURI("b/", {"from": accounts[0]})
+        assert tx.events["BatchMetadataUpdate"]["_fromTokenId"] == 0 and tx.events["BatchMetadataUpdate"]["_toTokenId"] == 0
+
+    def test_set_base_uri_after_shatter(self, small_contract):
+        tx = small_contract.shatter(50, {"from": accounts[0]})
+        assert "MetadataUpdate" not in tx.events
+        tx = small_contract.setBaseURI("c/", {"from": accounts[0]})
+        assert tx.events["BatchMetadataUpdate"]["_fromTokenId"] == 1 and tx.events["BatchMetadataUpdate"]["_toTokenId"] == 50
+
+    def test_shatter_to_one_of_one(self):
+        single = ShatterV1.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 1, 100, 0, {"from": accounts[0]})
+        single.mint("test/", {"from": accounts[0]})
+        tx = single.shatter(1, {"from": accounts[0]})
+        assert tx.events["MetadataUpdate"]["_tokenId"] == 0
@@ -19,6 +19,10 @@ def contract():
 def contract1():
     return ShatterV3.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 1, shatter_time, {"from": accounts[0]})
 
+@pytest.fixture(scope="class")
+def large_contract():
+    return ShatterV3.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 20000, 0, {"from": accounts[0]})
+
 class TestDefault:
 
     def test_default_values(self, contract):
@@ -46,6 +50,9 @@ class TestInterface:
     def test_erc721_metadata_interface(self, contract):
         assert contract.supportsInterface("0x5b5e139f")
 
+    def test_eip4906_interface(self, contract):
+        assert contract.supportsInterface("0x49064906")
+
 class TestERC721Init:
     def test_balance_of_zero_address(self, contract):
         with reverts("ERC721: address zero is not a valid owner"):
@@ -487,3 +494,121 @@ class TestZeroShatterDeployment:
     def test_zero_shatters(self):
         with reverts("Cannot deploy a shatter contract with 0 shatters"):
             ShatterV3.deploy("ZERO", "ZRO", accounts[0].address, 1000, accounts[1].address, 0, 0, {"from": accounts[0]})
+
+    def test_too_many_shatters(self):
+        with reverts("Max shatters must fit in 64 bits"):
+            ShatterV3.deploy("MAX", "MAX", accounts[0].address, 1000, accounts[1].address, 2**64 - 1, 0, {"from": accounts[0]})
+
+class TestConsecutiveTransfer:
+    def test_set_consecutive_transfer_non_owner(self, contract):
+        with reverts("Ownable: caller is not the owner"):
+            contract.setConsecutiveTransfer(True, {"from": accounts[2]})
+
+    def test_shatter(self, contract):
+        contract.setConsecutiveTransfer(True, {"from": accounts[0]})
+        contract.mint("newURI/", {"from": accounts[0]})
+        tx = contract.shatter({"from": accounts[0]})
+        assert(
+            contract.useConsecutiveTransfer() and
+            len(tx.events) == 2 and # 1 ConsecutiveTransfer, Shatter event
+            tx.events["ConsecutiveTransfer"]["fromTokenId"] == 2 and
+            tx.events["ConsecutiveTransfer"]["toTokenId"] == 101 and
+            tx.events["ConsecutiveTransfer"]["fromAddress"] == f"0x{bytes(20).hex()}" and
+            tx.events["ConsecutiveTransfer"]["toAddress"] == accounts[0].address and
+            contract.ownerOf(101) == accounts[0].address
+        )
+
+    def test_shatter_gas_is_flat(self):
+        gas = []
+        for num in [10, 100, 1000]:
+            c = ShatterV3.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, num, 0, {"from": accounts[0]})
+            c.setConsecutiveTransfer(True, {"from": accounts[0]})
+            c.mint("newURI/", {"from": accounts[0]})
+            tx = c.shatter({"from": accounts[0]})
+            gas.append(tx.gas_used)
+        assert max(gas) - min(gas) < 1000
+
+class TestBatchedShatter:
+    def test_set_batch_size_non_owner(self, large_contract):
+        with reverts("Ownable: caller is not the owner"):
+            large_contract.setBatchSize(2500, {"from": accounts[2]})
+
+    def test_shatter(self, large_contract):
+        large_contract.setBatchSize(2500, {"from": accounts[0]})
+        large_contract.mint("newURI/", {"from": accounts[0]})
+        tx = large_contract.shatter({"from": accounts[0]})
+        assert(
+            large_contract.shatters() == 2501 and
+            large_contract.pendingShatters() == 17500 and
+            "Shattered" not in tx.events.keys() and
+            large_contract.balanceOf(accounts[0].address) == 2501
+        )
+
+    def test_set_batch_size_in_progress(self, large_contract):
+        with reverts("Shatter or fuse in progress"):
+            large_contract.setBatchSize(5000, {"from": accounts[0]})
+
+    def test_transfer_finalized_shard(self, large_contract):
+        large_contract.transferFrom(accounts[0].address, accounts[1].address, 2501, {"from": accounts[0]})
+        assert large_contract.ownerOf(2501) == accounts[1].address
+        with reverts("Invalid token id"):
+            large_contract.ownerOf(2502)
+
+    def test_continue_shatter(self, large_contract):
+        num_txs = 0
+        while large_contract.pendingShatters() > 0:
+            tx = large_contract.continueShatter({"from": accounts[3]})
+            num_txs += 1
+        assert(
+            num_txs == 7 and
+            tx.events["Shattered"]["user"] == accounts[0].address and
+            tx.events["Shattered"]["numShatters"] == 20000 and
+            large_contract.shatters() == 20001 and
+            large_contract.ownerOf(20001) == accounts[0].address and
+            large_contract.balanceOf(accounts[0].address) == 20000
+        )
+
+    def test_continue_shatter_when_done(self, large_contract):
+        with reverts("No shatter in progress"):
+            large_contract.continueShatter({"from": accounts[0]})
+
+class TestBulkViews:
+    def test_total_supply_after_mint(self, large_contract):
+        large_contract.mint("newURI/", {"from": accounts[0]})
+        assert large_contract.totalSupply() == 1 and list(large_contract.ownersOfRange(1, 1)) == [accounts[0].address]
+
+    def test_views_during_shatter(self, large_contract):
+        large_contract.setBatchSize(100, {"from": accounts[0]})
+        large_contract.shatter({"from": accounts[0]})
+        large_contract.transferFrom(accounts[0].address, accounts[1].address, 50, {"from": accounts[0]})
+        owners = large_contract.ownersOfRange(1, 102)
+        token_ids, cursor = large_contract.tokensOfOwner(accounts[1].address, 0, 1000)
+        assert (
+            large_contract.totalSupply() == 101 and
+            list(owners)[:101] == [large_contract.ownerOf(i) for i in range(1, 102)] and
+            owners[101] == f"0x{bytes(20).hex()}" and
+            list(token_ids) == [50] and
+            cursor == 0
+        )
+
+class TestMetadataUpdate:
+    @pytest.fixture(scope="class")
+    def small_contract(self):
+        return ShatterV3.deploy("Test", "TST", accounts[1].address, 500, accounts[2].address, 50, 0, {"from": accounts[0]})
+
+    def test_set_base_uri_before_mint(self, small_contract):
+        tx = small_contract.setBaseURI("a/", {"from": accounts[0]})
+        assert "BatchMetadataUpdate" not in tx.events
+
+    def test_set_base_uri_after_mint(self, small_contract):
+        small_contract.mint("test/", {"from": accounts[0]})
+        tx = small_contract.setBaseURI("b/", {"from": accounts[0]})
+        assert tx.events["BatchMetadataUpdate"]["_fromTokenId"] == 1 and tx.events["BatchMetadataUpdate"]["_toTokenId"] == 1
+
+    def test_shatter(self, small_contract):
+        tx = small_contract.shatter({"from": accounts[0]})
+        assert tx.events["MetadataUpdate"]["_tokenId"] == 1
+
+    def test_set_base_uri_after_shatter(self, small_contract):
+        tx = small_contract.setBaseURI("c/", {"from": accounts[0]})
+        assert tx.events["BatchMetadataUpdate"]["_fromTokenId"] == 1 and tx.events["BatchMetadataUpdate"]["_toTokenId"] == small_contract.shatters()